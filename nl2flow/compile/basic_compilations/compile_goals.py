@@ -2,10 +2,10 @@ import tarski.fstrips as fs
 from tarski.io import fstrips as iofs
 from tarski.syntax import land
 from typing import List, Set, Any, Optional
-from nl2flow.compile.basic_compilations.utils import get_type_of_constant, add_memory_item_to_constant_map
-from nl2flow.compile.basic_compilations.utils import unpack_list_of_signature_items
+from nl2flow.compile.basic_compilations.utils import add_memory_item_to_constant_map
 from nl2flow.compile.basic_compilations.compile_constraints import compile_constraints
 from nl2flow.debug.schemas import SolutionQuality
+from nl2flow.compile.graph import DependencyGraph
 from nl2flow.compile.schemas import GoalItem, GoalItems, MemoryItem, Constraint, Step, Parameter
 from nl2flow.compile.options import (
     TypeOptions,
@@ -20,28 +20,10 @@ from nl2flow.compile.options import (
 
 
 def get_orphaned_items(compilation: Any, goal_items: List[str]) -> List[str]:
-    list_of_neighs = list()
-    list_of_orphans = list()
+    graph: DependencyGraph = compilation.graph
+    memory_items = {item.item_id for item in compilation.flow_definition.memory_items}
 
-    for item in compilation.flow_definition.memory_items:
-        list_of_neighs.append(item.item_id)
-
-    for operator in compilation.flow_definition.operators:
-        input_names = unpack_list_of_signature_items(operator.inputs)
-        list_of_neighs.extend(input_names)
-
-        output = operator.outputs
-        if isinstance(output, List):
-            output = output[0]
-
-        output_names = unpack_list_of_signature_items(output.outcomes)
-        list_of_neighs.extend(output_names)
-
-    for item in goal_items:
-        if item not in list_of_neighs:
-            list_of_orphans.append(item)
-
-    return list_of_orphans
+    return [item for item in goal_items if item not in memory_items and not graph.is_operator_item(item)]
 
 
 def compile_step_goal(compilation: Any, goal_item: GoalItem, goal_predicates: Set[Any], **kwargs: Any) -> None:
@@ -114,10 +96,8 @@ def compile_goal_item(compilation: Any, goal_item: GoalItem, goal_predicates: Se
     else:
         list_of_constants = list()
         if goal_item.goal_name in compilation.type_map:
-            for item in compilation.constant_map:
-                type_of_item = get_type_of_constant(compilation, item)
-
-                if type_of_item == goal_item.goal_name and "new_object" not in item:
+            for item in compilation.symbols.get_constants_of_type(goal_item.goal_name):
+                if "new_object" not in item:
                     list_of_constants.append(item)
         else:
             list_of_constants = [goal_item.goal_name]
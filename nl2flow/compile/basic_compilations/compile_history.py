@@ -4,7 +4,7 @@ from nl2flow.compile.options import MemoryState, HasDoneState, BasicOperations,
 from nl2flow.compile.basic_compilations.utils import is_this_a_datum
 from nl2flow.compile.basic_compilations.compile_references.utils import get_token_predicate_name
 from nl2flow.debug.schemas import DebugFlag
-from typing import Any, Optional, Set, List
+from typing import Any, Dict, Optional, Set, List
 
 
 def get_predicate_from_constraint(compilation: Any, constraint: Constraint) -> Optional[Any]:
@@ -59,9 +59,11 @@ def get_predicate_from_step(compilation: Any, step: Step, repeat_index: int = 0,
         else:
             step_predicate = compilation.has_done(
                 compilation.constant_map[step.name],
-                compilation.constant_map[HasDoneState.present.value]
-                if debug_flag
-                else compilation.constant_map[HasDoneState.past.value],
+                (
+                    compilation.constant_map[HasDoneState.present.value]
+                    if debug_flag
+                    else compilation.constant_map[HasDoneState.past.value]
+                ),
             )
 
             if not debug_flag:
@@ -116,22 +118,19 @@ def compile_history(compilation: Any, **kwargs: Any) -> List[str]:
     return used_up_labels
 
 
-def get_index_of_interest(compilation: Any, step: Step, flow_definition: FlowDefinition, current_index: int) -> int:
-    indices_of_interest = []
-
-    history = flow_definition.history
-    cached_history_length = len(history)
-
-    reference = compilation.flow_definition.reference.plan or []
-    current_index += cached_history_length
+def get_indices_of_interest(compilation: Any, flow_definition: FlowDefinition) -> List[int]:
+    repeat_count: Dict[str, int] = dict()
 
-    new_history = history + reference
+    for step in flow_definition.history:
+        if isinstance(step, Step):
+            repeat_count[step.name] = repeat_count.get(step.name, 0) + 1
 
-    for i, r in enumerate(new_history):
-        if i == current_index:
-            indices_of_interest.append(i)
-
-        if isinstance(r, Step) and step.name == r.name:
-            indices_of_interest.append(i)
+    indices_of_interest = []
+    for item in compilation.flow_definition.reference.plan or []:
+        if isinstance(item, Step):
+            indices_of_interest.append(repeat_count.get(item.name, 0))
+            repeat_count[item.name] = indices_of_interest[-1] + 1
+        else:
+            indices_of_interest.append(0)
 
-    return indices_of_interest.index(current_index) if current_index in indices_of_interest else 0
+    return indices_of_interest
@@ -86,9 +86,11 @@ def compile_declared_mappings(compilation: Any, **kwargs: Any) -> None:
             fs.AddEffect(
                 compilation.known(
                     y,
-                    compilation.constant_map[MemoryState.UNCERTAIN.value]
-                    if LifeCycleOptions.confirm_on_mapping in variable_life_cycle
-                    else compilation.constant_map[MemoryState.KNOWN.value],
+                    (
+                        compilation.constant_map[MemoryState.UNCERTAIN.value]
+                        if LifeCycleOptions.confirm_on_mapping in variable_life_cycle
+                        else compilation.constant_map[MemoryState.KNOWN.value]
+                    ),
                 )
             ),
             fs.AddEffect(compilation.mapped_to(x, y)),
@@ -173,9 +175,11 @@ def compile_typed_mappings(compilation: Any, **kwargs: Any) -> None:
                 fs.AddEffect(
                     compilation.known(
                         y,
-                        compilation.constant_map[MemoryState.UNCERTAIN.value]
-                        if LifeCycleOptions.confirm_on_mapping in variable_life_cycle
-                        else compilation.constant_map[MemoryState.KNOWN.value],
+                        (
+                            compilation.constant_map[MemoryState.UNCERTAIN.value]
+                            if LifeCycleOptions.confirm_on_mapping in variable_life_cycle
+                            else compilation.constant_map[MemoryState.KNOWN.value]
+                        ),
                     )
                 ),
                 fs.AddEffect(compilation.mapped_to(x, y)),
@@ -5,13 +5,13 @@ from tarski.syntax import land, lor, neg, CompoundFormula
 from typing import List, Set, Any, Optional
 
 from nl2flow.compile.basic_compilations.utils import (
-    add_to_condition_list_pre_check,
+    add_item_to_constant_map,
     get_type_of_constant,
 )
 
 from nl2flow.compile.basic_compilations.compile_constraints import compile_constraints
 from nl2flow.compile.basic_compilations.compile_references.utils import get_token_predicate_name
-from nl2flow.compile.schemas import FlowDefinition, OperatorDefinition, Parameter
+from nl2flow.compile.ir import FlowIR
 from nl2flow.debug.schemas import DebugFlag
 from nl2flow.compile.options import (
     TypeOptions,
@@ -26,24 +26,29 @@ from nl2flow.compile.options import (
 
 
 def compile_operators(compilation: Any, **kwargs: Any) -> None:
-    flow_definition: FlowDefinition = compilation.flow_definition
-    list_of_actions: List[OperatorDefinition] = flow_definition.operators
+    ir: FlowIR = compilation.ir
     debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
     variable_life_cycle: Set[LifeCycleOptions] = set(kwargs["variable_life_cycle"])
     mapping_options: Set[MappingOptions] = set(kwargs["mapping_options"])
 
-    for operator in list_of_actions:
-        compilation.constant_map[operator.name] = compilation.lang.constant(operator.name, TypeOptions.OPERATOR.value)
+    for operator in ir.operators:
+        operator_name = ir.name(operator.name)
+        compilation.symbols.add_constant(
+            operator_name,
+            compilation.lang.constant(operator_name, TypeOptions.OPERATOR.value),
+            TypeOptions.OPERATOR.value,
+        )
 
-    for operator in list_of_actions:
+    for operator in ir.operators:
+        operator_name = ir.name(operator.name)
         parameter_list: List[Any] = list()
         precondition_list: List[Any] = list()
         must_know_list: List[Any] = list()
         optional_know_list: List[Any] = list()
         add_effect_list = [
             compilation.has_done(
-                compilation.constant_map[operator.name],
+                compilation.constant_map[operator_name],
                 compilation.constant_map[HasDoneState.present.value],
             )
         ]
@@ -56,15 +61,12 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
 
         for index_of_input, o_input in enumerate(operator.inputs):
             for index_of_nested_input, param in enumerate(o_input.parameters):
-                add_to_condition_list_pre_check(compilation, param)
-                index_of_param = index_of_input + list(o_input.parameters).index(param)
-                type_of_param = (
-                    param.item_type or TypeOptions.ROOT.value
-                    if isinstance(param, Parameter)
-                    else get_type_of_constant(compilation, param)
-                )
+                param_name = ir.name(param.item)
+                param_type = ir.name(param.item_type) if param.item_type is not None else None
 
-                param_name = param.item_id if isinstance(param, Parameter) else param
+                add_item_to_constant_map(compilation, param_name, param_type)
+                index_of_param = index_of_input + o_input.parameters.index(param)
+                type_of_param = param_type or get_type_of_constant(compilation, param_name)
 
                 if NL2FlowOptions.multi_instance in optimization_options:
                     x = compilation.lang.variable(
@@ -85,7 +87,7 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
                 compilation.init.add(compilation.been_used(compilation.constant_map[param_name]))
                 add_effect_list.append(compilation.been_used(compilation.constant_map[param_name]))
 
-                if isinstance(param, Parameter) and not param.required:
+                if not param.required:
                     optional_know_list.append(param_name)
                 else:
                     must_know_list.append(param_name)
@@ -127,21 +129,28 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
             del_effect_list.append(compilation.available(label_level))
             add_effect_list.append(
                 compilation.assigned_to(
-                    compilation.constant_map[operator.name],
+                    compilation.constant_map[operator_name],
                     label_level,
                 )
             )
 
         if optimization_options:
             add_advanced_properties(
-                compilation, operator, parameter_list, type_list, precondition_list, add_effect_list, **kwargs
+                compilation,
+                operator_name,
+                operator.max_try,
+                parameter_list,
+                type_list,
+                precondition_list,
+                add_effect_list,
+                **kwargs,
             )
 
         else:
             precondition_list.append(
                 neg(
                     compilation.has_done(
-                        compilation.constant_map[operator.name],
+                        compilation.constant_map[operator_name],
                         compilation.constant_map[HasDoneState.past.value],
                     )
                 )
@@ -149,11 +158,13 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
 
         outputs = operator.outputs[0]
         for o_output in outputs.outcomes:
-            for param in o_output.parameters:
-                add_to_condition_list_pre_check(compilation, param)
-
-                if isinstance(param, Parameter):
-                    param = param.item_id
+            for output_param in o_output.parameters:
+                param = ir.name(output_param.item)
+                add_item_to_constant_map(
+                    compilation,
+                    param,
+                    ir.name(output_param.item_type) if output_param.item_type is not None else None,
+                )
 
                 del_effect_list.append(compilation.mapped(compilation.constant_map[param]))
                 add_effect_list.extend(
@@ -161,9 +172,11 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
                         compilation.free(compilation.constant_map[param]),
                         compilation.known(
                             compilation.constant_map[param],
-                            compilation.constant_map[MemoryState.UNCERTAIN.value]
-                            if LifeCycleOptions.confirm_on_determination in variable_life_cycle
-                            else compilation.constant_map[MemoryState.KNOWN.value],
+                            (
+                                compilation.constant_map[MemoryState.UNCERTAIN.value]
+                                if LifeCycleOptions.confirm_on_determination in variable_life_cycle
+                                else compilation.constant_map[MemoryState.KNOWN.value]
+                            ),
                         ),
                     ]
                 )
@@ -180,7 +193,7 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
                 constraint_predicate = compile_constraints(compilation, constraint, **kwargs)
                 add_effect_list.append(constraint_predicate)
 
-        add_partial_orders(compilation, operator, precondition_list)
+        add_partial_orders(compilation, operator_name, precondition_list)
         merged_preconditions = merge_optional_preconditions(
             compilation,
             must_know_list,
@@ -189,7 +202,7 @@ def compile_operators(compilation: Any, **kwargs: Any) -> None:
         )
 
         compilation.problem.action(
-            operator.name,
+            operator_name,
             parameters=parameter_list,
             precondition=merged_preconditions,
             effects=[fs.AddEffect(add) for add in add_effect_list] + [fs.DelEffect(del_e) for del_e in del_effect_list],
@@ -245,7 +258,8 @@ def merge_optional_preconditions(
 
 def add_advanced_properties(
     compilation: Any,
-    operator: OperatorDefinition,
+    operator_name: str,
+    max_try: int,
     parameter_list: List[Any],
     type_list: List[str],
     precondition_list: List[Any],
@@ -253,7 +267,7 @@ def add_advanced_properties(
     **kwargs: Any,
 ) -> None:
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
-    new_has_done_predicate_name = f"has_done_{operator.name}"
+    new_has_done_predicate_name = f"has_done_{operator_name}"
 
     has_done_parameters = []
     local_parameters = (
@@ -281,22 +295,22 @@ def add_advanced_properties(
             [
                 getattr(compilation, new_has_done_predicate_name)(*local_parameters, pre_level),
                 neg(getattr(compilation, new_has_done_predicate_name)(*local_parameters, post_level)),
-                compilation.connected(compilation.constant_map[operator.name], pre_level, post_level),
+                compilation.connected(compilation.constant_map[operator_name], pre_level, post_level),
             ]
         )
 
         add_effect_list.append(getattr(compilation, new_has_done_predicate_name)(*local_parameters, post_level))
 
-        for try_level in range(operator.max_try):
+        for try_level in range(max_try):
             compilation.init.add(
                 compilation.connected(
-                    compilation.constant_map[operator.name],
+                    compilation.constant_map[operator_name],
                     compilation.constant_map[f"try_level_{try_level}"],
                     compilation.constant_map[f"try_level_{try_level + 1}"],
                 )
             )
 
-        add_enabler_action_for_operator(compilation, operator, local_parameters, new_has_done_predicate_name)
+        add_enabler_action_for_operator(compilation, operator_name, local_parameters, new_has_done_predicate_name)
         parameter_list.extend([pre_level, post_level])
 
     else:
@@ -309,7 +323,7 @@ def add_advanced_properties(
 
 def add_enabler_action_for_operator(
     compilation: Any,
-    operator: OperatorDefinition,
+    operator_name: str,
     parameter_list: List[Any],
     new_has_done_predicate_name: Any,
 ) -> None:
@@ -322,7 +336,7 @@ def add_enabler_action_for_operator(
     )
 
     compilation.problem.action(
-        f"{RestrictedOperations.ENABLER.value}__{operator.name}",
+        f"{RestrictedOperations.ENABLER.value}__{operator_name}",
         parameters=copy.deepcopy(parameter_list),
         precondition=land(*[neg(enabler_predicate), neg(shadow_predicate)], flat=True),
         effects=[fs.AddEffect(enabler_predicate)],
@@ -335,9 +349,9 @@ def add_enabler_action_for_operator(
     )
 
 
-def add_partial_orders(compilation: Any, operator: OperatorDefinition, precondition_list: List[Any]) -> None:
+def add_partial_orders(compilation: Any, operator_name: str, precondition_list: List[Any]) -> None:
     for partial_order in compilation.flow_definition.partial_orders:
-        if partial_order.consequent == operator.name and partial_order.antecedent not in [
+        if partial_order.consequent == operator_name and partial_order.antecedent not in [
             o.name for o in compilation.flow_definition.history
         ]:
             precondition_list.append(
@@ -347,7 +361,7 @@ def add_partial_orders(compilation: Any, operator: OperatorDefinition, precondit
                 )
             )
 
-        if partial_order.antecedent == operator.name:
+        if partial_order.antecedent == operator_name:
             precondition_list.append(
                 neg(
                     compilation.has_done(
@@ -357,7 +371,7 @@ def add_partial_orders(compilation: Any, operator: OperatorDefinition, precondit
                 )
             )
 
-    if compilation.flow_definition.starts_with and compilation.flow_definition.starts_with != operator.name:
+    if compilation.flow_definition.starts_with and compilation.flow_definition.starts_with != operator_name:
         precondition_list.append(
             compilation.has_done(
                 compilation.constant_map[compilation.flow_definition.starts_with],
@@ -4,15 +4,16 @@ from tarski.syntax import land, neg, Atom, Tautology, CompoundFormula
 from typing import Any, Optional, Set, List, Tuple
 
 from nl2flow.debug.schemas import SolutionQuality
-from nl2flow.compile.basic_compilations.utils import add_to_condition_list_pre_check
+from nl2flow.compile.ir import FlowIR
+from nl2flow.compile.basic_compilations.utils import add_to_condition_list_pre_check, add_item_to_constant_map
 from nl2flow.compile.basic_compilations.compile_operators import merge_optional_preconditions
 from nl2flow.compile.basic_compilations.compile_references.utils import get_token_predicate
 from nl2flow.compile.basic_compilations.compile_history import (
     get_predicate_from_step,
-    get_index_of_interest,
+    get_indices_of_interest,
 )
 
-from nl2flow.compile.schemas import Step, Constraint, Parameter, MemoryItem, OperatorDefinition, FlowDefinition
+from nl2flow.compile.schemas import Step, Constraint, MemoryItem, FlowDefinition
 from nl2flow.compile.options import (
     PARAMETER_DELIMITER,
     BasicOperations,
@@ -184,7 +185,7 @@ def add_instantiated_map(
 def add_instantiated_operation(
     compilation: Any,
     step: Step,
-    index: int,
+    repeat_index: int,
     goal_predicates: Set[Any],
     precondition_list: List[Any],
     add_effect_list: List[Any],
@@ -194,7 +195,6 @@ def add_instantiated_operation(
     flow_definition: FlowDefinition = kwargs["flow_definition"]
     report_type: SolutionQuality = kwargs["report_type"]
 
-    repeat_index = get_index_of_interest(compilation, step, flow_definition, index)
     step_predicate = get_predicate_from_step(compilation, step, repeat_index, **kwargs)
 
     compression_option: bool = kwargs.get("compress", False)
@@ -211,26 +211,27 @@ def add_instantiated_operation(
 
         add_effect_list.append(step_predicate)
 
-        operator: OperatorDefinition = next(
-            filter(lambda x: x.name == step.name, compilation.flow_definition.operators)
-        )
+        ir: FlowIR = compilation.ir
+        operator = ir.get_operator(step.name)
+        assert operator is not None, f"Unknown operator {step.name} in reference."
 
         for i, param in enumerate(step.parameters):
             add_to_condition_list_pre_check(compilation, step.parameter(i))
             add_effect_list.append(compilation.been_used(compilation.constant_map[step.parameter(i)]))
 
         for o_input in operator.inputs:
-            for param in o_input.parameters:
-                add_to_condition_list_pre_check(compilation, param)
-
-                if isinstance(param, Parameter):
-                    if param.required:
-                        must_know_list.append(param.item_id)
-                    else:
-                        optional_know_list.append(param.item_id)
+            for input_param in o_input.parameters:
+                param_name = ir.name(input_param.item)
+                add_item_to_constant_map(
+                    compilation,
+                    param_name,
+                    ir.name(input_param.item_type) if input_param.item_type is not None else None,
+                )
 
+                if input_param.required:
+                    must_know_list.append(param_name)
                 else:
-                    must_know_list.append(param)
+                    optional_know_list.append(param_name)
 
         for partial_order in flow_definition.partial_orders:
             if partial_order.consequent == step.name:
@@ -252,11 +253,13 @@ def add_instantiated_operation(
 
         outputs = operator.outputs[0]
         for o_output in outputs.outcomes:
-            for param in o_output.parameters:
-                add_to_condition_list_pre_check(compilation, param)
-
-                if isinstance(param, Parameter):
-                    param = param.item_id
+            for output_param in o_output.parameters:
+                param = ir.name(output_param.item)
+                add_item_to_constant_map(
+                    compilation,
+                    param,
+                    ir.name(output_param.item_type) if output_param.item_type is not None else None,
+                )
 
                 del_effect_list.append(compilation.mapped(compilation.constant_map[param]))
                 add_effect_list.extend(
@@ -285,7 +288,7 @@ def add_instantiated_operation(
                     [
                         prev_step_predicate,
                         compilation.connected(
-                            compilation.constant_map[operator.name],
+                            compilation.constant_map[step.name],
                             compilation.constant_map[f"try_level_{repeat_index}"],
                             compilation.constant_map[f"try_level_{repeat_index + 1}"],
                         ),
@@ -306,11 +309,13 @@ def compile_reference_basic(compilation: Any, **kwargs: Any) -> None:
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
     report_type: SolutionQuality = kwargs["report_type"]
     compression_option: bool = kwargs.get("compress", False)
+    flow_definition: FlowDefinition = kwargs["flow_definition"]
 
     if NL2FlowOptions.multi_instance in optimization_options:
         raise NotImplementedError
 
     goal_predicates = set()
+    indices_of_interest = get_indices_of_interest(compilation, flow_definition)
 
     for index, step in enumerate(compilation.flow_definition.reference.plan):
         pre_token_predicate = get_token_predicate(compilation, index)
@@ -368,7 +373,7 @@ def compile_reference_basic(compilation: Any, **kwargs: Any) -> None:
                 step_predicate, precondition = add_instantiated_operation(
                     compilation,
                     step,
-                    index,
+                    indices_of_interest[index],
                     goal_predicates,
                     precondition_list,
                     add_effect_list,
@@ -403,10 +408,10 @@ def compile_reference_basic(compilation: Any, **kwargs: Any) -> None:
         new_goal = land(*goal_predicates, flat=True)
 
     else:
-        if isinstance(compilation.problem.goal, Atom):
-            sub_formulas = [compilation.problem.goal]
-        else:
+        if isinstance(compilation.problem.goal, CompoundFormula):
             sub_formulas = list(compilation.problem.goal.subformulas)
+        else:
+            sub_formulas = [compilation.problem.goal]
 
         sub_formulas.extend(goal_predicates)
         new_goal = land(*sub_formulas, flat=True)
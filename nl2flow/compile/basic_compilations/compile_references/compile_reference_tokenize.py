@@ -1,7 +1,7 @@
 import tarski.fstrips as fs
 from tarski.io import fstrips as iofs
-from tarski.syntax import land, Atom, Tautology
-from typing import Any, Optional
+from tarski.syntax import land, Tautology, CompoundFormula
+from typing import Any, Optional, Set
 from nl2flow.compile.schemas import Step, Constraint, FlowDefinition
 from nl2flow.debug.schemas import SolutionQuality
 from nl2flow.compile.options import RestrictedOperations, CostOptions
@@ -10,27 +10,52 @@ from nl2flow.compile.basic_compilations.compile_references.utils import get_toke
 from nl2flow.compile.basic_compilations.compile_history import (
     get_predicate_from_constraint,
     get_predicate_from_step,
-    get_index_of_interest,
+    get_indices_of_interest,
 )
 
+PREFIX_TOKEN = "prefix"
+
+
+def get_deleted_predicates(compilation: Any) -> Set[str]:
+    return {
+        effect.atom.symbol.name
+        for action in compilation.problem.actions.values()
+        for effect in action.effects
+        if isinstance(effect, fs.DelEffect)
+    }
+
 
 def compile_reference_tokenize(compilation: Any, **kwargs: Any) -> None:
     report_type: Optional[SolutionQuality] = kwargs.get("report_type", None)
     flow_definition: FlowDefinition = kwargs["flow_definition"]
 
+    reference = compilation.flow_definition.reference.plan
+    indices_of_interest = get_indices_of_interest(compilation, flow_definition)
+    deleted_predicates = get_deleted_predicates(compilation)
+
+    # tokenize_i chains through the prefix added by tokenize_i-1 only, so a step predicate that
+    # no action deletes is checked once; predicates that can be deleted are checked by every later token
+    step_predicate = None
     cached_predicates = list()
     token_predicates = list()
 
-    for index in range(len(compilation.flow_definition.reference.plan) + 1):
-        if index < len(compilation.flow_definition.reference.plan):
-            item = compilation.flow_definition.reference.plan[index]
+    for index in range(len(reference) + 1):
+        precondition_list = list(cached_predicates)
+
+        if index > 0:
+            precondition_list.append(get_token_predicate(compilation, index - 1, token=PREFIX_TOKEN))
+
+            if step_predicate and step_predicate.symbol.name not in deleted_predicates:
+                precondition_list.append(step_predicate)
+
+        if index < len(reference):
+            item = reference[index]
 
             if isinstance(item, Step):
                 for param in item.parameters:
                     add_to_condition_list_pre_check(compilation, param)
 
-                repeat_index = get_index_of_interest(compilation, item, flow_definition, index)
-                step_predicate = get_predicate_from_step(compilation, item, repeat_index, **kwargs)
+                step_predicate = get_predicate_from_step(compilation, item, indices_of_interest[index], **kwargs)
 
             elif isinstance(item, Constraint):
                 step_predicate = get_predicate_from_constraint(compilation, item)
@@ -38,18 +63,17 @@ def compile_reference_tokenize(compilation: Any, **kwargs: Any) -> None:
             else:
                 raise ValueError(f"Invalid reference object: {item}")
 
-            if step_predicate:
+            if step_predicate and step_predicate.symbol.name in deleted_predicates:
                 cached_predicates.append(step_predicate)
 
         token_predicate = get_token_predicate(compilation, index)
         token_predicates.append(token_predicate)
 
-        precondition_list = [p for p in cached_predicates[:index]]
-        effect_list = [fs.AddEffect(compilation.ready_for_token()), fs.AddEffect(token_predicate)]
-
-        for i in range(index):
-            shadow_token_predicate = get_token_predicate(compilation, i)
-            precondition_list.append(shadow_token_predicate)
+        effect_list = [
+            fs.AddEffect(compilation.ready_for_token()),
+            fs.AddEffect(token_predicate),
+            fs.AddEffect(get_token_predicate(compilation, index, token=PREFIX_TOKEN)),
+        ]
 
         compilation.problem.action(
             f"{RestrictedOperations.TOKENIZE.value}_{index}",
@@ -64,9 +88,13 @@ def compile_reference_tokenize(compilation: Any, **kwargs: Any) -> None:
             ),
         )
 
+        # untokenize_i also adds prefix_i so that one wrong step does not rule out tokenizing the rest
         if report_type == SolutionQuality.OPTIMAL:
             precondition_list = []
-            effect_list = [fs.AddEffect(token_predicate)]
+            effect_list = [
+                fs.AddEffect(token_predicate),
+                fs.AddEffect(get_token_predicate(compilation, index, token=PREFIX_TOKEN)),
+            ]
 
             compilation.problem.action(
                 f"{RestrictedOperations.UNTOKENIZE.value}_{index}",
@@ -85,10 +113,10 @@ def compile_reference_tokenize(compilation: Any, **kwargs: Any) -> None:
         new_goal = land(*token_predicates, flat=True)
 
     else:
-        if isinstance(compilation.problem.goal, Atom):
-            sub_formulas = [compilation.problem.goal]
-        else:
+        if isinstance(compilation.problem.goal, CompoundFormula):
             sub_formulas = list(compilation.problem.goal.subformulas)
+        else:
+            sub_formulas = [compilation.problem.goal]
 
         sub_formulas.extend(token_predicates)
         new_goal = land(*sub_formulas, flat=True)
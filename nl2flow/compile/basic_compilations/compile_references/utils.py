@@ -7,19 +7,19 @@ def get_token_predicate_name(index: int, token: Optional[str] = None) -> str:
     return token
 
 
-def set_token_predicate(compilation: Any, index: int) -> Any:
-    token_predicate_name = get_token_predicate_name(index)
+def set_token_predicate(compilation: Any, index: int, token: Optional[str] = None) -> Any:
+    token_predicate_name = get_token_predicate_name(index, token)
     token_predicate = compilation.lang.predicate(token_predicate_name)
     setattr(compilation, token_predicate_name, token_predicate)
 
     return token_predicate
 
 
-def get_token_predicate(compilation: Any, index: int) -> Any:
-    token_predicate_name = get_token_predicate_name(index)
+def get_token_predicate(compilation: Any, index: int, token: Optional[str] = None) -> Any:
+    token_predicate_name = get_token_predicate_name(index, token)
     attr = getattr(compilation, token_predicate_name, None)
 
     if attr:
         return attr()
     else:
-        return set_token_predicate(compilation, index)()
+        return set_token_predicate(compilation, index, token)()
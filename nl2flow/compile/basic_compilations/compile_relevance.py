@@ -0,0 +1,352 @@
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from nl2flow.compile.basic_compilations.utils import unpack_list_of_signature_items
+from nl2flow.compile.schemas import (
+    Constraint,
+    FlowDefinition,
+    GoalItem,
+    MemoryItem,
+    OperatorDefinition,
+    Outcome,
+    Parameter,
+    Step,
+    Transform,
+)
+from nl2flow.compile.options import TypeOptions, GoalType, MappingOptions, BasicOperations
+
+
+def get_outcomes(operator: OperatorDefinition) -> List[Outcome]:
+    return operator.outputs if isinstance(operator.outputs, List) else [operator.outputs]
+
+
+def get_operator_parameters(operator: OperatorDefinition) -> List[Union[str, Parameter]]:
+    parameters: List[Union[str, Parameter]] = list()
+
+    for signature_item in operator.inputs + [s for o in get_outcomes(operator) for s in o.outcomes]:
+        params = signature_item.parameters
+        parameters.extend(params if isinstance(params, List) else [params])
+
+    return parameters
+
+
+def get_item_types(flow_definition: FlowDefinition) -> Dict[str, Set[str]]:
+    item_types: Dict[str, Set[str]] = dict()
+    parameters: List[Union[str, Parameter]] = list(flow_definition.memory_items)
+
+    for operator in flow_definition.operators:
+        parameters.extend(get_operator_parameters(operator))
+
+    for param in parameters:
+        if isinstance(param, Parameter):
+            item_types.setdefault(param.item_id, set()).add(param.item_type or TypeOptions.ROOT.value)
+        else:
+            item_types.setdefault(param, set()).add(TypeOptions.ROOT.value)
+
+    return item_types
+
+
+def get_type_ancestors(flow_definition: FlowDefinition) -> Dict[str, Set[str]]:
+    parents: Dict[str, Set[str]] = dict()
+
+    for type_item in flow_definition.type_hierarchy:
+        if type_item.parent:
+            parents.setdefault(type_item.name, set()).add(type_item.parent)
+
+        children = type_item.children if isinstance(type_item.children, Set) else {type_item.children}
+        for child in children:
+            parents.setdefault(child, set()).add(type_item.name)
+
+    ancestors: Dict[str, Set[str]] = dict()
+    for type_name in parents:
+        stack = [type_name]
+        ancestors[type_name] = set()
+
+        while stack:
+            for parent in parents.get(stack.pop(), set()):
+                if parent not in ancestors[type_name]:
+                    ancestors[type_name].add(parent)
+                    stack.append(parent)
+
+    return ancestors
+
+
+def get_mappable_sorts(flow_definition: FlowDefinition) -> Dict[str, Set[str]]:
+    reserved_types = [t.value for t in TypeOptions]
+    ancestors = get_type_ancestors(flow_definition)
+    mappable_sorts: Dict[str, Set[str]] = dict()
+
+    for item, item_types in get_item_types(flow_definition).items():
+        sorts = set(item_types)
+
+        for item_type in item_types:
+            sorts.update(ancestors.get(item_type, set()))
+
+        mappable_sorts[item] = {sort for sort in sorts if sort not in reserved_types}
+
+    return mappable_sorts
+
+
+def get_constraint_items(constraint: Constraint, transforms: List[Transform]) -> List[str]:
+    return constraint.get_variable_references_from_constraint(constraint.constraint, transforms)
+
+
+def get_step_items(step: Step) -> List[str]:
+    return [step.parameter(index) for index in range(len(step.parameters))] + list(step.maps)
+
+
+class RelevanceFrontier:
+    def __init__(self) -> None:
+        self.operators: Set[str] = set()
+        self.items: Set[str] = set()
+        self.constraints: Set[str] = set()
+
+        self.operator_queue: List[str] = list()
+        self.item_queue: List[str] = list()
+        self.constraint_queue: List[Constraint] = list()
+
+    def __bool__(self) -> bool:
+        return bool(self.operator_queue or self.item_queue or self.constraint_queue)
+
+    def add_operator(self, operator_name: Optional[str]) -> None:
+        if operator_name and operator_name not in self.operators:
+            self.operators.add(operator_name)
+            self.operator_queue.append(operator_name)
+
+    def add_item(self, item: str) -> None:
+        if item not in self.items:
+            self.items.add(item)
+            self.item_queue.append(item)
+
+    def add_constraint(self, constraint: Constraint) -> None:
+        if constraint.constraint not in self.constraints:
+            self.constraints.add(constraint.constraint)
+            self.constraint_queue.append(constraint)
+
+    def add_step(self, step: Step) -> None:
+        self.add_operator(step.name)
+
+        for item in get_step_items(step):
+            self.add_item(item)
+
+
+def get_items_of_sort(mappable_sorts: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    items_of_sort: Dict[str, Set[str]] = dict()
+
+    for item, sorts in mappable_sorts.items():
+        for sort in sorts:
+            items_of_sort.setdefault(sort, set()).add(item)
+
+    return items_of_sort
+
+
+def get_producers_and_consumers(
+    flow_definition: FlowDefinition,
+) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]], Dict[str, Set[str]]]:
+    producers: Dict[str, Set[str]] = dict()
+    consumers: Dict[str, Set[str]] = dict()
+    constraint_producers: Dict[str, Set[str]] = dict()
+
+    for operator in flow_definition.operators:
+        for item in unpack_list_of_signature_items(operator.inputs):
+            consumers.setdefault(item, set()).add(operator.name)
+
+        for outcome in get_outcomes(operator):
+            for item in unpack_list_of_signature_items(outcome.outcomes):
+                producers.setdefault(item, set()).add(operator.name)
+
+            for constraint in outcome.constraints:
+                constraint_producers.setdefault(constraint.constraint, set()).add(operator.name)
+
+    return producers, consumers, constraint_producers
+
+
+def get_mapping_sources(flow_definition: FlowDefinition, mapping_options: Set[MappingOptions]) -> Dict[str, Set[str]]:
+    mapping_sources: Dict[str, Set[str]] = dict()
+
+    for mapping in flow_definition.list_of_mappings:
+        mapping_sources.setdefault(mapping.target_name, set()).add(mapping.source_name)
+
+        if MappingOptions.transitive in mapping_options:
+            mapping_sources.setdefault(mapping.source_name, set()).add(mapping.target_name)
+
+    return mapping_sources
+
+
+def seed_goals(
+    frontier: RelevanceFrontier,
+    flow_definition: FlowDefinition,
+    items_of_sort: Dict[str, Set[str]],
+    consumers: Dict[str, Set[str]],
+) -> None:
+    goal_item: GoalItem
+    for goal_items in flow_definition.goal_items:
+        for goal_item in goal_items.goals if isinstance(goal_items.goals, List) else [goal_items.goals]:
+            goal = goal_item.goal_name
+
+            if isinstance(goal, Step):
+                frontier.add_step(goal)
+
+            elif isinstance(goal, Constraint):
+                frontier.add_constraint(goal)
+
+            elif goal_item.goal_type == GoalType.OPERATOR:
+                frontier.add_operator(goal)
+
+            else:
+                for item in items_of_sort.get(goal, set()) or {goal}:
+                    frontier.add_item(item)
+
+                    if goal_item.goal_type == GoalType.OBJECT_USED:
+                        for operator_name in consumers.get(item, set()):
+                            frontier.add_operator(operator_name)
+
+
+def seed_flow_definition(frontier: RelevanceFrontier, flow_definition: FlowDefinition) -> None:
+    # state constraints are not seeds: they change from turn to turn and are not part of the domain key
+    for operator_name in [flow_definition.starts_with, flow_definition.ends_with]:
+        frontier.add_operator(operator_name)
+
+    for partial_order in flow_definition.partial_orders:
+        frontier.add_operator(partial_order.antecedent)
+        frontier.add_operator(partial_order.consequent)
+
+    for manifest_constraint in flow_definition.manifest_constraints:
+        frontier.add_constraint(manifest_constraint.manifest)
+        frontier.add_constraint(manifest_constraint.constraint)
+
+    if flow_definition.reference is not None:
+        for reference_item in flow_definition.reference.plan:
+            if isinstance(reference_item, Step):
+                frontier.add_step(reference_item)
+            else:
+                frontier.add_constraint(reference_item)
+
+
+def get_relevant_operators_and_items(
+    flow_definition: FlowDefinition, transforms: List[Transform], **kwargs: Any
+) -> Tuple[Set[str], Set[str]]:
+    mapping_options: Set[MappingOptions] = set(kwargs["mapping_options"])
+
+    operator_map = {operator.name: operator for operator in flow_definition.operators}
+    mappable_sorts = get_mappable_sorts(flow_definition)
+    items_of_sort = get_items_of_sort(mappable_sorts)
+    mapping_sources = get_mapping_sources(flow_definition, mapping_options)
+    producers, consumers, constraint_producers = get_producers_and_consumers(flow_definition)
+
+    frontier = RelevanceFrontier()
+    seed_goals(frontier, flow_definition, items_of_sort, consumers)
+    seed_flow_definition(frontier, flow_definition)
+
+    while frontier:
+        while frontier.operator_queue:
+            operator = operator_map.get(frontier.operator_queue.pop(), None)
+
+            if operator is None:
+                continue
+
+            for item in unpack_list_of_signature_items(operator.inputs):
+                frontier.add_item(item)
+
+            for signature_item in operator.inputs:
+                for constraint in signature_item.constraints:
+                    frontier.add_constraint(constraint)
+
+        while frontier.constraint_queue:
+            constraint = frontier.constraint_queue.pop()
+
+            for item in get_constraint_items(constraint, transforms):
+                frontier.add_item(item)
+
+            for operator_name in constraint_producers.get(constraint.constraint, set()):
+                frontier.add_operator(operator_name)
+
+        while frontier.item_queue:
+            item = frontier.item_queue.pop()
+
+            for operator_name in producers.get(item, set()):
+                frontier.add_operator(operator_name)
+
+            for other_item in mapping_sources.get(item, set()):
+                frontier.add_item(other_item)
+
+            if MappingOptions.ignore_types not in mapping_options:
+                for sort in mappable_sorts.get(item, set()):
+                    for other_item in items_of_sort[sort]:
+                        frontier.add_item(other_item)
+
+    return frontier.operators, frontier.items
+
+
+def prune_flow_definition(
+    flow_definition: FlowDefinition, relevant_operators: Set[str], relevant_items: Set[str]
+) -> FlowDefinition:
+    def is_relevant_step(step: Step) -> bool:
+        if BasicOperations.which_basic(step.name) is not None:
+            return all(item in relevant_items for item in get_step_items(step))
+
+        return step.name in relevant_operators
+
+    operators = [o for o in flow_definition.operators if o.name in relevant_operators]
+    memory_items = [m for m in flow_definition.memory_items if m.item_id in relevant_items]
+
+    declared_items = {m.item_id for m in memory_items}
+    for operator in operators:
+        declared_items.update(p.item_id if isinstance(p, Parameter) else p for p in get_operator_parameters(operator))
+
+    for operator in flow_definition.operators:
+        if operator.name in relevant_operators:
+            continue
+
+        for param in get_operator_parameters(operator):
+            item = param.item_id if isinstance(param, Parameter) else param
+
+            if item in relevant_items and item not in declared_items:
+                declared_items.add(item)
+                memory_items.append(
+                    MemoryItem(
+                        item_id=item,
+                        item_type=param.item_type if isinstance(param, Parameter) else TypeOptions.ROOT.value,
+                    )
+                )
+
+    return flow_definition.model_copy(
+        update={
+            "operators": operators,
+            "memory_items": memory_items,
+            "slot_properties": [s for s in flow_definition.slot_properties if s.slot_name in relevant_items],
+            "list_of_mappings": [
+                m
+                for m in flow_definition.list_of_mappings
+                if m.source_name in relevant_items and m.target_name in relevant_items
+            ],
+            "history": [step for step in flow_definition.history if is_relevant_step(step)],
+        }
+    )
+
+
+def prune_irrelevant(compilation: Any, **kwargs: Any) -> None:
+    flow_definition: FlowDefinition = compilation.flow_definition
+    relevant_operators, relevant_items = get_relevant_operators_and_items(
+        flow_definition, compilation.cached_transforms, **kwargs
+    )
+
+    compilation.relevant_operators = relevant_operators
+    compilation.relevant_items = relevant_items
+    compilation.pruned_inputs = list()
+
+    for operator in flow_definition.operators:
+        if operator.name not in relevant_operators:
+            for item in unpack_list_of_signature_items(operator.inputs):
+                if item in relevant_items and item not in compilation.pruned_inputs:
+                    compilation.pruned_inputs.append(item)
+
+    compilation.flow_definition = prune_flow_definition(flow_definition, relevant_operators, relevant_items)
+
+
+def compile_pruned_inputs(compilation: Any, **kwargs: Any) -> None:
+    mapping_options: Set[MappingOptions] = set(kwargs["mapping_options"])
+
+    for item in compilation.pruned_inputs:
+        compilation.init.add(compilation.been_used(compilation.constant_map[item]))
+
+        if MappingOptions.prohibit_direct in mapping_options:
+            compilation.init.add(compilation.not_usable(compilation.constant_map[item]))
@@ -1,16 +1,16 @@
 import tarski.fstrips as fs
 from tarski.io import fstrips as iofs
 from tarski.syntax import land, neg
-from typing import List, Set, Dict, Any, Optional
+from typing import List, Set, Dict, Any, Optional, Tuple
 
 from nl2flow.debug.schemas import DebugFlag
+from nl2flow.compile.graph import DependencyGraph
+from nl2flow.compile.ir import FlowIR
 from nl2flow.compile.basic_compilations.compile_references.utils import get_token_predicate_name
 from nl2flow.compile.basic_compilations.utils import (
     get_type_of_constant,
     is_this_a_datum,
-    get_item_requirement_map,
     get_agent_to_slot_map,
-    get_item_source_map,
     generate_new_objects,
 )
 
@@ -89,8 +89,25 @@ def get_slots_as_not_last_resort(compilation: Any) -> List[str]:
     )
 
 
+def get_slot_desirability_index(compilation: Any) -> Tuple[Dict[str, Tuple[int, float]], Dict[str, Tuple[int, float]]]:
+    desirability_by_type: Dict[str, Tuple[int, float]] = dict()
+    desirability_by_name: Dict[str, Tuple[int, float]] = dict()
+
+    for index, slot in enumerate(compilation.flow_definition.slot_properties):
+        if slot.propagate_desirability:
+            desirability_by_type.setdefault(
+                get_type_of_constant(compilation, slot.slot_name),
+                (index, slot.slot_desirability),
+            )
+
+        desirability_by_name.setdefault(slot.slot_name, (index, slot.slot_desirability))
+
+    return desirability_by_type, desirability_by_name
+
+
 def get_goodness_map(compilation: Any, no_edit: bool = False) -> Dict[str, float]:
     not_slotfillable_types = get_not_slotfillable_types(compilation)
+    desirability_by_type, desirability_by_name = get_slot_desirability_index(compilation)
     goodness_map = dict()
 
     for constant in compilation.constant_map:
@@ -99,16 +116,13 @@ def get_goodness_map(compilation: Any, no_edit: bool = False) -> Dict[str, float
             if type_of_datum in not_slotfillable_types and not no_edit:
                 compilation.init.add(compilation.not_slotfillable(compilation.constant_map[constant]))
 
-            slot_goodness = SLOT_GOODNESS
-            for slot in compilation.flow_definition.slot_properties:
-                if type_of_datum == get_type_of_constant(compilation, slot.slot_name) and slot.propagate_desirability:
-                    slot_goodness = slot.slot_desirability
-                    break
-
-                if slot.slot_name == constant:
-                    slot_goodness = slot.slot_desirability
-                    break
+            candidates = [
+                desirability
+                for desirability in [desirability_by_type.get(type_of_datum), desirability_by_name.get(constant)]
+                if desirability is not None
+            ]
 
+            slot_goodness = min(candidates)[1] if candidates else SLOT_GOODNESS
             goodness_map[constant] = slot_goodness
 
             if not no_edit:
@@ -125,13 +139,14 @@ def compile_higher_cost_slots(compilation: Any, **kwargs: Any) -> None:
     slot_options: Set[SlotOptions] = set(kwargs["slot_options"])
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
     debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
+    ir: FlowIR = compilation.ir
 
     if SlotOptions.ordered in slot_options:
         not_slots = get_not_slots(compilation)
-        agent_to_slot_map = get_agent_to_slot_map(compilation)
 
-        for operator in compilation.flow_definition.operators:
-            slot_list = agent_to_slot_map[operator.name]
+        for operator in ir.operators:
+            operator_name = ir.name(operator.name)
+            slot_list = ir.get_slots(operator)
 
             for index, slot in enumerate(slot_list):
                 if slot not in not_slots:
@@ -163,9 +178,11 @@ def compile_higher_cost_slots(compilation: Any, **kwargs: Any) -> None:
                         compilation.mapped_to(compilation.constant_map[slot], compilation.constant_map[slot]),
                         compilation.known(
                             compilation.constant_map[slot],
-                            compilation.constant_map[MemoryState.UNCERTAIN.value]
-                            if LifeCycleOptions.confirm_on_slot in variable_life_cycle
-                            else compilation.constant_map[MemoryState.KNOWN.value],
+                            (
+                                compilation.constant_map[MemoryState.UNCERTAIN.value]
+                                if LifeCycleOptions.confirm_on_slot in variable_life_cycle
+                                else compilation.constant_map[MemoryState.KNOWN.value]
+                            ),
                         ),
                     ]
 
@@ -181,7 +198,7 @@ def compile_higher_cost_slots(compilation: Any, **kwargs: Any) -> None:
                         del_effect_list.append(compilation.ready_for_token())
 
                     compilation.problem.action(
-                        f"{BasicOperations.SLOT_FILLER.value}--for-{operator.name}{PARAMETER_DELIMITER}{slot}",
+                        f"{BasicOperations.SLOT_FILLER.value}--for-{operator_name}{PARAMETER_DELIMITER}{slot}",
                         parameters=[],
                         precondition=land(*precondition_list, flat=True),
                         effects=[fs.AddEffect(add_e) for add_e in add_effect_list]
@@ -206,9 +223,11 @@ def compile_higher_cost_slots(compilation: Any, **kwargs: Any) -> None:
             compilation.mapped_to(x, x),
             compilation.known(
                 x,
-                compilation.constant_map[MemoryState.UNCERTAIN.value]
-                if LifeCycleOptions.confirm_on_slot in variable_life_cycle
-                else compilation.constant_map[MemoryState.KNOWN.value],
+                (
+                    compilation.constant_map[MemoryState.UNCERTAIN.value]
+                    if LifeCycleOptions.confirm_on_slot in variable_life_cycle
+                    else compilation.constant_map[MemoryState.KNOWN.value]
+                ),
             ),
         ]
 
@@ -237,9 +256,8 @@ def compile_last_resort_slots(compilation: Any, **kwargs: Any) -> None:
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
     debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
 
+    graph: DependencyGraph = compilation.graph
     not_slots = get_not_slots(compilation)
-    source_map = get_item_source_map(compilation)
-    requirement_map = get_item_requirement_map(compilation)
     agent_to_slot_map = get_agent_to_slot_map(compilation)
     goodness_map = get_goodness_map(compilation, no_edit=True)
     not_slots_as_last_resort = get_slots_as_not_last_resort(compilation)
@@ -268,20 +286,24 @@ def compile_last_resort_slots(compilation: Any, **kwargs: Any) -> None:
                 ),
                 compilation.known(
                     compilation.constant_map[constant],
-                    compilation.constant_map[MemoryState.UNCERTAIN.value]
-                    if LifeCycleOptions.confirm_on_slot in variable_life_cycle
-                    else compilation.constant_map[MemoryState.KNOWN.value],
+                    (
+                        compilation.constant_map[MemoryState.UNCERTAIN.value]
+                        if LifeCycleOptions.confirm_on_slot in variable_life_cycle
+                        else compilation.constant_map[MemoryState.KNOWN.value]
+                    ),
                 ),
             ]
 
             if constant not in not_slots_as_last_resort:
-                for operator in source_map[constant]:
+                for operator in graph.get_sources(constant):
                     precondition_list.append(
                         compilation.has_done(
                             compilation.constant_map[operator],
-                            compilation.constant_map[HasDoneState.present.value]
-                            if debug_flag
-                            else compilation.constant_map[HasDoneState.past.value],
+                            (
+                                compilation.constant_map[HasDoneState.present.value]
+                                if debug_flag
+                                else compilation.constant_map[HasDoneState.past.value]
+                            ),
                         )
                     )
 
@@ -294,7 +316,7 @@ def compile_last_resort_slots(compilation: Any, **kwargs: Any) -> None:
                 )
 
             if SlotOptions.ordered in slot_options:
-                for operator_name in requirement_map[constant]:
+                for operator_name in graph.get_consumers(constant):
                     slot_list = agent_to_slot_map[operator_name]
                     index_of_current_slot = slot_list.index(constant)
 
@@ -350,14 +372,14 @@ def compile_all_together(compilation: Any, **kwargs: Any) -> None:
     optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
     debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
 
+    ir: FlowIR = compilation.ir
+    graph: DependencyGraph = compilation.graph
     not_slots = get_not_slots(compilation)
-    source_map = get_item_source_map(compilation)
-    agent_to_slot_map = get_agent_to_slot_map(compilation)
     not_slots_as_last_resort = get_slots_as_not_last_resort(compilation)
     goodness_map = get_goodness_map(compilation, no_edit=True)
 
-    for operator in compilation.flow_definition.operators:
-        slot_list = agent_to_slot_map[operator.name]
+    for operator in ir.operators:
+        slot_list = ir.get_slots(operator)
 
         if len(slot_list) > 0:
             precondition_list = []
@@ -394,9 +416,11 @@ def compile_all_together(compilation: Any, **kwargs: Any) -> None:
                             ),
                             compilation.known(
                                 compilation.constant_map[constant],
-                                compilation.constant_map[MemoryState.UNCERTAIN.value]
-                                if LifeCycleOptions.confirm_on_slot in variable_life_cycle
-                                else compilation.constant_map[MemoryState.KNOWN.value],
+                                (
+                                    compilation.constant_map[MemoryState.UNCERTAIN.value]
+                                    if LifeCycleOptions.confirm_on_slot in variable_life_cycle
+                                    else compilation.constant_map[MemoryState.KNOWN.value]
+                                ),
                             ),
                         ]
                     )
@@ -413,13 +437,15 @@ def compile_all_together(compilation: Any, **kwargs: Any) -> None:
                         add_effect_list.append(compilation.has_asked(compilation.constant_map[constant]))
 
                     if SlotOptions.last_resort in slot_options and constant not in not_slots_as_last_resort:
-                        for reference_operator in source_map[constant]:
+                        for reference_operator in graph.get_sources(constant):
                             precondition_list.append(
                                 compilation.has_done(
                                     compilation.constant_map[reference_operator],
-                                    compilation.constant_map[HasDoneState.present.value]
-                                    if debug_flag
-                                    else compilation.constant_map[HasDoneState.past.value],
+                                    (
+                                        compilation.constant_map[HasDoneState.present.value]
+                                        if debug_flag
+                                        else compilation.constant_map[HasDoneState.past.value]
+                                    ),
                                 )
                             )
 
@@ -430,7 +456,7 @@ def compile_all_together(compilation: Any, **kwargs: Any) -> None:
                 del_effect_list.append(compilation.ready_for_token())
 
             compilation.problem.action(
-                f"{BasicOperations.SLOT_FILLER.value}--for-{operator.name}{PARAMETER_DELIMITER}{PARAMETER_DELIMITER.join(params)}",
+                f"{BasicOperations.SLOT_FILLER.value}--for-{ir.name(operator.name)}{PARAMETER_DELIMITER}{PARAMETER_DELIMITER.join(params)}",
                 parameters=[],
                 precondition=land(*precondition_list, flat=True),
                 effects=[fs.AddEffect(add_e) for add_e in add_effect_list]
@@ -1,4 +1,5 @@
-from typing import List, Set, Dict, Union, Any, Optional
+from typing import List, Dict, Union, Any, Optional
+from nl2flow.compile.ir import FlowIR
 from nl2flow.compile.options import TypeOptions, MAX_RETRY, LOOKAHEAD
 from nl2flow.compile.schemas import MemoryItem, TypeItem, SlotProperty, Parameter, SignatureItem
 
@@ -21,62 +22,12 @@ def unpack_list_of_signature_items(signature_items: List[SignatureItem], require
 
 
 def get_agent_to_slot_map(compilation: Any) -> Dict[str, List[str]]:
-    agent_to_slot_map: Dict[str, List[str]] = dict()
-
-    for operator in compilation.flow_definition.operators:
-        agent_to_slot_map[operator.name] = unpack_list_of_signature_items(operator.inputs)
-
-    return agent_to_slot_map
-
-
-def get_item_requirement_map(compilation: Any) -> Dict[str, Set[str]]:
-    requirement_map: Dict[str, Set[str]] = dict()
-    agent_to_slot_map = get_agent_to_slot_map(compilation)
-
-    for constant in compilation.constant_map:
-        requirement_map[constant] = set()
-
-        for operator in compilation.flow_definition.operators:
-            if constant in agent_to_slot_map[operator.name]:
-                requirement_map[constant].add(operator.name)
-
-    return requirement_map
-
-
-def get_item_source_map(compilation: Any) -> Dict[str, Set[str]]:
-    source_map: Dict[str, Set[str]] = dict()
-
-    for constant in compilation.constant_map:
-        source_map[constant] = set()
-
-        for operator in compilation.flow_definition.operators:
-            outputs = operator.outputs[0]
-            params = unpack_list_of_signature_items(outputs.outcomes)
-
-            if constant in params:
-                source_map[constant].add(operator.name)
-
-            else:
-                for param in params:
-                    if any(
-                        [
-                            mapping.source_name == param and mapping.target_name == constant
-                            for mapping in compilation.flow_definition.list_of_mappings
-                        ]
-                    ):
-                        source_map[constant].add(operator.name)
-                        break
-
-    return source_map
+    ir: FlowIR = compilation.ir
+    return {ir.name(operator.name): ir.get_slots(operator) for operator in ir.operators}
 
 
 def get_type_of_constant(compilation: Any, constant: str) -> str:
-    for item in compilation.constant_map:
-        if item == constant:
-            constant_type: str = compilation.constant_map[item].sort.name
-            return constant_type
-
-    raise ValueError(f"Unknown constant: {constant}")
+    return str(compilation.symbols.get_type_of_constant(constant))
 
 
 def is_this_a_datum_type(type_name: str) -> bool:
@@ -136,23 +87,40 @@ def add_extra_objects(compilation: Any, **kwargs: Any) -> None:
 
 def add_type_item_to_type_map(compilation: Any, type_item: TypeItem) -> None:
     if type_item.parent and type_item.parent not in compilation.type_map:
-        compilation.type_map[type_item.parent] = compilation.lang.sort(type_item.parent, TypeOptions.ROOT.value)
+        compilation.symbols.add_type(
+            type_item.parent,
+            compilation.lang.sort(type_item.parent, TypeOptions.ROOT.value),
+            TypeOptions.ROOT.value,
+        )
 
     if type_item.name not in compilation.type_map:
         if type_item.parent:
-            compilation.type_map[type_item.name] = compilation.lang.sort(type_item.name, type_item.parent)
+            compilation.symbols.add_type(
+                type_item.name,
+                compilation.lang.sort(type_item.name, type_item.parent),
+                type_item.parent,
+            )
 
         else:
-            compilation.type_map[type_item.name] = compilation.lang.sort(type_item.name)
+            compilation.symbols.add_type(type_item.name, compilation.lang.sort(type_item.name))
 
 
 def add_memory_item_to_constant_map(compilation: Any, memory_item: Parameter) -> None:
-    type_name: str = memory_item.item_type if memory_item.item_type else TypeOptions.ROOT.value
+    add_item_to_constant_map(compilation, memory_item.item_id, memory_item.item_type)
+
 
-    add_type_item_to_type_map(compilation, TypeItem(name=type_name, parent=TypeOptions.ROOT.value))
+def add_item_to_constant_map(compilation: Any, item_id: str, item_type: Optional[str] = None) -> None:
+    type_name: str = item_type if item_type else TypeOptions.ROOT.value
 
-    if memory_item.item_id not in compilation.constant_map:
-        compilation.constant_map[memory_item.item_id] = compilation.lang.constant(memory_item.item_id, type_name)
+    if type_name not in compilation.type_map or TypeOptions.ROOT.value not in compilation.type_map:
+        add_type_item_to_type_map(compilation, TypeItem(name=type_name, parent=TypeOptions.ROOT.value))
+
+    if item_id not in compilation.constant_map:
+        compilation.symbols.add_constant(
+            item_id,
+            compilation.lang.constant(item_id, type_name),
+            type_name,
+        )
 
 
 def add_to_condition_list_pre_check(compilation: Any, parameter: Union[str, Parameter]) -> None:
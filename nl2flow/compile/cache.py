@@ -0,0 +1,77 @@
+from typing import Any, List, Tuple, Optional
+from pathlib import Path
+from nl2flow.compile.compilations import ClassicPDDL
+from nl2flow.compile.schemas import FlowDefinition, PDDL, Transform, Step
+from nl2flow.compile.utils import TransformRegistry
+from nl2flow.utility.cache_utility import TieredCache, digest
+
+import json
+
+COMPILE_CACHE_SIZE: int = 128
+DOMAIN_CACHE_SIZE: int = 16
+
+
+class CompilationCache(TieredCache[Tuple[PDDL, List[Transform]]]):
+    """
+    Content-addressed store of compiled PDDL. Entries are keyed by a stable digest
+    of the flow definition and every option that goes into the compilation, so that
+    an unchanged flow is never compiled twice. Can be shared across Flow objects.
+    """
+
+    def __init__(
+        self,
+        max_size: int = COMPILE_CACHE_SIZE,
+        cache_dir: Optional[Path] = None,
+        domain_cache_size: int = DOMAIN_CACHE_SIZE,
+    ) -> None:
+        TieredCache.__init__(self, max_size=max_size, cache_dir=cache_dir)
+        self.domains: TieredCache[ClassicPDDL] = TieredCache(max_size=domain_cache_size)
+
+    @staticmethod
+    def make_key(flow_definition: FlowDefinition, **kwargs: Any) -> str:
+        return digest(flow_definition, kwargs)
+
+    @staticmethod
+    def make_domain_key(flow_definition: FlowDefinition, **kwargs: Any) -> str:
+        history_in_domain = len(flow_definition.partial_orders) > 0 or any(
+            isinstance(goal_item.goal_name, Step)
+            for goal_items in flow_definition.goal_items
+            for goal_item in (goal_items.goals if isinstance(goal_items.goals, List) else [goal_items.goals])
+        )
+
+        domain_signature = flow_definition.model_dump(exclude={"memory_items", "history", "constraints"})
+        domain_signature["memory_items"] = [(item.item_id, item.item_type) for item in flow_definition.memory_items]
+
+        if history_in_domain:
+            domain_signature["history"] = flow_definition.history
+
+        return digest(domain_signature, kwargs)
+
+    def get(self, key: str) -> Optional[Tuple[PDDL, List[Transform]]]:
+        cached_item = TieredCache.get(self, key)
+
+        if cached_item is None:
+            return None
+
+        pddl, transforms = cached_item
+        return pddl.model_copy(), TransformRegistry(transforms)
+
+    def put(self, key: str, value: Tuple[PDDL, List[Transform]]) -> None:
+        pddl, transforms = value
+        TieredCache.put(self, key, (pddl.model_copy(), TransformRegistry(transforms)))
+
+    def serialize(self, value: Tuple[PDDL, List[Transform]]) -> str:
+        pddl, transforms = value
+        return json.dumps(
+            {
+                "pddl": pddl.model_dump(),
+                "transforms": [transform.model_dump() for transform in transforms],
+            }
+        )
+
+    def deserialize(self, serialized: str) -> Tuple[PDDL, List[Transform]]:
+        cached_item = json.loads(serialized)
+        return (
+            PDDL.model_validate(cached_item["pddl"]),
+            TransformRegistry(Transform.model_validate(transform) for transform in cached_item["transforms"]),
+        )
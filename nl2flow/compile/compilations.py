@@ -1,11 +1,21 @@
+import copy
 import tarski
 import tarski.fstrips as fs
 from tarski.theories import Theory
 from tarski.io import FstripsWriter
+from tarski.model import ExtensionalFunctionDefinition
 from abc import ABC, abstractmethod
-from typing import List, Set, Dict, Any, Tuple, Optional
+from contextlib import contextmanager
+from typing import List, Set, Dict, Any, Tuple, Optional, Callable, Iterator, TypeVar
 from nl2flow.debug.schemas import DebugFlag
+from nl2flow.compile.graph import DependencyGraph
+from nl2flow.compile.ir import FlowIR
+from nl2flow.compile.profiler import CompileProfiler
+from nl2flow.compile.symbols import SymbolTable
+from nl2flow.compile.utils import TransformRegistry
+from nl2flow.compile import emitter
 from nl2flow.compile.schemas import (
+    ClassicalPlanReference,
     FlowDefinition,
     PDDL,
     Transform,
@@ -40,6 +50,11 @@ from nl2flow.compile.basic_compilations.compile_goals import compile_goals
 from nl2flow.compile.basic_compilations.compile_history import compile_history
 from nl2flow.compile.basic_compilations.compile_constraints import compile_manifest_constraints
 from nl2flow.compile.basic_compilations.compile_labels import compile_label_maker
+from nl2flow.compile.basic_compilations.compile_relevance import (
+    prune_irrelevant,
+    prune_flow_definition,
+    compile_pruned_inputs,
+)
 
 from nl2flow.compile.basic_compilations.utils import (
     add_type_item_to_type_map,
@@ -59,6 +74,8 @@ from nl2flow.compile.options import (
     HasDoneState,
 )
 
+T = TypeVar("T")
+
 
 class Compilation(ABC):
     def __init__(self, flow_definition: FlowDefinition):
@@ -73,24 +90,18 @@ class ClassicPDDL(Compilation):
     def __init__(self, flow_definition: FlowDefinition):
         Compilation.__init__(self, flow_definition)
 
-        self.cached_transforms: List[Transform] = list()
+        self.cached_transforms: List[Transform] = TransformRegistry()
         self.flow_definition = FlowDefinition.transform(self.flow_definition, self.cached_transforms)
 
         name = self.flow_definition.name
-        lang = fs.language(name, theories=[Theory.EQUALITY, Theory.ARITHMETIC])
 
-        self.lang = lang
+        self.lang = self.create_language(name)
         self.cost = self.lang.function("total-cost", self.lang.Real)
 
-        self.problem = fs.create_fstrips_problem(
-            domain_name=f"{name}-domain",
-            problem_name=f"{name}-problem",
-            language=self.lang,
-        )
+        self.problem = self.create_problem(name)
         self.problem.metric(self.cost(), fs.OptimizationType.MINIMIZE)
 
-        # noinspection PyUnresolvedReferences
-        self.init = tarski.model.create(self.lang)
+        self.init = self.create_init()
 
         self.has_done: Any = None
         self.free: Any = None
@@ -115,93 +126,258 @@ class ClassicPDDL(Compilation):
         self.assigned_to: Any = None
         self.ready_for_token: Any = None
 
-        self.type_map: Dict[str, Any] = dict()
-        self.constant_map: Dict[str, Any] = dict()
+        self.symbols = SymbolTable()
+        self.ir: FlowIR = FlowIR()
+        self.graph: DependencyGraph = DependencyGraph(self.ir)
+
+        self.domain: Optional[str] = None
+        self.domain_init: Any = None
+        self.domain_transforms: List[Transform] = TransformRegistry()
+        self.domain_size: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+        self.relevant_operators: Optional[Set[str]] = None
+        self.relevant_items: Optional[Set[str]] = None
+        self.pruned_inputs: List[str] = list()
+
+        self.base: Optional["ClassicPDDL"] = None
+        self.language_depth: int = 0
+
+        self.profiler: Optional[CompileProfiler] = None
+
+    @property
+    def type_map(self) -> Dict[str, Any]:
+        return self.symbols.type_map
+
+    @property
+    def constant_map(self) -> Dict[str, Any]:
+        return self.symbols.constant_map
 
     def compile(self, **kwargs: Any) -> Tuple[PDDL, List[Transform]]:
-        used_labels_in_memory = self.construct_state_predicates(**kwargs)
+        self.run(self.compile_domain, **kwargs)
+        return self.run(self.compile_problem, **kwargs)
+
+    def run(self, compile_pass: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.profiler is None:
+            return compile_pass(*args, **kwargs)
+
+        with self.profiler.phase(compile_pass.__name__, self) as phase:
+            result = compile_pass(*args, **kwargs)
 
+            if isinstance(result, str):
+                phase.output_size = len(result)
+
+            return result
+
+    def compile_domain(self, **kwargs: Any) -> None:
         debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
         slot_options: Set[SlotOptions] = set(kwargs["slot_options"])
         optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
 
+        if NL2FlowOptions.prune_irrelevant in optimization_options:
+            self.run(prune_irrelevant, self, **kwargs)
+
+        self.symbols.add_operators(self.flow_definition.operators)
+        self.run(self.construct_ir)
+        self.run(self.construct_state_predicates, **kwargs)
+
         use_given_operators_only: bool = kwargs.get("use_given_operators_only", False)
 
-        compile_operators(self, **kwargs)
-        compile_confirmation(self, **kwargs)
-        add_extra_objects(self, **kwargs)
+        self.run(compile_operators, self, **kwargs)
+
+        if NL2FlowOptions.prune_irrelevant in optimization_options:
+            self.run(compile_pruned_inputs, self, **kwargs)
+
+        self.run(compile_confirmation, self, **kwargs)
+        self.run(add_extra_objects, self, **kwargs)
 
         if len(slot_options) > 1:
-            compile_new_object_maps(self, **kwargs)
-            get_goodness_map(self)
+            self.run(compile_new_object_maps, self, **kwargs)
+            self.run(get_goodness_map, self)
 
         if SlotOptions.higher_cost in slot_options:
-            compile_higher_cost_slots(self, **kwargs)
+            self.run(compile_higher_cost_slots, self, **kwargs)
 
         if SlotOptions.last_resort in slot_options:
-            compile_last_resort_slots(self, **kwargs)
+            self.run(compile_last_resort_slots, self, **kwargs)
 
         if SlotOptions.all_together in slot_options:
-            compile_all_together(self, **kwargs)
+            self.run(compile_all_together, self, **kwargs)
 
-        compile_declared_mappings(self, **kwargs)
+        self.run(compile_declared_mappings, self, **kwargs)
 
         if MappingOptions.ignore_types not in set(kwargs["mapping_options"]):
-            compile_typed_mappings(self, **kwargs)
+            self.run(compile_typed_mappings, self, **kwargs)
+
+        self.run(compile_goals, self, **kwargs)
+        self.run(compile_manifest_constraints, self)
+
+        if NL2FlowOptions.label_production in optimization_options and not use_given_operators_only:
+            self.run(compile_label_maker, self)
 
-        compile_goals(self, **kwargs)
-        compile_manifest_constraints(self)
-        used_labels = compile_history(self, **kwargs)
+        if debug_flag and self.flow_definition.reference is not None:
+            self.compile_reference(**kwargs)
+
+        self.domain_init = self.copy_init(self.init)
+        self.domain_transforms = TransformRegistry(self.cached_transforms)
+        self.domain_size = self.get_domain_size()
+        self.domain = None
+
+    def compile_reference(self, **kwargs: Any) -> None:
+        debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
+
+        if debug_flag == DebugFlag.TOKENIZE:
+            self.run(compile_reference_tokenize, self, flow_definition=self.flow_definition, **kwargs)
+        elif debug_flag == DebugFlag.DIRECT:
+            self.run(compile_reference_basic, self, flow_definition=self.flow_definition, **kwargs)
+
+    def compile_problem(self, **kwargs: Any) -> Tuple[PDDL, List[Transform]]:
+        optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
+
+        used_labels_in_memory = self.run(self.construct_memory, **kwargs)
+        used_labels = self.run(compile_history, self, **kwargs)
 
         used_labels_in_memory.extend(used_labels)
 
         if NL2FlowOptions.label_production in optimization_options:
-            if use_given_operators_only:
-                for label_index in range(0, MAX_LABELS + 1):
-                    temp_label = get_token_predicate_name(index=label_index, token="var")
+            self.run(self.construct_label_availability, used_labels_in_memory, **kwargs)
 
-                    if temp_label not in used_labels_in_memory:
-                        self.init.add(self.available(self.constant_map[temp_label]))
+        self.init.set(self.cost(), 0)
+        self.problem.init = self.init
 
-            else:
-                label_0 = get_token_predicate_name(index=0, token="var")
-                self.init.add(self.available(self.constant_map[label_0]))
+        if self.domain is None or self.get_domain_size() != self.domain_size:
+            self.domain = self.run(self.print_domain)
+
+        return PDDL(domain=self.domain, problem=self.run(self.print_problem)), self.cached_transforms
+
+    def copy_for_problem(self) -> "ClassicPDDL":
+        compilation = copy.copy(self)
+        compilation.problem = copy.copy(self.problem)
+        compilation.symbols = self.symbols.copy()
+        return compilation
+
+    def update_problem(self, flow_definition: FlowDefinition, **kwargs: Any) -> Optional[Tuple[PDDL, List[Transform]]]:
+        self.cached_transforms = TransformRegistry(self.domain_transforms)
+        self.flow_definition = self.flow_definition.model_copy(
+            update={
+                "memory_items": [item.transform(item, self.cached_transforms) for item in flow_definition.memory_items],
+                "history": [item.transform(item, self.cached_transforms) for item in flow_definition.history],
+                "constraints": [item.transform(item, self.cached_transforms) for item in flow_definition.constraints],
+            }
+        )
 
-                for label_index in range(1, MAX_LABELS + 1):
-                    temp_label = get_token_predicate_name(index=label_index, token="var")
+        if self.relevant_operators is not None and self.relevant_items is not None:
+            self.flow_definition = prune_flow_definition(
+                self.flow_definition, self.relevant_operators, self.relevant_items
+            )
 
-                    if temp_label not in used_labels_in_memory:
-                        label_0 = temp_label
-                        break
+        self.init = self.copy_init(self.domain_init)
+        compilation = self.compile_problem(**kwargs)
 
-                self.init.add(self.available(self.constant_map[label_0]))
+        if self.get_domain_size() != self.domain_size:
+            return None
 
-                for label in range(1, MAX_LABELS + 1):
-                    label_name = get_token_predicate_name(index=label, token="var")
-                    previous_label = get_token_predicate_name(index=label - 1, token="var")
+        return compilation
 
-                    if label_name not in used_labels_in_memory:
-                        self.init.add(
-                            self.label_ladder(self.constant_map[previous_label], self.constant_map[label_name])
-                        )
+    def copy_for_reference(self) -> "ClassicPDDL":
+        compilation = self.copy_for_problem()
+        compilation.problem.actions = copy.copy(self.problem.actions)
+        compilation.domain = None
+        compilation.base = self
+        return compilation
 
-                compile_label_maker(self)
+    def update_reference(self, reference: ClassicalPlanReference, **kwargs: Any) -> Tuple[PDDL, List[Transform]]:
+        """
+        Compile a reference plan on top of a domain that was compiled without
+        one, as the last pass of the domain would have. Call this on a copy
+        from copy_for_reference, inside keep_language on the original, since
+        the reference can add symbols to the shared language.
+        """
 
-        if debug_flag == DebugFlag.TOKENIZE:
-            compile_reference_tokenize(self, flow_definition=self.flow_definition, **kwargs)
-        elif debug_flag == DebugFlag.DIRECT:
-            compile_reference_basic(self, flow_definition=self.flow_definition, **kwargs)
+        if self.base is None or self.base.language_depth == 0:
+            raise ValueError("update_reference needs a copy_for_reference copy, inside keep_language on its base.")
 
-        self.init.set(self.cost(), 0)
-        self.problem.init = self.init
+        self.cached_transforms = TransformRegistry(self.domain_transforms)
+        self.flow_definition = self.flow_definition.model_copy(
+            update={"reference": reference.transform(reference, self.cached_transforms)}
+        )
+
+        for index in range(len(reference.plan) + 1):
+            get_token_predicate(self, index)
+
+        self.init = self.copy_init(self.domain_init)
+        self.compile_reference(**kwargs)
+
+        return self.compile_problem(**kwargs)
+
+    @contextmanager
+    def keep_language(self) -> Iterator[None]:
+        saved = {key: copy.copy(value) for key, value in vars(self.lang).items() if isinstance(value, dict)}
+        self.language_depth += 1
 
+        try:
+            yield
+
+        finally:
+            self.language_depth -= 1
+
+            for key, value in saved.items():
+                container = getattr(self.lang, key)
+                container.clear()
+                container.update(value)
+
+    def get_domain_size(self) -> Tuple[int, int, int, int]:
+        return (
+            len(self.constant_map),
+            len(self.type_map),
+            len(list(self.lang.predicates)),
+            len(self.problem.actions),
+        )
+
+    def count_init_facts(self) -> int:
+        return sum(len(extension) for extension in self.init.predicate_extensions.values()) + sum(
+            len(extension.data) for extension in self.init.function_extensions.values()
+        )
+
+    def create_language(self, name: str) -> Any:
+        return fs.language(name, theories=[Theory.EQUALITY, Theory.ARITHMETIC])
+
+    def create_problem(self, name: str) -> Any:
+        return fs.create_fstrips_problem(
+            domain_name=f"{name}-domain",
+            problem_name=f"{name}-problem",
+            language=self.lang,
+        )
+
+    def create_init(self) -> Any:
+        # noinspection PyUnresolvedReferences
+        return tarski.model.create(self.lang)
+
+    def print_domain(self) -> str:
+        writer = FstripsWriter(self.problem)
+        return str(writer.print_domain(constant_objects=list(self.constant_map.values()))).replace(
+            " :numeric-fluents", ""
+        )
+
+    def print_problem(self) -> str:
         writer = FstripsWriter(self.problem)
-        domain = writer.print_domain(constant_objects=list(self.constant_map.values())).replace(" :numeric-fluents", "")
-        problem = writer.print_instance(constant_objects=list(self.constant_map.values()))
+        return str(writer.print_instance(constant_objects=list(self.constant_map.values())))
 
-        return PDDL(domain=domain, problem=problem), self.cached_transforms
+    def copy_init(self, init: Any) -> Any:
+        new_init = self.create_init()
+        new_init.predicate_extensions = {key: set(extension) for key, extension in init.predicate_extensions.items()}
 
-    def construct_state_predicates(self, **kwargs: Any) -> List[str]:
+        for key, extension in init.function_extensions.items():
+            new_extension = ExtensionalFunctionDefinition()
+            new_extension.data = dict(extension.data)
+            new_init.function_extensions[key] = new_extension
+
+        return new_init
+
+    def construct_ir(self) -> None:
+        self.ir = FlowIR.from_flow_definition(self.flow_definition)
+        self.graph = DependencyGraph(self.ir)
+
+    def construct_state_predicates(self, **kwargs: Any) -> None:
         debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
         optimization_options: Set[NL2FlowOptions] = set(kwargs["optimization_options"])
 
@@ -336,13 +512,12 @@ class ClassicPDDL(Compilation):
         for type_item in self.flow_definition.type_hierarchy:
             add_type_item_to_type_map(self, type_item)
 
-        used_labels = self.construct_memory(**kwargs)
+        for memory_item in self.flow_definition.memory_items:
+            add_memory_item_to_constant_map(self, memory_item)
 
         if NL2FlowOptions.allow_retries in optimization_options:
             add_retry_states(self)
 
-        return used_labels
-
     def construct_labels(self) -> None:
         self.available = self.lang.predicate(
             "available",
@@ -387,8 +562,6 @@ class ClassicPDDL(Compilation):
         used_labels = []
 
         for memory_item in self.flow_definition.memory_items:
-            add_memory_item_to_constant_map(self, memory_item)
-
             if memory_item.item_state != MemoryState.UNKNOWN:
                 self.init.add(
                     self.known(
@@ -409,3 +582,58 @@ class ClassicPDDL(Compilation):
                     )
 
         return used_labels
+
+    def construct_label_availability(self, used_labels: List[str], **kwargs: Any) -> None:
+        use_given_operators_only: bool = kwargs.get("use_given_operators_only", False)
+
+        if use_given_operators_only:
+            for label_index in range(0, MAX_LABELS + 1):
+                temp_label = get_token_predicate_name(index=label_index, token="var")
+
+                if temp_label not in used_labels:
+                    self.init.add(self.available(self.constant_map[temp_label]))
+
+        else:
+            label_0 = get_token_predicate_name(index=0, token="var")
+            self.init.add(self.available(self.constant_map[label_0]))
+
+            for label_index in range(1, MAX_LABELS + 1):
+                temp_label = get_token_predicate_name(index=label_index, token="var")
+
+                if temp_label not in used_labels:
+                    label_0 = temp_label
+                    break
+
+            self.init.add(self.available(self.constant_map[label_0]))
+
+            for label in range(1, MAX_LABELS + 1):
+                label_name = get_token_predicate_name(index=label, token="var")
+                previous_label = get_token_predicate_name(index=label - 1, token="var")
+
+                if label_name not in used_labels:
+                    self.init.add(self.label_ladder(self.constant_map[previous_label], self.constant_map[label_name]))
+
+
+class DirectPDDL(ClassicPDDL):
+    def create_language(self, name: str) -> Any:
+        return emitter.Language(name)
+
+    def create_problem(self, name: str) -> Any:
+        return emitter.Problem(self.lang, domain_name=f"{name}-domain", problem_name=f"{name}-problem")
+
+    def create_init(self) -> Any:
+        return emitter.Model(self.lang)
+
+    def print_domain(self) -> str:
+        return emitter.print_domain(self.problem, constant_objects=list(self.constant_map.values()))
+
+    def print_problem(self) -> str:
+        return emitter.print_problem(self.problem, constant_objects=list(self.constant_map.values()))
+
+    def copy_init(self, init: Any) -> Any:
+        return init.copy()
+
+    def count_init_facts(self) -> int:
+        return sum(len(extension) for extension in self.init.predicate_extensions.values()) + sum(
+            len(extension) for extension in self.init.function_extensions.values()
+        )
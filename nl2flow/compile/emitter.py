@@ -0,0 +1,562 @@
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from tarski.syntax import Formula, CompoundFormula, Tautology, Contradiction
+from tarski.fstrips import AddEffect, DelEffect
+from tarski.fstrips.action import AdditiveActionCost
+
+TAB = " " * 4
+
+DOMAIN_TEMPLATE = """;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;
+;;; Domain file automatically generated by the NL2Flow PDDL emitter
+;;;
+;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;
+
+(define (domain {domain_name})
+    (:requirements {requirements})
+    (:types
+        {types}
+    )
+
+    (:constants
+        {constants}
+    )
+
+    (:predicates
+        {predicates}
+    )
+
+    (:functions
+        {functions}
+    )
+
+    {derived}
+
+    {actions}
+)
+"""
+
+PROBLEM_TEMPLATE = """;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;
+;;; Instance file automatically generated by the NL2Flow PDDL emitter
+;;;
+;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;
+
+(define (problem {problem_name})
+    (:domain {domain_name})
+
+    (:objects
+        {objects}
+    )
+
+    (:init
+        {init}
+    )
+
+    (:goal
+        {goal}
+    )
+
+    {constraints}
+    {domain_bounds}
+    {metric}
+)
+"""
+
+ACTION_TEMPLATE = """
+    (:action {name}
+     :parameters ({parameters})
+     :precondition {precondition}
+     :effect {effect}
+    )
+"""
+
+REQUIREMENTS = [":typing", ":equality", ":action-costs"]
+
+
+class Sort:
+    __slots__ = ("name", "parent", "ancestors", "builtin", "cast")
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional[Sort] = None,
+        builtin: bool = False,
+        cast: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        self.ancestors: Set[str] = set() if parent is None else {parent.name} | parent.ancestors
+        self.builtin = builtin
+        self.cast = cast
+
+    def is_subtype_of(self, sort: Sort) -> bool:
+        return self is sort or sort.name in self.ancestors
+
+    def __repr__(self) -> str:
+        return f"Sort({self.name})"
+
+
+class Term:
+    __slots__ = ("symbol", "sort")
+
+    def __init__(self, symbol: Any, sort: Sort) -> None:
+        self.symbol = symbol
+        self.sort = sort
+
+    @property
+    def text(self) -> str:
+        return str(self.symbol)
+
+    def __eq__(self, other: Any) -> Atom:  # type: ignore
+        return Atom(EQUALITY, (self, other))
+
+    def __hash__(self) -> int:
+        return id(self)
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+class Constant(Term):
+    __slots__ = ()
+
+    @property
+    def name(self) -> Any:
+        return self.symbol
+
+
+class Variable(Term):
+    __slots__ = ()
+
+    @property
+    def text(self) -> str:
+        return self.symbol if self.symbol.startswith("?") else f"?{self.symbol}"
+
+
+class FunctionTerm(Term):
+    __slots__ = ("function", "subterms")
+
+    def __init__(self, function: Function, subterms: Tuple[Term, ...]) -> None:
+        Term.__init__(self, function, function.codomain)
+        self.function = function
+        self.subterms = subterms
+
+    @property
+    def text(self) -> str:
+        return f"({self.function.symbol} {print_terms(self.subterms)})"
+
+
+class Predicate:
+    __slots__ = ("symbol", "sort", "builtin")
+
+    def __init__(self, symbol: str, *sorts: Sort, builtin: bool = False) -> None:
+        self.symbol = symbol
+        self.sort = sorts
+        self.builtin = builtin
+
+    @property
+    def name(self) -> str:
+        return self.symbol
+
+    @property
+    def arity(self) -> int:
+        return len(self.sort)
+
+    def __call__(self, *args: Term) -> Atom:
+        return Atom(self, args)
+
+    def __repr__(self) -> str:
+        return f"{self.symbol}/{self.arity}"
+
+
+class Function:
+    __slots__ = ("symbol", "domain", "codomain", "builtin")
+
+    def __init__(self, symbol: str, *sorts: Sort) -> None:
+        self.symbol = symbol
+        self.domain = sorts[:-1]
+        self.codomain = sorts[-1]
+        self.builtin = False
+
+    @property
+    def name(self) -> str:
+        return self.symbol
+
+    @property
+    def sort(self) -> Tuple[Sort, ...]:
+        return self.domain + (self.codomain,)
+
+    @property
+    def arity(self) -> int:
+        return len(self.domain)
+
+    def __call__(self, *args: Term) -> FunctionTerm:
+        if len(args) != self.arity:
+            raise ValueError(f"Arity mismatch on {self.symbol}: expected {self.arity}, got {len(args)}.")
+
+        return FunctionTerm(self, args)
+
+
+EQUALITY = Predicate("=", builtin=True)
+
+
+class Atom(Formula):
+    def __init__(self, predicate: Predicate, subterms: Tuple[Term, ...]) -> None:
+        if not predicate.builtin:
+            if len(subterms) != predicate.arity:
+                raise ValueError(f"Arity mismatch on {predicate.symbol}: expected {predicate.arity}, got {subterms}.")
+
+            for term, expected_sort in zip(subterms, predicate.sort):
+                if not isinstance(term, Term):
+                    raise ValueError(f"Wrong argument for atomic formula: {term}")
+
+                if not term.sort.is_subtype_of(expected_sort):
+                    raise ValueError(f"Sort mismatch on {term}: expected {expected_sort.name}, got {term.sort.name}.")
+
+        self.predicate = predicate
+        self.subterms = subterms
+        self.key = (predicate.symbol, tuple(term.text for term in subterms))
+
+    @property
+    def symbol(self) -> Predicate:
+        return self.predicate
+
+    @property
+    def text(self) -> str:
+        return f"({self.predicate.symbol} {' '.join(self.key[1])})"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Atom) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __str__(self) -> str:
+        return self.text
+
+    __repr__ = __str__
+
+
+class Language:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+        self._sorts: Dict[str, Sort] = dict()
+        self._predicates: Dict[str, Predicate] = dict()
+        self._functions: Dict[str, Function] = dict()
+        self._constants: Dict[str, Constant] = dict()
+
+        self._object = self._attach_sort(Sort("object", builtin=True))
+
+        real = self._attach_sort(Sort("Real", builtin=True, cast=float))
+        integer = self._attach_sort(Sort("Integer", parent=real, builtin=True, cast=int))
+        self._attach_sort(Sort("Natural", parent=integer, builtin=True, cast=int))
+
+    def _attach_sort(self, sort: Sort) -> Sort:
+        if sort.name in self._sorts:
+            raise ValueError(f"Duplicate definition of sort {sort.name}.")
+
+        self._sorts[sort.name] = sort
+        return sort
+
+    def _retrieve_sort(self, sort: Union[Sort, str]) -> Sort:
+        if isinstance(sort, Sort):
+            return sort
+
+        if sort not in self._sorts:
+            raise ValueError(f"Unknown sort: {sort}")
+
+        return self._sorts[sort]
+
+    @property
+    def Real(self) -> Sort:
+        return self._sorts["Real"]
+
+    @property
+    def Integer(self) -> Sort:
+        return self._sorts["Integer"]
+
+    @property
+    def sorts(self) -> List[Sort]:
+        return list(self._sorts.values())
+
+    @property
+    def predicates(self) -> List[Predicate]:
+        return list(self._predicates.values())
+
+    @property
+    def functions(self) -> List[Function]:
+        return list(self._functions.values())
+
+    def constants(self) -> List[Constant]:
+        return list(self._constants.values())
+
+    def get_sort(self, name: str) -> Sort:
+        return self._retrieve_sort(name)
+
+    def has_function(self, name: str) -> bool:
+        return name in self._functions
+
+    def sort(self, name: str, parent: Union[Sort, str, None] = None) -> Sort:
+        parent_sort = self._object if parent is None else self._retrieve_sort(parent)
+        return self._attach_sort(Sort(name, parent=parent_sort))
+
+    def constant(self, name: Any, sort: Union[Sort, str]) -> Constant:
+        constant_sort = self._retrieve_sort(sort)
+
+        if constant_sort.builtin and constant_sort.cast is not None:
+            return Constant(constant_sort.cast(name), constant_sort)
+
+        if name in self._constants:
+            raise ValueError(f"Duplicate definition of constant {name}.")
+
+        constant = Constant(name, constant_sort)
+        self._constants[name] = constant
+        return constant
+
+    def variable(self, name: str, sort: Union[Sort, str]) -> Variable:
+        return Variable(name, self._retrieve_sort(sort))
+
+    def predicate(self, name: str, *sorts: Union[Sort, str]) -> Predicate:
+        if name in self._predicates:
+            raise ValueError(f"Duplicate definition of predicate {name}.")
+
+        predicate = Predicate(name, *[self._retrieve_sort(sort) for sort in sorts])
+        self._predicates[name] = predicate
+        return predicate
+
+    def function(self, name: str, *sorts: Union[Sort, str]) -> Function:
+        if name in self._functions:
+            raise ValueError(f"Duplicate definition of function {name}.")
+
+        function = Function(name, *[self._retrieve_sort(sort) for sort in sorts])
+        self._functions[name] = function
+        return function
+
+
+class Action:
+    __slots__ = ("name", "parameters", "precondition", "effects", "cost")
+
+    def __init__(
+        self,
+        name: str,
+        parameters: List[Variable],
+        precondition: Formula,
+        effects: List[Any],
+        cost: Optional[AdditiveActionCost] = None,
+    ) -> None:
+        self.name = name
+        self.parameters = parameters
+        self.precondition = precondition
+        self.effects = effects
+        self.cost = cost
+
+
+class Problem:
+    def __init__(self, language: Language, domain_name: str, problem_name: str) -> None:
+        self.language = language
+        self.domain_name = domain_name
+        self.name = problem_name
+
+        self.actions: Dict[str, Action] = dict()
+        self.goal: Optional[Formula] = None
+        self.init: Optional[Model] = None
+        self.plan_metric: Optional[Tuple[Term, Any]] = None
+
+    def action(
+        self,
+        name: str,
+        parameters: List[Variable],
+        precondition: Formula,
+        effects: List[Any],
+        cost: Optional[AdditiveActionCost] = None,
+    ) -> Action:
+        if name in self.actions:
+            raise ValueError(f"Duplicate definition of action {name}.")
+
+        self.actions[name] = Action(name, parameters, precondition, effects, cost)
+        return self.actions[name]
+
+    def metric(self, opt_expression: Term, opt_type: Any) -> None:
+        self.plan_metric = (opt_expression, opt_type)
+
+
+class Model:
+    def __init__(self, language: Language) -> None:
+        self.language = language
+        self.predicate_extensions: Dict[str, Set[Tuple[str, ...]]] = dict()
+        self.function_extensions: Dict[str, Dict[Tuple[str, ...], Any]] = dict()
+
+    def add(self, atom: Union[Atom, Predicate], *args: Term) -> None:
+        if isinstance(atom, Predicate):
+            atom = atom(*args)
+
+        if atom.predicate.builtin:
+            raise ValueError(f"Cannot add builtin symbol {atom.predicate.symbol} to the initial state.")
+
+        for term in atom.subterms:
+            if not isinstance(term, Constant):
+                raise ValueError(f"Subterms of {atom} need to be constants.")
+
+        self.predicate_extensions.setdefault(atom.predicate.symbol, set()).add(atom.key[1])
+
+    def set(self, term: FunctionTerm, value: Any) -> None:
+        for subterm in term.subterms:
+            if not isinstance(subterm, Constant):
+                raise ValueError(f"Subterms of {term.text} need to be constants.")
+
+        codomain = term.function.codomain
+        if isinstance(value, Constant):
+            value = value.symbol
+
+        elif codomain.cast is not None:
+            value = codomain.cast(value)
+
+        point = tuple(subterm.text for subterm in term.subterms)
+        self.function_extensions.setdefault(term.function.symbol, dict())[point] = value
+
+    def copy(self) -> Model:
+        new_model = Model(self.language)
+        new_model.predicate_extensions = {key: set(extension) for key, extension in self.predicate_extensions.items()}
+        new_model.function_extensions = {key: dict(extension) for key, extension in self.function_extensions.items()}
+        return new_model
+
+
+def print_terms(terms: Tuple[Term, ...]) -> str:
+    return " ".join(term.text for term in terms)
+
+
+def print_type(sort: Sort) -> str:
+    translations = {"Integer": "int", "Natural": "int", "Real": "number"}
+    return translations.get(sort.name, sort.name)
+
+
+def print_signature(sorts: Tuple[Sort, ...]) -> str:
+    return " ".join(f"?x{index} - {print_type(sort)}" for index, sort in enumerate(sorts, 1))
+
+
+def print_formula(formula: Any) -> str:
+    if isinstance(formula, Atom):
+        return formula.text
+
+    elif isinstance(formula, CompoundFormula):
+        return f"({formula.connective} {' '.join(print_formula(item) for item in formula.subformulas)})"
+
+    elif isinstance(formula, Tautology) or formula is None:
+        return "(and )"
+
+    elif isinstance(formula, Contradiction):
+        return "(= 0 1)"
+
+    raise TypeError(f"Unexpected element type: {formula}")
+
+
+def print_effect(effect: Any, indentation: int) -> str:
+    if isinstance(effect, AddEffect):
+        unconditional_effect = effect.atom.text
+
+    elif isinstance(effect, DelEffect):
+        unconditional_effect = f"(not {effect.atom.text})"
+
+    else:
+        raise TypeError(f"Unexpected element type: {effect}")
+
+    if isinstance(effect.condition, Tautology):
+        return indentation * TAB + unconditional_effect
+
+    return indentation * TAB + f"(when {print_formula(effect.condition)} {unconditional_effect})"
+
+
+def print_effects(action: Action) -> str:
+    if not action.effects and action.cost is None:
+        return "(and )"
+
+    effects = [print_effect(effect, 2) for effect in action.effects]
+
+    if action.cost:
+        effects.append(2 * TAB + f"(increase (total-cost ) {action.cost.addend.text})")
+
+    return "(and\n{})".format("\n".join(effects))
+
+
+def print_action(action: Action) -> str:
+    return ACTION_TEMPLATE.format(
+        name=action.name,
+        parameters=" ".join(f"{parameter.text} - {parameter.sort.name}" for parameter in action.parameters),
+        precondition=print_formula(action.precondition),
+        effect=print_effects(action),
+    )
+
+
+def print_objects(constants: List[Constant]) -> str:
+    constants_by_sort: Dict[str, List[str]] = defaultdict(list)
+
+    for constant in constants:
+        constants_by_sort[constant.sort.name].append(constant.symbol)
+
+    elements = [f"{' '.join(sorted(constants_by_sort[sort]))} - {sort}" for sort in sorted(constants_by_sort)]
+    return f"\n{2 * TAB}".join(elements)
+
+
+def print_domain(problem: Problem, constant_objects: List[Constant]) -> str:
+    language = problem.language
+
+    types = [
+        f"{sort.name} - {print_type(sort.parent)}" if sort.parent is not None else sort.name
+        for sort in language.sorts
+        if not sort.builtin
+    ] + ["object"]
+
+    predicates = [
+        f"({predicate.symbol} {print_signature(predicate.sort)})"
+        for predicate in language.predicates
+        if not predicate.builtin
+    ]
+
+    functions = [
+        f"({function.symbol} {print_signature(function.domain)}) - {print_type(function.codomain)}"
+        for function in language.functions
+        if not function.builtin
+    ]
+
+    return DOMAIN_TEMPLATE.format(
+        domain_name=problem.domain_name,
+        requirements=" ".join(REQUIREMENTS),
+        types=f"\n{2 * TAB}".join(types),
+        constants=print_objects(constant_objects),
+        predicates=f"\n{2 * TAB}".join(predicates),
+        functions=f"\n{2 * TAB}".join(functions),
+        derived="",
+        actions="\n".join(print_action(action) for action in problem.actions.values()),
+    )
+
+
+def print_problem(problem: Problem, constant_objects: List[Constant]) -> str:
+    domain_constants = {id(constant) for constant in constant_objects}
+    instance_objects = [constant for constant in problem.language.constants() if id(constant) not in domain_constants]
+
+    elements = list()
+    if problem.init is not None:
+        for function_name, extension in problem.init.function_extensions.items():
+            for point, value in extension.items():
+                elements.append(f"(= ({function_name} {' '.join(point)}) {value})")
+
+        for predicate_name, predicate_extension in problem.init.predicate_extensions.items():
+            for point in predicate_extension:
+                elements.append(f"({predicate_name} {' '.join(point)})")
+
+    metric = ""
+    if problem.plan_metric is not None:
+        opt_expression, opt_type = problem.plan_metric
+        metric = f"(:metric {opt_type} {opt_expression.text})"
+
+    return PROBLEM_TEMPLATE.format(
+        problem_name=problem.name,
+        domain_name=problem.domain_name,
+        objects=print_objects(instance_objects),
+        init=f"\n{2 * TAB}".join(elements),
+        goal=print_formula(problem.goal),
+        constraints="",
+        domain_bounds="",
+        metric=metric,
+    )
@@ -1,8 +1,19 @@
-from typing import Set, List, Union, Any, Tuple, Dict, Optional
-from nl2flow.plan.schemas import PlannerResponse
-from nl2flow.compile.compilations import ClassicPDDL
+from typing import Set, List, Union, Any, Tuple, Dict, Iterable, Iterator, Optional, Type
+from functools import partial, lru_cache
+from contextlib import contextmanager
+from nl2flow.plan.schemas import PlannerConfig, PlannerResponse, ClassicalPlan
+from nl2flow.compile.compilations import ClassicPDDL, DirectPDDL
+from nl2flow.compile.cache import CompilationCache
+from nl2flow.compile.profiler import CompileProfiler
 from nl2flow.compile.operators import Operator
-from nl2flow.compile.schemas import TypeItem, FlowDefinition, PDDL, ClassicalPlanReference, Transform
+from nl2flow.compile.schemas import (
+    TypeItem,
+    FlowDefinition,
+    PDDL,
+    ClassicalPlanReference,
+    Transform,
+    CompileReport,
+)
 from nl2flow.debug.schemas import SolutionQuality, DebugFlag
 from nl2flow.compile.options import (
     CompileOptions,
@@ -13,12 +24,30 @@ from nl2flow.compile.options import (
     GoalOptions,
     NL2FlowOptions,
     LOOKAHEAD,
+    TRUSTED_CONTEXT,
 )
 
+import asyncio
+
+COMPILATIONS: Dict[str, Type[ClassicPDDL]] = {
+    CompileOptions.CLASSICAL.value: ClassicPDDL,
+    CompileOptions.DIRECT.value: DirectPDDL,
+}
+
+
+@lru_cache(maxsize=None)
+def get_field_name(type_of_item: str) -> Optional[str]:
+    return next(
+        (field[0] for field in FlowDefinition.model_fields.items() if type_of_item in str(field[1].annotation)),
+        None,
+    )
+
 
 class Flow:
     def __init__(self, name: str, validate: bool = True):
-        self._flow_definition = FlowDefinition(name=name, validate_assignment=validate)
+        self._validate = validate
+        self._flow_definition = FlowDefinition(name=name)
+        self._flow_definition.set_validate_assignment(validate)
         self._mapping_option: Set[MappingOptions] = {MappingOptions.relaxed}
         self._confirm_option: Set[ConfirmOptions] = set()
         self._variable_life_cycle: Set[LifeCycleOptions] = set()
@@ -30,12 +59,46 @@ class Flow:
             SlotOptions.relaxed,
         }
 
-        self._compilation: ClassicPDDL = ClassicPDDL(self.flow_definition)
+        self._compilation: Optional[ClassicPDDL] = ClassicPDDL(self.flow_definition)
+        self._compile_options: Optional[Tuple[CompileOptions, Dict[str, Any]]] = None
+        self._cache: Optional[CompilationCache] = None
+        self._batch: Optional[Dict[str, Any]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop("_compilation")
+        state.pop("_compile_options")
+        state.pop("_cache")
+        state.pop("_batch")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._compilation = ClassicPDDL(self.flow_definition)
+        self._compile_options = None
+        self._cache = None
+        self._batch = None
 
     @property
     def compilation(self) -> ClassicPDDL:
+        # a hit in the compilation cache skips the compilation, which is then rebuilt on first use
+        if self._compilation is None:
+            assert self._compile_options is not None, "Nothing to rebuild the compilation from."
+            compilation_type, compile_options = self._compile_options
+
+            self._compilation = COMPILATIONS[compilation_type.value](self.flow_definition)
+            self._compilation.compile(**compile_options)
+
         return self._compilation
 
+    @property
+    def cache(self) -> Optional[CompilationCache]:
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Optional[CompilationCache]) -> None:
+        self._cache = cache
+
     @property
     def variable_life_cycle(self) -> Set[LifeCycleOptions]:
         return self._variable_life_cycle
@@ -121,8 +184,11 @@ class Flow:
 
     @flow_definition.setter
     def flow_definition(self, initialize: Union[FlowDefinition, Dict[str, Any]]) -> None:
+        self.load_flow_definition(initialize)
+
+    def load_flow_definition(self, initialize: Union[FlowDefinition, Dict[str, Any]], trusted: bool = False) -> None:
         if isinstance(initialize, Dict):
-            self._flow_definition = FlowDefinition.model_validate(initialize)
+            self._flow_definition = FlowDefinition.model_validate(initialize, context={TRUSTED_CONTEXT: trusted})
 
         elif isinstance(initialize, FlowDefinition):
             self._flow_definition = initialize
@@ -130,6 +196,8 @@ class Flow:
         else:
             raise TypeError(f"Tried to initialize with unknown object: {initialize}")
 
+        self._flow_definition.set_validate_assignment(self._validate)
+
     def add(self, new_item: Union[Any, List[Any]]) -> None:
         if not isinstance(new_item, List):
             new_item = [new_item]
@@ -139,17 +207,16 @@ class Flow:
                 item = item.definition
 
             type_of_item = type(item).__name__
-            key_name = next(
-                (field[0] for field in FlowDefinition.model_fields.items() if type_of_item in str(field[1].annotation)),
-                None,
-            )
+            key_name = get_field_name(type_of_item)
 
             if key_name:
                 current_item_value = getattr(self.flow_definition, key_name)
 
                 if isinstance(current_item_value, List):
                     current_item_value.append(item)
-                    setattr(self.flow_definition, key_name, current_item_value)
+
+                    if self._batch is None:
+                        setattr(self.flow_definition, key_name, current_item_value)
 
                     if type_of_item == TypeItem.__name__ and item.children:
                         children = item.children
@@ -161,10 +228,54 @@ class Flow:
                             self.add(TypeItem(name=child, parent=item.name, children=[]))
 
                 elif isinstance(item, ClassicalPlanReference):
-                    setattr(self.flow_definition, key_name, item)
+                    if self._batch is None:
+                        setattr(self.flow_definition, key_name, item)
+                    else:
+                        self._batch[key_name] = item
             else:
                 raise TypeError("Attempted to add unknown type of object to flow.")
 
+    def add_many(self, new_items: Iterable[Any]) -> None:
+        with self.batch():
+            self.add(list(new_items))
+
+    @contextmanager
+    def batch(self) -> Iterator["Flow"]:
+        """
+        Add items to the flow without validating the flow definition after
+        each of them; the flow is validated once, when the batch ends. If
+        that fails, everything added in the batch is taken out again.
+        """
+
+        if self._batch is not None:
+            yield self
+            return
+
+        lengths = {key: len(value) for key, value in self.flow_definition if isinstance(value, List)}
+        reference = self.flow_definition.reference
+        self._batch = dict()
+
+        try:
+            yield self
+
+            for key_name, item in self._batch.items():
+                setattr(self.flow_definition, key_name, item)
+
+            if self.flow_definition.validates_assignment:
+                FlowDefinition.model_validate(dict(self.flow_definition))
+
+        except Exception:
+            for key_name, length in lengths.items():
+                del getattr(self.flow_definition, key_name)[length:]
+
+            if self.flow_definition.reference is not reference:
+                self.flow_definition.reference = reference
+
+            raise
+
+        finally:
+            self._batch = None
+
     def set_start(self, operator_name: Optional[str]) -> None:
         self.flow_definition.starts_with = operator_name
 
@@ -177,24 +288,79 @@ class Flow:
         debug_flag: Optional[DebugFlag] = None,
         report_type: Optional[SolutionQuality] = None,
         compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        planner_config: Optional[PlannerConfig] = None,
+        **kwargs: Any,
+    ) -> PlannerResponse:
+        pddl, transforms = self.compile_to_pddl(debug_flag, report_type, compilation_type, **kwargs)
+        parsed_plans: PlannerResponse = planner.plan(
+            pddl=pddl, flow=self, transforms=transforms, debug_flag=debug_flag, config=planner_config
+        )
+        return parsed_plans
+
+    def replan_it(
+        self,
+        planner: Any,
+        previous: Optional[PlannerResponse],
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        planner_config: Optional[PlannerConfig] = None,
         **kwargs: Any,
     ) -> PlannerResponse:
         pddl, transforms = self.compile_to_pddl(debug_flag, report_type, compilation_type, **kwargs)
-        parsed_plans: PlannerResponse = planner.plan(pddl=pddl, flow=self, transforms=transforms, debug_flag=debug_flag)
+        parsed_plans: PlannerResponse = planner.replan(
+            pddl=pddl, previous=previous, flow=self, transforms=transforms, debug_flag=debug_flag, config=planner_config
+        )
         return parsed_plans
 
-    def compile_to_pddl(
+    def iter_plans(
+        self,
+        planner: Any,
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        planner_config: Optional[PlannerConfig] = None,
+        **kwargs: Any,
+    ) -> Iterator[ClassicalPlan]:
+        pddl, transforms = self.compile_to_pddl(debug_flag, report_type, compilation_type, **kwargs)
+        yield from planner.iter_plans(
+            pddl=pddl, flow=self, transforms=transforms, debug_flag=debug_flag, config=planner_config
+        )
+
+    async def plan_it_async(
+        self,
+        planner: Any,
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        planner_config: Optional[PlannerConfig] = None,
+        **kwargs: Any,
+    ) -> PlannerResponse:
+        pddl, transforms = await self.compile_to_pddl_async(debug_flag, report_type, compilation_type, **kwargs)
+        parsed_plans: PlannerResponse = await planner.plan_async(
+            pddl=pddl, flow=self, transforms=transforms, debug_flag=debug_flag, config=planner_config
+        )
+        return parsed_plans
+
+    async def compile_to_pddl_async(
         self,
         debug_flag: Optional[DebugFlag] = None,
         report_type: Optional[SolutionQuality] = None,
         compilation_type: CompileOptions = CompileOptions.CLASSICAL,
         **kwargs: Any,
     ) -> Tuple[PDDL, List[Transform]]:
-        if compilation_type.value != CompileOptions.CLASSICAL.value:
-            raise NotImplementedError
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.compile_to_pddl, debug_flag, report_type, compilation_type, **kwargs)
+        )
 
-        self._compilation = ClassicPDDL(self.flow_definition)
-        pddl, transforms = self._compilation.compile(
+    def get_compile_options(
+        self,
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        return dict(
             slot_options=self.slot_options,
             mapping_options=self.mapping_options,
             confirm_options=self.confirm_options,
@@ -207,4 +373,90 @@ class Flow:
             **kwargs,
         )
 
+    def compile_to_pddl(
+        self,
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        **kwargs: Any,
+    ) -> Tuple[PDDL, List[Transform]]:
+        if compilation_type.value not in COMPILATIONS:
+            raise NotImplementedError
+
+        compile_options = self.get_compile_options(debug_flag, report_type, **kwargs)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.flow_definition, compilation_type=compilation_type, **compile_options)
+            cached_compilation = self.cache.get(cache_key)
+
+            if cached_compilation is not None:
+                self._compilation = None
+                self._compile_options = (compilation_type, compile_options)
+                return cached_compilation
+
+        if self.cache is not None and cache_key is not None:
+            pddl, transforms = self.compile_incrementally(compilation_type, **compile_options)
+            self.cache.put(cache_key, (pddl, transforms))
+
+        else:
+            self._compilation = COMPILATIONS[compilation_type.value](self.flow_definition)
+            pddl, transforms = self._compilation.compile(**compile_options)
+
+        return pddl, transforms
+
+    def compile_with_report(
+        self,
+        debug_flag: Optional[DebugFlag] = None,
+        report_type: Optional[SolutionQuality] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        **kwargs: Any,
+    ) -> Tuple[PDDL, List[Transform], CompileReport]:
+        """
+        Compile from scratch, bypassing the compilation cache, and report
+        the time each pass took and what it added to the compilation.
+        """
+
+        if compilation_type.value not in COMPILATIONS:
+            raise NotImplementedError
+
+        compile_options = self.get_compile_options(debug_flag, report_type, **kwargs)
+
+        self._compilation = COMPILATIONS[compilation_type.value](self.flow_definition)
+        self._compilation.profiler = CompileProfiler()
+
+        pddl, transforms = self._compilation.run(self._compilation.compile, **compile_options)
+        return pddl, transforms, self._compilation.profiler.report
+
+    def compile_incrementally(
+        self,
+        compilation_type: CompileOptions,
+        **kwargs: Any,
+    ) -> Tuple[PDDL, List[Transform]]:
+        assert self.cache is not None, "Incremental compilation requires a compilation cache."
+
+        if kwargs.get("debug_flag", None) is not None:
+            self._compilation = COMPILATIONS[compilation_type.value](self.flow_definition)
+            return self._compilation.compile(**kwargs)
+
+        domain_key = self.cache.make_domain_key(self.flow_definition, compilation_type=compilation_type, **kwargs)
+        cached_domain = self.cache.domains.get(domain_key)
+
+        if cached_domain is not None:
+            problem_compilation = cached_domain.copy_for_problem()
+
+            with self.cache.domains.lock, cached_domain.keep_language():
+                compilation = problem_compilation.update_problem(self.flow_definition, **kwargs)
+
+                if compilation is not None:
+                    cached_domain.domain = problem_compilation.domain
+
+            if compilation is not None:
+                self._compilation = problem_compilation
+                return compilation
+
+        self._compilation = COMPILATIONS[compilation_type.value](self.flow_definition)
+        pddl, transforms = self._compilation.compile(**kwargs)
+
+        self.cache.domains.put(domain_key, self._compilation)
         return pddl, transforms
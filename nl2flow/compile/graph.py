@@ -0,0 +1,78 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+from nl2flow.compile.ir import FlowIR
+from nl2flow.compile.schemas import FlowDefinition
+
+
+class DependencyGraph:
+    """
+    Index of the data items, operators and declared mappings of a flow. An item is
+    sourced by the operators that produce it and by the producers of any item that
+    maps into it, and consumed by the operators that take it as input. Built once
+    from a FlowIR in time linear in the size of the catalog.
+    """
+
+    __slots__ = ("ir", "sources", "constraint_consumers")
+
+    def __init__(self, ir: FlowIR) -> None:
+        self.ir = ir
+
+        sources: List[Dict[int, None]] = [dict.fromkeys(producers) for producers in ir.producers]
+        for mapping in ir.mappings:
+            sources[mapping.target].update(dict.fromkeys(ir.producers[mapping.source]))
+
+        self.sources: List[Tuple[int, ...]] = [tuple(operators) for operators in sources]
+
+        constraint_consumers: Dict[str, Dict[int, None]] = dict()
+        for operator in ir.operators:
+            for signature in operator.inputs:
+                for constraint in signature.constraints:
+                    constraint_consumers.setdefault(constraint.constraint, dict())[operator.name] = None
+
+        self.constraint_consumers: Dict[str, Tuple[int, ...]] = {
+            constraint: tuple(operators) for constraint, operators in constraint_consumers.items()
+        }
+
+    @classmethod
+    def from_flow_definition(cls, flow_definition: FlowDefinition) -> DependencyGraph:
+        return cls(FlowIR.from_flow_definition(flow_definition))
+
+    def get_producers(self, item_name: str) -> List[str]:
+        return self.ir.get_producers(item_name)
+
+    def get_sources(self, item_name: str) -> List[str]:
+        item = self.ir.ids.get(item_name)
+        return [self.ir.names[operator] for operator in self.sources[item]] if item is not None else []
+
+    def get_consumers(self, item_name: str) -> List[str]:
+        return self.ir.get_consumers(item_name)
+
+    def get_constraint_consumers(self, constraint: str) -> List[str]:
+        return [self.ir.names[operator] for operator in self.constraint_consumers.get(constraint, tuple())]
+
+    def get_transitive_producers(self, item_name: str) -> List[str]:
+        item = self.ir.ids.get(item_name)
+
+        if item is None:
+            return []
+
+        visited_items: Set[int] = {item}
+        visited_operators: Dict[int, None] = dict()
+        stack = [item]
+
+        while stack:
+            for operator in self.sources[stack.pop()]:
+                if operator in visited_operators:
+                    continue
+
+                visited_operators[operator] = None
+                for slot in self.ir.operators[self.ir.operator_index[operator]].slots:
+                    if slot not in visited_items:
+                        visited_items.add(slot)
+                        stack.append(slot)
+
+        return [self.ir.names[operator] for operator in visited_operators]
+
+    def is_operator_item(self, item_name: str) -> bool:
+        item = self.ir.ids.get(item_name)
+        return item is not None and bool(self.ir.producers[item] or self.ir.consumers[item])
@@ -0,0 +1,165 @@
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from nl2flow.compile.options import TypeOptions
+from nl2flow.compile.schemas import Constraint, FlowDefinition, OperatorDefinition, Outcome, Parameter, SignatureItem
+
+
+class IRParameter(NamedTuple):
+    item: int
+    item_type: Optional[int]  # None for a bare item name, whose type comes from its declaration
+    required: bool
+
+
+class IRSignature(NamedTuple):
+    parameters: Tuple[IRParameter, ...]
+    constraints: Tuple[Constraint, ...]
+
+
+class IROutcome(NamedTuple):
+    outcomes: Tuple[IRSignature, ...]
+    constraints: Tuple[Constraint, ...]
+
+
+class IROperator(NamedTuple):
+    index: int
+    name: int
+    cost: int
+    max_try: int
+    inputs: Tuple[IRSignature, ...]
+    outputs: Tuple[IROutcome, ...]
+    slots: Tuple[int, ...]
+    produces: Tuple[int, ...]
+
+
+class IRMapping(NamedTuple):
+    source: int
+    target: int
+    probability: float
+
+
+class FlowIR:
+    """
+    Compact view of a transformed flow definition for the compile passes. Operators,
+    items and types are interned once into integer ids, signatures are normalized to
+    flat tuples, and the item to producer / consumer adjacency is precomputed so that
+    no pass has to walk the pydantic models again. Ids index into `names`.
+    """
+
+    __slots__ = ("names", "ids", "operators", "operator_index", "mappings", "producers", "consumers")
+
+    def __init__(self) -> None:
+        self.names: List[str] = list()
+        self.ids: Dict[str, int] = dict()
+        self.operators: Tuple[IROperator, ...] = tuple()
+        self.operator_index: Dict[int, int] = dict()
+        self.mappings: Tuple[IRMapping, ...] = tuple()
+        self.producers: List[Tuple[int, ...]] = list()
+        self.consumers: List[Tuple[int, ...]] = list()
+
+    @classmethod
+    def from_flow_definition(cls, flow_definition: FlowDefinition) -> FlowIR:
+        ir = cls()
+        ir.operators = tuple(
+            ir.add_operator(index, operator) for index, operator in enumerate(flow_definition.operators)
+        )
+        ir.operator_index = {operator.name: operator.index for operator in ir.operators}
+        ir.mappings = tuple(
+            IRMapping(ir.intern(mapping.source_name), ir.intern(mapping.target_name), mapping.probability)
+            for mapping in flow_definition.list_of_mappings
+        )
+
+        producers: List[List[int]] = [[] for _ in ir.names]
+        consumers: List[List[int]] = [[] for _ in ir.names]
+
+        for operator in ir.operators:
+            for item in dict.fromkeys(operator.slots):
+                consumers[item].append(operator.name)
+
+            for item in dict.fromkeys(operator.produces):
+                producers[item].append(operator.name)
+
+        ir.producers = [tuple(operators) for operators in producers]
+        ir.consumers = [tuple(operators) for operators in consumers]
+        return ir
+
+    def intern(self, name: str) -> int:
+        index = self.ids.get(name)
+
+        if index is None:
+            index = len(self.names)
+            self.ids[name] = index
+            self.names.append(name)
+
+        return index
+
+    def add_parameter(self, parameter: Union[str, Parameter]) -> IRParameter:
+        if isinstance(parameter, Parameter):
+            return IRParameter(
+                self.intern(parameter.item_id),
+                self.intern(parameter.item_type or TypeOptions.ROOT.value),
+                parameter.required,
+            )
+
+        return IRParameter(self.intern(parameter), None, True)
+
+    def add_signature(self, signature_item: SignatureItem) -> IRSignature:
+        parameters = signature_item.parameters
+        parameters = parameters if isinstance(parameters, List) else [parameters]
+
+        return IRSignature(
+            tuple(self.add_parameter(parameter) for parameter in parameters),
+            tuple(signature_item.constraints),
+        )
+
+    def add_outcome(self, outcome: Outcome) -> IROutcome:
+        return IROutcome(
+            tuple(self.add_signature(signature_item) for signature_item in outcome.outcomes),
+            tuple(outcome.constraints),
+        )
+
+    def add_operator(self, index: int, operator: OperatorDefinition) -> IROperator:
+        outputs = operator.outputs if isinstance(operator.outputs, List) else [operator.outputs]
+
+        name = self.intern(operator.name)
+        inputs = tuple(self.add_signature(signature_item) for signature_item in operator.inputs)
+        outcomes = tuple(self.add_outcome(outcome) for outcome in outputs)
+
+        return IROperator(
+            index=index,
+            name=name,
+            cost=operator.cost,
+            max_try=operator.max_try,
+            inputs=inputs,
+            outputs=outcomes,
+            slots=tuple(p.item for signature in inputs for p in signature.parameters),
+            produces=(
+                tuple(p.item for signature in outcomes[0].outcomes for p in signature.parameters)
+                if outcomes
+                else tuple()
+            ),
+        )
+
+    def name(self, index: int) -> str:
+        return self.names[index]
+
+    def get_operator(self, operator_name: str) -> Optional[IROperator]:
+        name = self.ids.get(operator_name)
+        index = self.operator_index.get(name) if name is not None else None
+        return self.operators[index] if index is not None else None
+
+    def get_slots(self, operator: IROperator) -> List[str]:
+        return [self.names[item] for item in operator.slots]
+
+    def get_producers(self, item_name: str) -> List[str]:
+        item = self.ids.get(item_name)
+        return [self.names[operator] for operator in self.producers[item]] if item is not None else []
+
+    def get_consumers(self, item_name: str) -> List[str]:
+        item = self.ids.get(item_name)
+        return [self.names[operator] for operator in self.consumers[item]] if item is not None else []
+
+    def get_items(self) -> List[str]:
+        return [
+            self.names[item]
+            for item in dict.fromkeys(i for operator in self.operators for i in operator.slots + operator.produces)
+        ]
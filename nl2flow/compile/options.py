@@ -2,19 +2,20 @@ from __future__ import annotations
 from typing import Optional
 from enum import Enum
 
-
 LOOKAHEAD: int = 1
 RETRY: int = 1
 MAX_RETRY: int = 5
 SLOT_GOODNESS: float = 0.5
 MAX_LABELS: int = 10
 PARAMETER_DELIMITER = "----"
+TRUSTED_CONTEXT = "trusted"
 
 
 class NL2FlowOptions(Enum):
     multi_instance = "MULTI_INSTANCE"
     allow_retries = "ALLOW_RETRIES"
     label_production = "LABELS"
+    prune_irrelevant = "PRUNE_IRRELEVANT"
 
 
 class RestrictedOperations(Enum):
@@ -51,6 +52,7 @@ class BasicOperations(Enum):
 
 class CompileOptions(Enum):
     CLASSICAL = "CLASSICAL"
+    DIRECT = "DIRECT"
     ALL_OUTCOMES = "ALL_OUTCOMES"
     MAX_OUTCOMES = "MOST_LIKELY_OUTCOME"
 
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+from nl2flow.compile.schemas import CompilePhase, CompileReport
+
+import time
+
+
+class CompileProfiler:
+    """
+    Records the wall time of each pass of a compilation and what the pass
+    added to it, as a list of nested phases in the order they started.
+    """
+
+    def __init__(self) -> None:
+        self.report = CompileReport()
+        self.stack: List[CompilePhase] = list()
+        self.start_time = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, compilation: Any) -> Iterator[CompilePhase]:
+        num_constants, _, num_predicates, num_actions = compilation.get_domain_size()
+        num_init_facts = compilation.count_init_facts()
+
+        path = (self.stack[-1].path if self.stack else []) + [name]
+        new_phase = CompilePhase(name=name, path=path, start=time.perf_counter() - self.start_time)
+
+        self.report.phases.append(new_phase)
+        self.stack.append(new_phase)
+
+        try:
+            yield new_phase
+
+        finally:
+            new_phase.duration = time.perf_counter() - self.start_time - new_phase.start
+            new_phase.self_duration += new_phase.duration
+            self.stack.pop()
+
+            # the time of a phase is not its own time in the phase around it
+            if self.stack:
+                self.stack[-1].self_duration -= new_phase.duration
+
+            new_constants, _, new_predicates, new_actions = compilation.get_domain_size()
+            new_phase.num_actions = new_actions - num_actions
+            new_phase.num_predicates = new_predicates - num_predicates
+            new_phase.num_constants = new_constants - num_constants
+            new_phase.num_init_facts = compilation.count_init_facts() - num_init_facts
@@ -2,9 +2,8 @@ from __future__ import annotations
 from typing import Set, List, Dict, Optional, Union, Any
 from collections import Counter
 from re import findall
-from pydantic import BaseModel, field_validator, model_validator
-from pydantic_core.core_schema import FieldValidationInfo
-from nl2flow.compile.utils import string_transform, revert_string_transform, Transform
+from pydantic import BaseModel, ConfigDict, PrivateAttr, ValidationInfo, field_validator, model_validator
+from nl2flow.compile.utils import string_transform, revert_string_transform, Transform, TransformRegistry
 from nl2flow.compile.options import (
     TypeOptions,
     CostOptions,
@@ -12,6 +11,7 @@ from nl2flow.compile.options import (
     MemoryState,
     SLOT_GOODNESS,
     RETRY,
+    TRUSTED_CONTEXT,
 )
 
 
@@ -27,9 +27,11 @@ class Parameter(BaseModel):
             allowed_values=[string_transform(item, transforms) for item in parameter.allowed_values],
             required=parameter.required,
             item_id=string_transform(parameter.item_id, transforms),
-            item_type=string_transform(parameter.item_type, transforms)
-            if parameter.item_type is not None
-            else TypeOptions.ROOT.value,
+            item_type=(
+                string_transform(parameter.item_type, transforms)
+                if parameter.item_type is not None
+                else TypeOptions.ROOT.value
+            ),
         )
 
 
@@ -258,6 +260,53 @@ class PDDL(BaseModel):
     problem: str
 
 
+class CompilePhase(BaseModel):
+    name: str
+    path: List[str] = []
+    start: float = 0.0
+    duration: float = 0.0
+    self_duration: float = 0.0
+    num_actions: int = 0
+    num_predicates: int = 0
+    num_constants: int = 0
+    num_init_facts: int = 0
+    output_size: int = 0
+
+
+class CompileReport(BaseModel):
+    phases: List[CompilePhase] = []
+
+    @property
+    def total_time(self) -> float:
+        return sum(phase.duration for phase in self.phases if len(phase.path) == 1)
+
+    def get_phase(self, name: str) -> Optional[CompilePhase]:
+        return next((phase for phase in self.phases if phase.name == name), None)
+
+    def to_trace_events(self) -> Dict[str, Any]:
+        return {
+            "traceEvents": [
+                {
+                    "name": phase.name,
+                    "cat": "compile",
+                    "ph": "X",
+                    "ts": round(phase.start * 1e6, 3),
+                    "dur": round(phase.duration * 1e6, 3),
+                    "pid": 0,
+                    "tid": 0,
+                    "args": phase.model_dump(exclude={"name", "path", "start", "duration", "self_duration"}),
+                }
+                for phase in self.phases
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def to_folded_stacks(self) -> str:
+        return "\n".join(
+            f"{';'.join(phase.path)} {round(phase.self_duration * 1e6)}" for phase in self.phases if phase.path
+        )
+
+
 class ClassicalPlanReference(BaseModel):
     plan: List[Union[Step, Constraint]] = []
 
@@ -267,6 +316,8 @@ class ClassicalPlanReference(BaseModel):
 
 
 class FlowDefinition(BaseModel):
+    model_config = ConfigDict(validate_assignment=True)
+
     name: str
     type_hierarchy: List[TypeItem] = []
     operators: List[OperatorDefinition] = []
@@ -282,11 +333,22 @@ class FlowDefinition(BaseModel):
     ends_with: Optional[str] = None
     reference: Optional[ClassicalPlanReference] = None
 
-    def __init__(self, **data: Any) -> None:
-        super().__init__(**data)
-        self.model_config["validate_assignment"] = data.get(
-            "validate_assignment", self.model_config.get("validate_assignment", True)
-        )
+    _validate_assignment: bool = PrivateAttr(default=True)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in type(self).model_fields and not getattr(self, "_validate_assignment", True):
+            self.__dict__[name] = value
+            self.__pydantic_fields_set__.add(name)
+
+        else:
+            super().__setattr__(name, value)
+
+    @property
+    def validates_assignment(self) -> bool:
+        return self._validate_assignment
+
+    def set_validate_assignment(self, validate_assignment: bool) -> None:
+        self._validate_assignment = validate_assignment
 
     @classmethod
     def transform(cls, flow: FlowDefinition, transforms: List[Transform]) -> FlowDefinition:
@@ -308,18 +370,34 @@ class FlowDefinition(BaseModel):
 
         return new_flow
 
-    @field_validator("starts_with", "ends_with")
-    @classmethod
-    def unknown_operator(cls, operator_name: str, info: FieldValidationInfo) -> str:
-        reference_flow_model = FlowDefinition.model_validate(info.data)
-        assert operator_name is None or operator_name in map(
-            lambda x: str(x.name), reference_flow_model.operators
-        ), "Operator name not found!"
+    @model_validator(mode="after")
+    def validate_flow(self, info: ValidationInfo) -> FlowDefinition:
+        """
+        Runs all cross-item checks against one object map. Flows validated with
+        context={TRUSTED_CONTEXT: True} (e.g. loaded back from our own cache) skip them.
+        """
+        if info.context and info.context.get(TRUSTED_CONTEXT, False):
+            return self
 
-        return operator_name
+        self.no_duplicate_items()
+        self.unknown_operator()
 
-    @model_validator(mode="after")
-    def no_duplicate_items(self) -> FlowDefinition:
+        object_map = self.get_object_map(self)
+
+        self.hash_conflicts(object_map)
+        self.object_type_conflict(object_map)
+        self.mappings_are_among_known_memory_items(object_map)
+        self.slots_are_among_known_memory_items(object_map)
+
+        return self
+
+    def unknown_operator(self) -> None:
+        operator_names = {str(operator.name) for operator in self.operators}
+
+        for operator_name in [self.starts_with, self.ends_with]:
+            assert operator_name is None or operator_name in operator_names, "Operator name not found!"
+
+    def no_duplicate_items(self) -> None:
         check_list_key = ["operators", "type_hierarchy"]
         for key in check_list_key:
             list_of_items = list(
@@ -332,14 +410,9 @@ class FlowDefinition(BaseModel):
             duplicate_list = self.get_duplicates(list_of_items)
             assert len(duplicate_list) == 0, f"Duplicate names for {key=} {', '.join(duplicate_list)}."
 
-        return self
-
-    @model_validator(mode="after")
-    def hash_conflicts(self) -> FlowDefinition:
-        transforms: List[Transform] = list()
-
-        object_map = self.get_object_map(self)
-        reference_keys = list(object_map.keys())
+    def hash_conflicts(self, object_map: Dict[str, Set[str]]) -> None:
+        transforms: List[Transform] = TransformRegistry()
+        reference_keys: Set[str] = set(object_map.keys())
 
         check_list_key = {
             "operators": "name",
@@ -349,56 +422,35 @@ class FlowDefinition(BaseModel):
         }
 
         for key in check_list_key:
-            list_of_items = list(
-                map(
-                    lambda x: str(getattr(x, check_list_key[key])),
-                    getattr(self, key),
-                )
-            )
-
-            for item in list_of_items:
-                if item and item not in reference_keys:
-                    reference_keys.append(item)
-
-        transformed_keys = [string_transform(item, transforms) for item in reference_keys]
+            for item in getattr(self, key):
+                reference_keys.add(str(getattr(item, check_list_key[key])))
 
+        transformed_keys: Set[str] = set()
         for item in reference_keys:
+            if not item:
+                continue
+
             transformed_item = string_transform(item, transforms)
 
             if transformed_item is not None:
-                members = [o for o in transformed_keys if transformed_item == o]
-                assert len(members) <= 1, f"Conflicting names for {transformed_item}."
+                assert transformed_item not in transformed_keys, f"Conflicting names for {transformed_item}."
+                transformed_keys.add(transformed_item)
 
-        return self
-
-    @model_validator(mode="after")
-    def object_type_conflict(self) -> FlowDefinition:
-        object_map = self.get_object_map(self)
+    @staticmethod
+    def object_type_conflict(object_map: Dict[str, Set[str]]) -> None:
         for item in object_map:
             type_set = object_map[item]
             assert len(type_set) <= 1, f"Object {item} has more than one type: {', '.join(type_set)}."
 
-        return self
-
-    @model_validator(mode="after")
-    def mappings_are_among_known_memory_items(self) -> FlowDefinition:
-        object_map = self.get_object_map(self)
-
+    def mappings_are_among_known_memory_items(self, object_map: Dict[str, Set[str]]) -> None:
         for mapping in self.list_of_mappings:
             for item in [mapping.source_name, mapping.target_name]:
                 assert item in object_map, f"Mapping request with {item} unknown."
 
-        return self
-
-    @model_validator(mode="after")
-    def slots_are_among_known_memory_items(self) -> FlowDefinition:
-        object_map = self.get_object_map(self)
-
+    def slots_are_among_known_memory_items(self, object_map: Dict[str, Set[str]]) -> None:
         for slot in self.slot_properties:
             assert slot.slot_name in object_map, f"Slot request with {slot.slot_name} unknown."
 
-        return self
-
     @staticmethod
     def get_duplicates(list_item: List[str]) -> List[str]:
         return [i for i, c in Counter(list_item).items() if c > 1]
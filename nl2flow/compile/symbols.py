@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, Optional
+from nl2flow.compile.schemas import OperatorDefinition
+
+
+class SymbolTable:
+    """
+    Indexes the symbols of a compilation: constants by name and by type, types by
+    parent, and operators by name. Every addition goes through the table so that
+    lookups made by the compilation passes and the plan parser are constant time.
+    """
+
+    def __init__(self) -> None:
+        self.constant_map: Dict[str, Any] = dict()
+        self.type_map: Dict[str, Any] = dict()
+        self.operator_map: Dict[str, OperatorDefinition] = dict()
+
+        self._type_of_constant: Dict[str, str] = dict()
+        self._constants_by_type: Dict[str, List[str]] = dict()
+        self._types_by_parent: Dict[Optional[str], List[str]] = dict()
+
+    def add_type(self, type_name: str, sort: Any, parent: Optional[str] = None) -> None:
+        if type_name in self.type_map:
+            return
+
+        self.type_map[type_name] = sort
+        self._types_by_parent.setdefault(parent, []).append(type_name)
+
+    def add_constant(self, constant_name: str, constant: Any, type_name: str) -> None:
+        if constant_name in self.constant_map:
+            return
+
+        self.constant_map[constant_name] = constant
+        self._type_of_constant[constant_name] = type_name
+        self._constants_by_type.setdefault(type_name, []).append(constant_name)
+
+    def add_operators(self, operators: List[OperatorDefinition]) -> None:
+        for operator in operators:
+            self.operator_map[operator.name] = operator
+
+    def get_type_of_constant(self, constant_name: str) -> str:
+        type_name = self._type_of_constant.get(constant_name, None)
+
+        if type_name is None:
+            raise ValueError(f"Unknown constant: {constant_name}")
+
+        return type_name
+
+    def get_constants_of_type(self, type_name: str) -> List[str]:
+        return list(self._constants_by_type.get(type_name, []))
+
+    def get_children_of_type(self, type_name: Optional[str]) -> List[str]:
+        return list(self._types_by_parent.get(type_name, []))
+
+    def get_operator(self, operator_name: str) -> Optional[OperatorDefinition]:
+        return self.operator_map.get(operator_name, None)
+
+    def copy(self) -> "SymbolTable":
+        symbols = SymbolTable()
+
+        symbols.constant_map = dict(self.constant_map)
+        symbols.type_map = dict(self.type_map)
+        symbols.operator_map = dict(self.operator_map)
+
+        symbols._type_of_constant = dict(self._type_of_constant)
+        symbols._constants_by_type = {key: list(value) for key, value in self._constants_by_type.items()}
+        symbols._types_by_parent = {key: list(value) for key, value in self._types_by_parent.items()}
+
+        return symbols
@@ -1,23 +1,96 @@
-from typing import List, Optional
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, SupportsIndex, Tuple, Union
 from pydantic import BaseModel
 
+import hashlib
 import re
 
+SANITIZE_PATTERN = re.compile(r"\s+|\"|,")
+
 
 class Transform(BaseModel):
     source: str
     target: str
 
 
+class TransformRegistry(List[Transform]):
+    """
+    List of transforms with forward (source) and reverse (target) indexes, so that
+    applying or reverting a transform does not scan the list. It is still a list of
+    Transform objects and serializes exactly like one.
+    """
+
+    def __init__(self, transforms: Iterable[Transform] = ()) -> None:
+        list.__init__(self)
+        self._forward: Dict[str, List[Transform]] = dict()
+        self._reverse: Dict[str, List[Transform]] = dict()
+        self.extend(transforms)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return TransformRegistry, (list(self),)
+
+    def _index(self, transform: Transform) -> None:
+        self._forward.setdefault(transform.source, []).append(transform)
+        self._reverse.setdefault(transform.target, []).append(transform)
+
+    def _reindex(self) -> None:
+        self._forward.clear()
+        self._reverse.clear()
+
+        for transform in self:
+            self._index(transform)
+
+    def append(self, transform: Transform) -> None:
+        list.append(self, transform)
+        self._index(transform)
+
+    def extend(self, transforms: Iterable[Transform]) -> None:
+        for transform in transforms:
+            self.append(transform)
+
+    def __iadd__(self, transforms: Iterable[Transform]) -> TransformRegistry:  # type: ignore
+        self.extend(transforms)
+        return self
+
+    def insert(self, index: SupportsIndex, transform: Transform) -> None:
+        list.insert(self, index, transform)
+        self._reindex()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        list.__setitem__(self, index, value)
+        self._reindex()
+
+    def __delitem__(self, index: Union[SupportsIndex, slice]) -> None:
+        list.__delitem__(self, index)
+        self._reindex()
+
+    def pop(self, index: SupportsIndex = -1) -> Transform:
+        transform = list.pop(self, index)
+        self._reindex()
+        return transform
+
+    def remove(self, transform: Transform) -> None:
+        list.remove(self, transform)
+        self._reindex()
+
+    def clear(self) -> None:
+        list.clear(self)
+        self._reindex()
+
+    def get_targets(self, source: str) -> List[Transform]:
+        return self._forward.get(source, [])
+
+    def get_sources(self, target: str) -> List[Transform]:
+        return self._reverse.get(target, [])
+
+
 def string_transform(item: Optional[str], reference: List[Transform], hashit: bool = False) -> Optional[str]:
     if item is not None:
         if hashit:
-            transform = f"hash_{str(abs(hash(item)))}"
+            # str hashes change with the hash seed, which would rename the constraint from run to run
+            transform = f"hash_{int(hashlib.sha256(item.encode('utf-8')).hexdigest()[:16], 16)}"
         else:
-            transform = item.lower()
-
-            for pattern in [r"\s+", r"\"", r","]:
-                transform = re.sub(pattern, "_", transform)
+            transform = SANITIZE_PATTERN.sub("_", item.lower())
 
         if transform and transform == revert_string_transform(transform, reference) and transform != item:
             reference.append(
@@ -36,7 +109,10 @@ def revert_string_transforms(list_of_strings: List[str], reference: List[Transfo
 
 
 def revert_string_transform(item: str, reference: List[Transform]) -> str:
-    og_items = list(filter(lambda x: item == x.target, reference))
+    if isinstance(reference, TransformRegistry):
+        og_items = reference.get_sources(item)
+    else:
+        og_items = list(filter(lambda x: item == x.target, reference))
 
     if not og_items:
         return item
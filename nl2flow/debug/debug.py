@@ -1,17 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import List, Any, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Any, Optional, Tuple
 from difflib import Differ
 from copy import deepcopy
+from nl2flow.plan.planner import Planner
 from nl2flow.plan.planners.kstar import Kstar
-from nl2flow.plan.options import TIMEOUT
-from nl2flow.plan.schemas import ClassicalPlan
-from nl2flow.compile.flow import Flow
-from nl2flow.compile.options import BasicOperations
-from nl2flow.compile.schemas import ClassicalPlanReference, Step
+from nl2flow.plan.options import POOL_SIZE, TIMEOUT
+from nl2flow.plan.schemas import ClassicalPlan, PlannerResponse
+from nl2flow.compile.flow import COMPILATIONS, Flow
+from nl2flow.compile.options import BasicOperations, CompileOptions
+from nl2flow.compile.schemas import ClassicalPlanReference, PDDL, Step, Transform
 from nl2flow.debug.schemas import Report, SolutionQuality, StepDiff, DiffAction, DebugFlag
 from nl2flow.printers.codelike import CodeLikePrint
 from nl2flow.printers.driver import Printer
 
+import threading
+
 PLANNER = Kstar()
 DIFFER = Differ()
 
@@ -78,21 +83,16 @@ class BasicDebugger(Debugger):
 
         return diff_obj
 
-    def debug(
-        self,
+    @classmethod
+    def generate_report(
+        cls,
+        printer: Printer,
         list_of_tokens: List[str],
+        reference_plan: ClassicalPlanReference,
+        planner_response: PlannerResponse,
         report_type: SolutionQuality,
-        debug_flag: DebugFlag = DebugFlag.TOKENIZE,
-        timeout: int = TIMEOUT,
-        printer: Printer = CodeLikePrint(),
         **kwargs: Any,
     ) -> Report:
-        PLANNER.timeout = timeout
-
-        reference_plan: ClassicalPlanReference = printer.parse_tokens(list_of_tokens, **kwargs)
-        self.flow.add(reference_plan)
-
-        planner_response = self.flow.plan_it(PLANNER, debug_flag, report_type, **kwargs)
         new_report = Report(
             report_type=report_type.value,
             planner_response=planner_response,
@@ -114,8 +114,8 @@ class BasicDebugger(Debugger):
 
                 list_of_tokens = printer.pretty_print_plan(reference, **new_kwargs).split("\n")
 
-            new_report.plan_diff_str = self.generate_plan_diff(printer, best_plan, list_of_tokens, **kwargs)
-            new_report.plan_diff_obj = self.generate_plan_diff_obj(printer, new_report.plan_diff_str, **kwargs)
+            new_report.plan_diff_str = cls.generate_plan_diff(printer, best_plan, list_of_tokens, **kwargs)
+            new_report.plan_diff_obj = cls.generate_plan_diff_obj(printer, new_report.plan_diff_str, **kwargs)
 
             new_report.determination = True
 
@@ -125,3 +125,92 @@ class BasicDebugger(Debugger):
                     break
 
         return new_report
+
+    def debug(
+        self,
+        list_of_tokens: List[str],
+        report_type: SolutionQuality,
+        debug_flag: DebugFlag = DebugFlag.TOKENIZE,
+        timeout: int = TIMEOUT,
+        printer: Printer = CodeLikePrint(),
+        **kwargs: Any,
+    ) -> Report:
+        PLANNER.timeout = timeout
+
+        reference_plan: ClassicalPlanReference = printer.parse_tokens(list_of_tokens, **kwargs)
+        self.flow.add(reference_plan)
+
+        planner_response = self.flow.plan_it(PLANNER, debug_flag, report_type, **kwargs)
+        return self.generate_report(printer, list_of_tokens, reference_plan, planner_response, report_type, **kwargs)
+
+
+class DebugSession:
+    """
+    Debug many candidate plans against the same flow. The domain is compiled once
+    from a copy of the flow without a reference, and each list of tokens only adds
+    its own reference on top of it before the planner calls, which run in parallel.
+    The flow the session was created from is not modified.
+    """
+
+    def __init__(
+        self,
+        instance: Flow,
+        report_type: SolutionQuality,
+        debug_flag: DebugFlag = DebugFlag.TOKENIZE,
+        timeout: int = TIMEOUT,
+        printer: Printer = CodeLikePrint(),
+        planner: Optional[Planner] = None,
+        compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+        max_workers: int = POOL_SIZE,
+        **kwargs: Any,
+    ) -> None:
+        self.flow = deepcopy(instance)
+        self.flow.load_flow_definition(self.flow.flow_definition.model_copy(update={"reference": None}))
+
+        self.report_type = report_type
+        self.debug_flag = debug_flag
+        self.printer = printer
+        self.max_workers = max_workers
+        self.kwargs = kwargs
+
+        self.planner = planner or Kstar()
+        self.planner_config = self.planner.config.model_copy(update={"timeout": int(timeout)})
+
+        self.compile_options = self.flow.get_compile_options(debug_flag, report_type, **kwargs)
+        self.compilation = COMPILATIONS[compilation_type.value](self.flow.flow_definition)
+        self.compilation.compile_domain(**self.compile_options)
+
+        self._lock = threading.Lock()
+
+    def compile(self, reference_plan: ClassicalPlanReference) -> Tuple[PDDL, List[Transform]]:
+        with self._lock, self.compilation.keep_language():
+            compilation = self.compilation.copy_for_reference()
+            return compilation.update_reference(reference_plan, **self.compile_options)
+
+    def debug(self, list_of_tokens: List[str]) -> Report:
+        reference_plan: ClassicalPlanReference = self.printer.parse_tokens(list_of_tokens, **self.kwargs)
+        pddl, transforms = self.compile(reference_plan)
+
+        planner_response = self.planner.plan(
+            pddl=pddl, flow=self.flow, transforms=transforms, debug_flag=self.debug_flag, config=self.planner_config
+        )
+
+        return BasicDebugger.generate_report(
+            self.printer, list_of_tokens, reference_plan, planner_response, self.report_type, **self.kwargs
+        )
+
+    def iter_debug(self, candidates: Iterable[List[str]]) -> Iterator[Report]:
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="debug-session") as executor:
+            futures: Deque["Future[Report]"] = deque()
+
+            for list_of_tokens in candidates:
+                futures.append(executor.submit(self.debug, list_of_tokens))
+
+                if len(futures) >= self.max_workers:
+                    yield futures.popleft().result()
+
+            while futures:
+                yield futures.popleft().result()
+
+    def debug_all(self, candidates: Iterable[List[str]]) -> List[Report]:
+        return list(self.iter_debug(candidates))
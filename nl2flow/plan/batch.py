@@ -0,0 +1,164 @@
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.options import CompileOptions
+from nl2flow.plan.options import POOL_SIZE
+from nl2flow.plan.planner import Planner
+from nl2flow.plan.planners.kstar import Kstar, kill_process_group
+from nl2flow.plan.schemas import PlannerConfig, PlannerResponse
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import tempfile
+import time
+import traceback
+
+# set in each worker of the pool, to tell the parent which process picked up which flow
+_started: Optional[Any] = None
+
+
+def init_worker(started: Any) -> None:
+    global _started
+
+    # every worker leads its own process group, so that a job can be killed with its planner processes
+    os.setsid()
+    _started = started
+
+
+def plan_one(
+    index: int,
+    flow: Flow,
+    planner_type: Type[Planner],
+    planner_config: Optional[PlannerConfig],
+    timeout: Optional[float],
+    compilation_type: CompileOptions,
+    **kwargs: Any,
+) -> Tuple[int, PlannerResponse]:
+    assert _started is not None, "Batch jobs run in the workers of plan_many."
+    _started.put((index, os.getpid()))
+
+    working_dir = os.getcwd()
+
+    # noinspection PyBroadException
+    try:
+        planner = planner_type()
+
+        if planner_config is not None:
+            planner.config = planner_config
+
+        if timeout is not None:
+            planner.timeout = min(planner.timeout, max(1, math.ceil(timeout)))
+
+        # the planner driver writes its intermediate files to the working directory
+        with tempfile.TemporaryDirectory(dir=getattr(planner, "scratch_root", None)) as scratch_dir:
+            os.chdir(scratch_dir)
+            planner_response = flow.plan_it(planner, compilation_type=compilation_type, **kwargs)
+
+    except Exception:
+        planner_response = PlannerResponse(error_running_planner=True, stderr=traceback.format_exc())
+
+    finally:
+        os.chdir(working_dir)
+
+    # noinspection PyBroadException
+    try:
+        pickle.dumps(planner_response.stderr)
+
+    except Exception:
+        planner_response.stderr = repr(planner_response.stderr)
+
+    return index, planner_response
+
+
+def report_error(results: "queue.Queue[Tuple[int, PlannerResponse]]", index: int, error: BaseException) -> None:
+    results.put((index, PlannerResponse(error_running_planner=True, stderr=f"Planner job {index} failed: {error!r}")))
+
+
+def plan_many(
+    flows: Sequence[Flow],
+    planner_type: Type[Planner] = Kstar,
+    planner_config: Optional[PlannerConfig] = None,
+    workers: int = POOL_SIZE,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    compilation_type: CompileOptions = CompileOptions.CLASSICAL,
+    **kwargs: Any,
+) -> Iterator[Tuple[int, PlannerResponse]]:
+    """
+    Compile and plan each flow on a pool of `workers` processes. Each
+    worker builds its own `planner_type()` with `planner_config`, so only
+    the flows and the config are sent to the workers. Results are yielded
+    as (index, PlannerResponse) in order of completion. A flow that runs
+    past `timeout` seconds, or is still pending when the `deadline` (in
+    seconds from the call) passes, is killed along with its worker and
+    reported as timed out. Every index is yielded exactly once.
+    """
+
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    num_workers = max(1, workers)
+    overall_deadline = math.inf if deadline is None else time.monotonic() + deadline
+
+    started = context.SimpleQueue()
+    results: "queue.Queue[Tuple[int, PlannerResponse]]" = queue.Queue()
+    pool = context.Pool(num_workers, initializer=init_worker, initargs=(started,))
+
+    pending: List[int] = list(range(len(flows)))[::-1]
+    running: Dict[int, float] = dict()
+    worker_pids: Dict[int, int] = dict()
+
+    def kill(job_index: int) -> None:
+        # a job that is killed has been handed to a worker, which reports it before anything else
+        while job_index not in worker_pids:
+            started_index, pid = started.get()
+            worker_pids[started_index] = pid
+
+        kill_process_group(worker_pids[job_index])
+
+    try:
+        while pending or running:
+            while pending and len(running) < num_workers and time.monotonic() < overall_deadline:
+                index = pending.pop()
+                pool.apply_async(
+                    plan_one,
+                    (index, flows[index], planner_type, planner_config, timeout, compilation_type),
+                    kwargs,
+                    callback=results.put,
+                    error_callback=partial(report_error, results, index),
+                )
+                running[index] = math.inf if timeout is None else time.monotonic() + timeout
+
+            if not running:
+                break
+
+            next_deadline = min(overall_deadline, min(running.values()))
+            wait_for = None if next_deadline == math.inf else max(0.0, next_deadline - time.monotonic())
+
+            try:
+                index, planner_response = results.get(timeout=wait_for)
+
+                # a job can finish just as it is killed, and is only reported once
+                if running.pop(index, None) is not None:
+                    yield index, planner_response
+
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            for index, job_deadline in list(running.items()):
+                if now >= job_deadline or now >= overall_deadline:
+                    running.pop(index)
+                    kill(index)
+                    yield index, PlannerResponse(is_timeout=True, stderr=f"Planner job {index} timed out.")
+
+        for index in pending[::-1]:
+            yield index, PlannerResponse(is_timeout=True, stderr=f"Planner job {index} passed the deadline.")
+
+    finally:
+        for index in running:
+            kill(index)
+
+        pool.terminate()
+        pool.join()
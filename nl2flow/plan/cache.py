@@ -0,0 +1,96 @@
+from typing import Any, Optional
+from pathlib import Path
+from functools import lru_cache
+from nl2flow.compile.schemas import PDDL
+from nl2flow.plan.grounding import SExpression, parse_s_expression, parse_typed_list
+from nl2flow.plan.schemas import RawPlannerResult
+from nl2flow.utility.cache_utility import TieredCache, digest
+
+PLANNER_CACHE_SIZE: int = 256
+
+UNORDERED_CONNECTIVES = {"and", "or"}
+UNORDERED_SECTIONS = {":requirements", ":predicates", ":init"}
+TYPED_SECTIONS = {":types", ":constants", ":objects"}
+
+
+def to_text(expression: SExpression) -> str:
+    if isinstance(expression, str):
+        return expression
+
+    return "(" + " ".join(to_text(item) for item in expression) + ")"
+
+
+def sort_expression(expression: SExpression) -> SExpression:
+    if isinstance(expression, str) or not expression:
+        return expression
+
+    items = [sort_expression(item) for item in expression]
+    head = items[0]
+
+    if head == "define":
+        return items[:2] + sorted(items[2:], key=to_text)
+
+    if head in UNORDERED_CONNECTIVES or head in UNORDERED_SECTIONS:
+        return [head] + sorted(items[1:], key=to_text)
+
+    if head in TYPED_SECTIONS:
+        typed_list = sorted(parse_typed_list(items[1:]))
+        return [head] + [token for name, item_type in typed_list for token in (name, "-", item_type)]
+
+    return items
+
+
+@lru_cache(maxsize=32)
+def canonical_pddl(text: str) -> str:
+    """
+    The compiler lists declarations, init facts and conditions in the
+    iteration order of sets, which changes with the hash seed. Sorting
+    the parts whose order carries no meaning gives the same text for the
+    same task in every process. Text that does not parse is used as is,
+    and the planner reports the error.
+    """
+
+    try:
+        return to_text(sort_expression(parse_s_expression(text)))
+    except (ValueError, IndexError):
+        return text
+
+
+class PlannerCache(TieredCache[RawPlannerResult]):
+    """
+    Store of raw planner results keyed by a digest of the PDDL and the planner
+    configuration, so that an identical planning problem is only sent to the planner
+    once. Only results the planner would reproduce are kept: runs that errored
+    out or timed out are not cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PLANNER_CACHE_SIZE,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        max_disk_size: Optional[int] = None,
+    ) -> None:
+        TieredCache.__init__(self, max_size=max_size, cache_dir=cache_dir, ttl=ttl, max_disk_size=max_disk_size)
+
+    @staticmethod
+    def make_key(pddl: PDDL, **kwargs: Any) -> str:
+        return digest(canonical_pddl(pddl.domain), canonical_pddl(pddl.problem), kwargs)
+
+    @staticmethod
+    def is_cacheable(raw_planner_result: RawPlannerResult) -> bool:
+        return raw_planner_result.error_running_planner is False and raw_planner_result.is_timeout is not True
+
+    def get(self, key: str) -> Optional[RawPlannerResult]:
+        cached_item = TieredCache.get(self, key)
+        return cached_item.model_copy(deep=True) if cached_item is not None else None
+
+    def put(self, key: str, value: RawPlannerResult) -> None:
+        if self.is_cacheable(value):
+            TieredCache.put(self, key, value.model_copy(deep=True))
+
+    def serialize(self, value: RawPlannerResult) -> str:
+        return value.model_dump_json()
+
+    def deserialize(self, serialized: str) -> RawPlannerResult:
+        return RawPlannerResult.model_validate_json(serialized)
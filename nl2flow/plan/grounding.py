@@ -0,0 +1,883 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import heapq
+import math
+
+SExpression = Union[str, List[Any]]
+Atom = Tuple[str, ...]
+
+COST_FUNCTION = "total-cost"
+ROOT_TYPE = "object"
+
+
+def tokenize(text: str) -> List[str]:
+    lines = [line.split(";", 1)[0] for line in text.lower().splitlines()]
+    return " ".join(lines).replace("(", " ( ").replace(")", " ) ").split()
+
+
+def parse_s_expression(text: str) -> SExpression:
+    stack: List[List[Any]] = [[]]
+
+    for token in tokenize(text):
+        if token == "(":
+            stack.append([])
+
+        elif token == ")":
+            if len(stack) == 1:
+                raise ValueError("Unbalanced parentheses in PDDL.")
+
+            expression = stack.pop()
+            stack[-1].append(expression)
+
+        else:
+            stack[-1].append(token)
+
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError("Expected exactly one PDDL definition.")
+
+    return stack[0][0]
+
+
+def parse_typed_list(items: List[str]) -> List[Tuple[str, str]]:
+    typed_list: List[Tuple[str, str]] = list()
+    names: List[str] = list()
+    index = 0
+
+    while index < len(items):
+        if items[index] == "-":
+            typed_list.extend((name, items[index + 1]) for name in names)
+            names = list()
+            index += 2
+
+        else:
+            names.append(items[index])
+            index += 1
+
+    typed_list.extend((name, ROOT_TYPE) for name in names)
+    return typed_list
+
+
+def parse_formula(expression: SExpression) -> Any:
+    if isinstance(expression, str) or not expression:
+        raise ValueError(f"Unexpected formula: {expression}")
+
+    head = expression[0]
+
+    if head == "and":
+        return "and", tuple(parse_formula(item) for item in expression[1:])
+
+    elif head == "or":
+        return "or", tuple(parse_formula(item) for item in expression[1:])
+
+    elif head == "not":
+        return "not", parse_formula(expression[1])
+
+    elif head == "imply":
+        return "or", (("not", parse_formula(expression[1])), parse_formula(expression[2]))
+
+    elif head == "=":
+        return "=", expression[1], expression[2]
+
+    elif head in ["forall", "exists", "when"]:
+        raise ValueError(f"Unsupported formula: {head}")
+
+    return "atom", head, tuple(expression[1:])
+
+
+class Effect:
+    __slots__ = ("condition", "is_add", "atom")
+
+    def __init__(self, condition: Any, is_add: bool, atom: Atom) -> None:
+        self.condition = condition
+        self.is_add = is_add
+        self.atom = atom
+
+
+class ActionSchema:
+    __slots__ = ("name", "parameters", "precondition", "effects", "cost")
+
+    def __init__(self, expression: List[Any]) -> None:
+        self.name: str = expression[1]
+        self.parameters: List[Tuple[str, str]] = list()
+        self.precondition: Any = ("and", ())
+        self.effects: List[Effect] = list()
+        self.cost: Optional[SExpression] = None
+
+        for key, value in zip(expression[2::2], expression[3::2]):
+            if key == ":parameters":
+                self.parameters = parse_typed_list(value)
+
+            elif key == ":precondition":
+                self.precondition = parse_formula(value)
+
+            elif key == ":effect":
+                self.parse_effect(value, ("and", ()))
+
+    def parse_effect(self, expression: List[Any], condition: Any) -> None:
+        head = expression[0] if expression else "and"
+
+        if head == "and":
+            for item in expression[1:]:
+                self.parse_effect(item, condition)
+
+        elif head == "when":
+            self.parse_effect(expression[2], parse_formula(expression[1]))
+
+        elif head == "increase":
+            if expression[1] != [COST_FUNCTION]:
+                raise ValueError(f"Unsupported numeric effect on {expression[1]}")
+
+            self.cost = expression[2]
+
+        elif head == "not":
+            self.effects.append(Effect(condition, False, tuple(expression[1])))
+
+        elif head == "forall":
+            raise ValueError("Unsupported effect: forall")
+
+        else:
+            self.effects.append(Effect(condition, True, tuple(expression)))
+
+
+class Condition:
+    __slots__ = ("positive", "negative", "formulas")
+
+    def __init__(self, positive: int = 0, negative: int = 0, formulas: Tuple[Any, ...] = ()) -> None:
+        self.positive = positive
+        self.negative = negative
+        self.formulas = formulas
+
+    def holds(self, state: int) -> bool:
+        return (
+            state & self.positive == self.positive
+            and not state & self.negative
+            and all(evaluate(formula, state) for formula in self.formulas)
+        )
+
+    @property
+    def atoms(self) -> int:
+        mask = self.positive | self.negative
+
+        for formula in self.formulas:
+            mask |= get_formula_atoms(formula)
+
+        return mask
+
+
+class GroundAction:
+    __slots__ = ("name", "precondition", "add", "delete", "conditional_effects", "cost")
+
+    def __init__(
+        self,
+        name: str,
+        precondition: Condition,
+        add: int,
+        delete: int,
+        conditional_effects: List[Tuple[Condition, int, int]],
+        cost: float,
+    ) -> None:
+        self.name = name
+        self.precondition = precondition
+        self.add = add
+        self.delete = delete
+        self.conditional_effects = conditional_effects
+        self.cost = cost
+
+    def apply(self, state: int) -> int:
+        add, delete = self.add, self.delete
+
+        for condition, conditional_add, conditional_delete in self.conditional_effects:
+            if condition.holds(state):
+                add |= conditional_add
+                delete |= conditional_delete
+
+        return (state & ~delete) | add
+
+    @property
+    def changes(self) -> int:
+        mask = self.add | self.delete
+
+        for _, add, delete in self.conditional_effects:
+            mask |= add | delete
+
+        return mask
+
+    @property
+    def requires(self) -> int:
+        mask = self.precondition.atoms
+
+        for condition, _, _ in self.conditional_effects:
+            mask |= condition.atoms
+
+        return mask
+
+
+class GroundTask:
+    def __init__(self, atoms: List[Atom], init: int, goal: Optional[Condition], actions: List[GroundAction]) -> None:
+        self.atoms = atoms
+        self.init = init
+        self.goal = goal
+        self.actions = actions
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+
+def evaluate(formula: Any, state: int) -> bool:
+    head = formula[0]
+
+    if head == "atom":
+        return bool(state >> formula[1] & 1)
+
+    elif head == "not":
+        return not evaluate(formula[1], state)
+
+    elif head == "and":
+        return all(evaluate(item, state) for item in formula[1])
+
+    return any(evaluate(item, state) for item in formula[1])
+
+
+def get_formula_atoms(formula: Any) -> int:
+    head = formula[0]
+
+    if head == "atom":
+        return 1 << formula[1]
+
+    elif head == "not":
+        return get_formula_atoms(formula[1])
+
+    mask = 0
+    for item in formula[1]:
+        mask |= get_formula_atoms(item)
+
+    return mask
+
+
+def iterate_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def to_condition(formula: Any) -> Optional[Condition]:
+    if formula is True:
+        return Condition()
+
+    elif formula is False:
+        return None
+
+    positive, negative, formulas = 0, 0, list()
+
+    for item in formula[1] if formula[0] == "and" else (formula,):
+        if item[0] == "atom":
+            positive |= 1 << item[1]
+
+        elif item[0] == "not" and item[1][0] == "atom":
+            negative |= 1 << item[1][1]
+
+        else:
+            formulas.append(item)
+
+    return Condition(positive, negative, tuple(formulas))
+
+
+class Domain:
+    """
+    The part of a task that does not change from problem to problem, so
+    that it can be parsed once and shared by many groundings.
+    """
+
+    __slots__ = ("parents", "constants", "schemas", "fluents")
+
+    def __init__(self, domain: str) -> None:
+        domain_definition = parse_s_expression(domain)
+
+        self.parents: Dict[str, str] = dict()
+        self.constants: Dict[str, str] = dict()
+        self.schemas: List[ActionSchema] = list()
+
+        for section in domain_definition[2:]:
+            if section[0] == ":types":
+                self.parents.update(parse_typed_list(section[1:]))
+
+            elif section[0] == ":constants":
+                self.constants.update(parse_typed_list(section[1:]))
+
+            elif section[0] == ":action":
+                self.schemas.append(ActionSchema(section))
+
+        self.fluents = {effect.atom[0] for schema in self.schemas for effect in schema.effects}
+
+
+class Grounder:
+    """
+    Grounds a STRIPS task with action costs, as written by the PDDL
+    emitter, by relaxed reachability over the lifted actions. Static
+    predicates are compiled away and fluent atoms become bits of an int.
+    """
+
+    def __init__(self, domain: Union[str, Domain], problem: str) -> None:
+        parsed_domain = domain if isinstance(domain, Domain) else Domain(domain)
+        problem_definition = parse_s_expression(problem)
+
+        self.parents = parsed_domain.parents
+        self.object_types = dict(parsed_domain.constants)
+        self.schemas = parsed_domain.schemas
+        self.init: Set[Atom] = set()
+        self.functions: Dict[Atom, float] = dict()
+        self.goal: Any = ("and", ())
+
+        for section in problem_definition[2:]:
+            if section[0] == ":objects":
+                self.object_types.update(parse_typed_list(section[1:]))
+
+            elif section[0] == ":init":
+                for fact in section[1:]:
+                    if fact[0] == "=":
+                        self.functions[tuple(fact[1])] = float(fact[2])
+                    else:
+                        self.init.add(tuple(fact))
+
+            elif section[0] == ":goal":
+                self.goal = parse_formula(section[1])
+
+        self.objects_of_type: Dict[str, List[str]] = dict()
+        for item, item_type in sorted(self.object_types.items()):
+            for ancestor in self.get_ancestors(item_type):
+                self.objects_of_type.setdefault(ancestor, list()).append(item)
+
+        self.fluents = parsed_domain.fluents
+        self.atom_index: Dict[Atom, int] = dict()
+
+    def get_ancestors(self, item_type: str) -> List[str]:
+        ancestors = [item_type]
+
+        while ancestors[-1] in self.parents and self.parents[ancestors[-1]] not in ancestors:
+            ancestors.append(self.parents[ancestors[-1]])
+
+        return ancestors if ROOT_TYPE in ancestors else ancestors + [ROOT_TYPE]
+
+    def is_static(self, atom: Atom) -> bool:
+        return atom[0] not in self.fluents
+
+    @staticmethod
+    def substitute(arguments: Tuple[str, ...], binding: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(binding.get(argument, argument) for argument in arguments)
+
+    def get_bindings(self, schema: ActionSchema, reachable: Set[Atom]) -> Iterator[Tuple[str, ...]]:
+        parameters = [name for name, _ in schema.parameters]
+        checks: List[List[Any]] = [list() for _ in range(len(parameters) + 1)]
+
+        conjuncts = [schema.precondition]
+        while conjuncts:
+            literal = conjuncts.pop()
+
+            if literal[0] == "and":
+                conjuncts.extend(literal[1])
+                continue
+
+            atom = literal[1] if literal[0] == "not" else literal
+            if atom[0] == "=":
+                terms = atom[1:]
+            elif atom[0] == "atom" and (literal[0] == "atom" or atom[1] not in self.fluents):
+                terms = atom[2]
+            else:
+                continue
+
+            bound_at = max([parameters.index(term) + 1 for term in terms if term in parameters], default=0)
+            checks[bound_at].append(literal)
+
+        def is_consistent(literal: Any, binding: Dict[str, str]) -> bool:
+            is_positive = literal[0] != "not"
+            atom = literal if is_positive else literal[1]
+
+            if atom[0] == "=":
+                return (binding.get(atom[1], atom[1]) == binding.get(atom[2], atom[2])) == is_positive
+
+            return ((atom[1],) + self.substitute(atom[2], binding) in reachable) == is_positive
+
+        def extend(index: int, binding: Dict[str, str]) -> Iterator[Tuple[str, ...]]:
+            if not all(is_consistent(literal, binding) for literal in checks[index]):
+                return
+
+            if index == len(parameters):
+                yield tuple(binding[name] for name in parameters)
+                return
+
+            name, parameter_type = schema.parameters[index]
+            for item in self.objects_of_type.get(parameter_type, []):
+                binding[name] = item
+                yield from extend(index + 1, binding)
+
+            binding.pop(name, None)
+
+        yield from extend(0, dict())
+
+    def explore(self, max_actions: Optional[int] = None) -> Optional[List[Tuple[ActionSchema, Tuple[str, ...]]]]:
+        reachable = set(self.init)
+        ground_actions: Dict[Tuple[str, Tuple[str, ...]], Tuple[ActionSchema, Tuple[str, ...]]] = dict()
+        has_changed = True
+
+        while has_changed:
+            has_changed = False
+
+            for schema in self.schemas:
+                for arguments in self.get_bindings(schema, reachable):
+                    if (schema.name, arguments) in ground_actions:
+                        continue
+
+                    ground_actions[(schema.name, arguments)] = (schema, arguments)
+
+                    if max_actions is not None and len(ground_actions) > max_actions:
+                        return None
+
+                    binding = dict(zip([name for name, _ in schema.parameters], arguments))
+                    for effect in schema.effects:
+                        atom = (effect.atom[0],) + self.substitute(effect.atom[1:], binding)
+
+                        if effect.is_add and atom not in reachable:
+                            reachable.add(atom)
+                            has_changed = True
+
+        for atom in sorted(reachable):
+            if not self.is_static(atom):
+                self.atom_index[atom] = len(self.atom_index)
+
+        return list(ground_actions.values())
+
+    def simplify(self, formula: Any, binding: Dict[str, str]) -> Any:
+        head = formula[0]
+
+        if head == "atom":
+            atom = (formula[1],) + self.substitute(formula[2], binding)
+
+            if self.is_static(atom):
+                return atom in self.init
+
+            return ("atom", self.atom_index[atom]) if atom in self.atom_index else False
+
+        elif head == "=":
+            return binding.get(formula[1], formula[1]) == binding.get(formula[2], formula[2])
+
+        elif head == "not":
+            item = self.simplify(formula[1], binding)
+            return (not item) if isinstance(item, bool) else ("not", item)
+
+        items = list()
+        for item in (self.simplify(sub_formula, binding) for sub_formula in formula[1]):
+            if item is (head == "or"):
+                return item
+
+            elif not isinstance(item, bool):
+                items.extend(item[1] if item[0] == head else [item])
+
+        if not items:
+            return head == "and"
+
+        return items[0] if len(items) == 1 else (head, tuple(items))
+
+    def get_cost(self, schema: ActionSchema, binding: Dict[str, str]) -> float:
+        if schema.cost is None:
+            return 0.0
+
+        if isinstance(schema.cost, str):
+            return float(schema.cost)
+
+        point = (schema.cost[0],) + self.substitute(tuple(schema.cost[1:]), binding)
+        if point not in self.functions:
+            raise ValueError(f"Undefined action cost: {point}")
+
+        return self.functions[point]
+
+    def get_effects(self, effects: List[Effect], binding: Dict[str, str]) -> Tuple[int, int]:
+        add, delete = 0, 0
+
+        for effect in effects:
+            atom = (effect.atom[0],) + self.substitute(effect.atom[1:], binding)
+
+            if atom in self.atom_index:
+                if effect.is_add:
+                    add |= 1 << self.atom_index[atom]
+                else:
+                    delete |= 1 << self.atom_index[atom]
+
+        return add, delete
+
+    def ground_action(self, schema: ActionSchema, arguments: Tuple[str, ...]) -> Optional[GroundAction]:
+        binding = dict(zip([name for name, _ in schema.parameters], arguments))
+        precondition = to_condition(self.simplify(schema.precondition, binding))
+
+        if precondition is None:
+            return None
+
+        unconditional_effects: List[Effect] = list()
+        conditional_effects: Dict[Any, List[Effect]] = dict()
+
+        for effect in schema.effects:
+            condition = self.simplify(effect.condition, binding)
+
+            if condition is True:
+                unconditional_effects.append(effect)
+
+            elif condition is not False:
+                conditional_effects.setdefault(condition, list()).append(effect)
+
+        add, delete = self.get_effects(unconditional_effects, binding)
+        ground_conditional_effects = list()
+
+        for condition, effects in conditional_effects.items():
+            effect_condition = to_condition(condition)
+
+            if effect_condition is not None:
+                ground_conditional_effects.append((effect_condition, *self.get_effects(effects, binding)))
+
+        return GroundAction(
+            name=f"{schema.name} {' '.join(arguments)}",
+            precondition=precondition,
+            add=add,
+            delete=delete,
+            conditional_effects=ground_conditional_effects,
+            cost=self.get_cost(schema, binding),
+        )
+
+    def ground(self, max_actions: Optional[int] = None) -> Optional[GroundTask]:
+        explored_actions = self.explore(max_actions)
+
+        if explored_actions is None:
+            return None
+
+        actions = list()
+        for schema, arguments in explored_actions:
+            action = self.ground_action(schema, arguments)
+
+            if action is not None:
+                actions.append(action)
+
+        goal = to_condition(self.simplify(self.goal, dict()))
+        actions = get_relevant_actions(actions, goal.atoms if goal is not None else 0)
+
+        init = 0
+        for atom in self.init:
+            if atom in self.atom_index:
+                init |= 1 << self.atom_index[atom]
+
+        relevant_atoms = goal.atoms if goal is not None else 0
+        for action in actions:
+            relevant_atoms |= action.requires
+
+        projection = Projection(relevant_atoms)
+        atoms = sorted(self.atom_index, key=lambda atom: self.atom_index[atom])
+
+        return GroundTask(
+            atoms=[atoms[bit] for bit in iterate_bits(relevant_atoms)],
+            init=projection.project(init),
+            goal=projection.project_condition(goal) if goal is not None else None,
+            actions=[projection.project_action(action) for action in actions],
+        )
+
+
+class Projection:
+    """
+    Renumbers the atoms of a task onto the given subset of atoms.
+    """
+
+    def __init__(self, atoms: int) -> None:
+        self.mapping = {bit: index for index, bit in enumerate(iterate_bits(atoms))}
+
+    def project(self, mask: int) -> int:
+        projected_mask = 0
+
+        for bit in iterate_bits(mask):
+            if bit in self.mapping:
+                projected_mask |= 1 << self.mapping[bit]
+
+        return projected_mask
+
+    def project_formula(self, formula: Any) -> Any:
+        if formula[0] == "atom":
+            return "atom", self.mapping[formula[1]]
+
+        elif formula[0] == "not":
+            return "not", self.project_formula(formula[1])
+
+        return formula[0], tuple(self.project_formula(item) for item in formula[1])
+
+    def project_condition(self, condition: Condition) -> Condition:
+        return Condition(
+            self.project(condition.positive),
+            self.project(condition.negative),
+            tuple(self.project_formula(formula) for formula in condition.formulas),
+        )
+
+    def project_action(self, action: GroundAction) -> GroundAction:
+        return GroundAction(
+            name=action.name,
+            precondition=self.project_condition(action.precondition),
+            add=self.project(action.add),
+            delete=self.project(action.delete),
+            conditional_effects=[
+                (self.project_condition(condition), self.project(add), self.project(delete))
+                for condition, add, delete in action.conditional_effects
+            ],
+            cost=action.cost,
+        )
+
+
+def get_relevant_actions(actions: List[GroundAction], goal_atoms: int) -> List[GroundAction]:
+    relevant_atoms = goal_atoms
+    is_relevant = [False] * len(actions)
+    has_changed = True
+
+    while has_changed:
+        has_changed = False
+
+        for index, action in enumerate(actions):
+            if not is_relevant[index] and action.changes & relevant_atoms:
+                is_relevant[index] = True
+                relevant_atoms |= action.requires
+                has_changed = True
+
+    return [action for index, action in enumerate(actions) if is_relevant[index]]
+
+
+def ground(domain: str, problem: str, max_actions: Optional[int] = None) -> Optional[GroundTask]:
+    """
+    Ground a compiled task, or return None if it has more than
+    `max_actions` reachable actions.
+    """
+
+    return Grounder(domain, problem).ground(max_actions)
+
+
+class Simulation:
+    __slots__ = ("state", "cost", "num_steps", "error", "reaches_goal")
+
+    def __init__(self, state: Set[Atom]) -> None:
+        self.state = state
+        self.cost = 0.0
+        self.num_steps = 0
+        self.error: Optional[str] = None
+        self.reaches_goal = False
+
+    @property
+    def is_executable(self) -> bool:
+        return self.error is None
+
+
+class PlanSimulator:
+    """
+    Runs plans action by action on a parsed task, without grounding the
+    rest of it. Actions are written the way the planners return them,
+    as "name arg1 arg2".
+    """
+
+    def __init__(self, domain: Union[str, Domain], problem: str) -> None:
+        self.grounder = Grounder(domain, problem)
+        self.schemas = {schema.name: schema for schema in self.grounder.schemas}
+        self.objects_of_type = {item_type: set(objects) for item_type, objects in self.grounder.objects_of_type.items()}
+
+    def holds(self, formula: Any, binding: Dict[str, str], state: Set[Atom]) -> bool:
+        head = formula[0]
+
+        if head == "atom":
+            return (formula[1],) + self.grounder.substitute(formula[2], binding) in state
+
+        elif head == "=":
+            return binding.get(formula[1], formula[1]) == binding.get(formula[2], formula[2])
+
+        elif head == "not":
+            return not self.holds(formula[1], binding, state)
+
+        elif head == "and":
+            return all(self.holds(item, binding, state) for item in formula[1])
+
+        return any(self.holds(item, binding, state) for item in formula[1])
+
+    def bind(self, action: str) -> Tuple[ActionSchema, Dict[str, str]]:
+        name, *arguments = action.lower().split()
+        schema = self.schemas.get(name, None)
+
+        if schema is None:
+            raise ValueError(f"Unknown action: {name}")
+
+        if len(arguments) != len(schema.parameters):
+            raise ValueError(f"Expected {len(schema.parameters)} arguments for {name}, got {len(arguments)}")
+
+        for argument, (parameter, parameter_type) in zip(arguments, schema.parameters):
+            if argument not in self.objects_of_type.get(parameter_type, set()):
+                raise ValueError(f"Argument {argument} of {name} is not of type {parameter_type}")
+
+        return schema, dict(zip([parameter for parameter, _ in schema.parameters], arguments))
+
+    def apply(self, action: str, state: Set[Atom]) -> Tuple[Set[Atom], float]:
+        schema, binding = self.bind(action)
+
+        if not self.holds(schema.precondition, binding, state):
+            raise ValueError(f"Precondition of {action.strip()} does not hold")
+
+        add, delete = set(), set()
+
+        for effect in schema.effects:
+            if self.holds(effect.condition, binding, state):
+                atom = (effect.atom[0],) + self.grounder.substitute(effect.atom[1:], binding)
+                (add if effect.is_add else delete).add(atom)
+
+        return (state - delete) | add, self.grounder.get_cost(schema, binding)
+
+    def simulate(self, actions: List[str]) -> Simulation:
+        simulation = Simulation(set(self.grounder.init))
+
+        for action in actions:
+            try:
+                simulation.state, cost = self.apply(action, simulation.state)
+
+            except ValueError as error:
+                simulation.error = f"Step {simulation.num_steps + 1}: {error}"
+                return simulation
+
+            simulation.cost += cost
+            simulation.num_steps += 1
+
+        simulation.reaches_goal = self.holds(self.grounder.goal, dict(), simulation.state)
+        return simulation
+
+
+class LandmarkCutHeuristic:
+    """
+    Admissible LM-cut over the delete relaxation, ignoring negative and
+    disjunctive conditions. Conditional effects become operators of their
+    own that share the cost of their action.
+    """
+
+    def __init__(self, task: GroundTask) -> None:
+        # the goal operator has index -1, which picks the trailing zero cost
+        self.action_costs = [action.cost for action in task.actions] + [0.0]
+        self.source = len(task.atoms)
+        self.target = len(task.atoms) + 1
+
+        self.operators: List[Tuple[List[int], List[int], int]] = list()
+
+        for index, action in enumerate(task.actions):
+            precondition = list(iterate_bits(action.precondition.positive))
+            self.operators.append((precondition or [self.source], list(iterate_bits(action.add)), index))
+
+            for condition, add, _ in action.conditional_effects:
+                condition_bits = [bit for bit in iterate_bits(condition.positive) if bit not in precondition]
+                self.operators.append((precondition + condition_bits or [self.source], list(iterate_bits(add)), index))
+
+        goal = list(iterate_bits(task.goal.positive)) if task.goal is not None else list()
+        self.operators.append((goal or [self.source], [self.target], -1))
+
+        self.precondition_of: List[List[int]] = [list() for _ in range(len(task.atoms) + 2)]
+        self.achievers: List[List[int]] = [list() for _ in range(len(task.atoms) + 2)]
+
+        for index, (precondition, add, _) in enumerate(self.operators):
+            for bit in precondition:
+                self.precondition_of[bit].append(index)
+
+            for bit in add:
+                self.achievers[bit].append(index)
+
+        self.precondition_counts = [len(precondition) for precondition, _, _ in self.operators]
+        self.values: Dict[int, float] = dict()
+
+    def __call__(self, state: int) -> float:
+        if state not in self.values:
+            self.values[state] = self.compute(state)
+
+        return self.values[state]
+
+    def get_max_values(self, state: int, costs: List[float]) -> Tuple[List[float], List[int]]:
+        values = [math.inf] * len(self.precondition_of)
+        tentative = [math.inf] * len(self.precondition_of)
+        supporters = [-1] * len(self.operators)
+        remaining = list(self.precondition_counts)
+
+        operators, precondition_of = self.operators, self.precondition_of
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        queue: List[Tuple[float, int]] = [(0.0, self.source)] + [(0.0, bit) for bit in iterate_bits(state)]
+        for _, bit in queue:
+            tentative[bit] = 0.0
+
+        while queue:
+            value, bit = heappop(queue)
+
+            if values[bit] != math.inf:
+                continue
+
+            values[bit] = value
+
+            for index in precondition_of[bit]:
+                remaining[index] -= 1
+
+                if remaining[index] == 0:
+                    supporters[index] = bit
+                    _, add, action_index = operators[index]
+                    operator_value = value + costs[action_index]
+
+                    for added_bit in add:
+                        if operator_value < tentative[added_bit]:
+                            tentative[added_bit] = operator_value
+                            heappush(queue, (operator_value, added_bit))
+
+        return values, supporters
+
+    def compute(self, state: int) -> float:
+        costs = list(self.action_costs)
+        total = 0.0
+
+        while True:
+            values, supporters = self.get_max_values(state, costs)
+
+            if values[self.target] == math.inf:
+                return math.inf
+
+            if values[self.target] == 0:
+                return total
+
+            goal_zone = {self.target}
+            stack = [self.target]
+
+            while stack:
+                for index in self.achievers[stack.pop()]:
+                    action_index = self.operators[index][2]
+                    supporter = supporters[index]
+
+                    if supporter >= 0 and supporter not in goal_zone and costs[action_index] == 0:
+                        goal_zone.add(supporter)
+                        stack.append(supporter)
+
+            cut: Set[int] = set()
+            visited = {self.source} | set(iterate_bits(state))
+            stack = list(visited)
+
+            while stack:
+                bit = stack.pop()
+
+                for index in self.precondition_of[bit]:
+                    if supporters[index] != bit:
+                        continue
+
+                    _, add, action_index = self.operators[index]
+
+                    if not goal_zone.isdisjoint(add):
+                        cut.add(action_index)
+                        continue
+
+                    for added_bit in add:
+                        if added_bit not in visited:
+                            visited.add(added_bit)
+                            stack.append(added_bit)
+
+            if not cut:
+                return total
+
+            cut_cost = min(costs[action_index] for action_index in cut)
+            total += cut_cost
+
+            for action_index in cut:
+                costs[action_index] -= cut_cost
@@ -1,3 +1,36 @@
+from enum import Enum
+
 TIMEOUT = 1800
 NUM_PLANS = 10
 QUALITY_BOUND = 1.0
+POOL_SIZE = 4
+MAX_JOBS_PER_WORKER = 100
+JOB_TIMEOUT_GRACE = 10
+CANCEL_POLL_INTERVAL = 0.1
+PLAN_POLL_INTERVAL = 0.01
+OPTIMAL_HEURISTIC = "lmcut(transform=undo_to_origin())"
+SATISFICING_HEURISTIC = "ff()"
+PLAN_FILE_NAME = "sas_plan"
+EXTRA_GOAL_OPERATOR = "__extra_goal_operator"
+MAX_GROUND_ACTIONS = 200
+MAX_SEARCH_TIME = 0.5
+COST_TOLERANCE = 1e-9
+
+
+class PlannerIOOptions(Enum):
+    FILE = "FILE"
+    MEMFD = "MEMFD"
+    RAM = "RAM"
+
+
+class SearchOptions(Enum):
+    TOPQ_UNORDERED = "TOPQ_UNORDERED"
+    TOPQ = "TOPQ"
+    TOPK = "TOPK"
+    OPTIMAL = "OPTIMAL"
+    SATISFICING = "SATISFICING"
+
+
+class PortfolioPolicy(Enum):
+    FIRST_SOLVED = "FIRST_SOLVED"
+    PREFER_OPTIMAL = "PREFER_OPTIMAL"
@@ -1,7 +1,17 @@
 from nl2flow.compile.flow import Flow
+from nl2flow.compile.symbols import SymbolTable
 from nl2flow.compile.utils import Transform, revert_string_transform, revert_string_transforms
-from nl2flow.plan.schemas import RawPlan, PlannerResponse, ClassicalPlan as Plan, Action
-from nl2flow.plan.options import TIMEOUT
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.grounding import PlanSimulator
+from nl2flow.plan.schemas import (
+    RawPlan,
+    RawPlannerResult,
+    PlannerConfig,
+    PlannerMetrics,
+    PlannerResponse,
+    ClassicalPlan as Plan,
+    Action,
+)
 from nl2flow.plan.utils import parse_action, group_items, find_operator, unpack_list_of_signature_items
 from nl2flow.compile.schemas import PDDL
 from nl2flow.debug.schemas import DebugFlag
@@ -17,26 +27,104 @@ from nl2flow.compile.options import (
 )
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Set, Optional
+from typing import Any, Callable, Dict, Iterator, List, Set, Optional
 from copy import deepcopy
+from functools import partial
+
+import asyncio
+import re
+
+# the lines of the Fast Downward output that the metrics are read from, the last match wins
+METRIC_PATTERNS = {
+    "translator_time": re.compile(r"^Done! \[[\d.]+s CPU, ([\d.]+)s wall-clock\]", re.MULTILINE),
+    "translator_variables": re.compile(r"^Translator variables: (\d+)", re.MULTILINE),
+    "translator_operators": re.compile(r"^Translator operators: (\d+)", re.MULTILINE),
+    "translator_task_size": re.compile(r"^Translator task size: (\d+)", re.MULTILINE),
+    "search_time": re.compile(r"^(?:\[t=[^]]*\] )?Search time: ([\d.e+-]+)s", re.MULTILINE),
+    "expansions": re.compile(r"^(?:\[t=[^]]*\] )?Expanded (\d+) state\(s\)\.", re.MULTILINE),
+    "evaluations": re.compile(r"^(?:\[t=[^]]*\] )?Evaluations: (\d+)", re.MULTILINE),
+    "generated": re.compile(r"^(?:\[t=[^]]*\] )?Generated (\d+) state\(s\)\.", re.MULTILINE),
+}
+
+PEAK_MEMORY_PATTERN = re.compile(r"^(?:Translator p|P)eak memory: (\d+) KB", re.MULTILINE)
+QUALITY_BOUND_PATTERN = re.compile(r"Termination criteria with top_q used=1")
+QUALITY_BOUND_HIT_PATTERN = re.compile(r"termination due to target_cost_bound")
 
 
 class Planner(ABC):
     def __init__(self) -> None:
-        self._timeout: int = TIMEOUT
+        self._config: PlannerConfig = PlannerConfig()
+        self._cache: Optional[PlannerCache] = None
+        self._metrics_callback: Optional[Callable[[PlannerMetrics], None]] = None
+
+    @property
+    def config(self) -> PlannerConfig:
+        return self._config
+
+    @config.setter
+    def config(self, config: PlannerConfig) -> None:
+        self._config = config
 
     @property
     def timeout(self) -> int:
-        return self._timeout
+        return self._config.timeout
 
     @timeout.setter
     def timeout(self, set_timeout: int) -> None:
-        self._timeout = int(set_timeout)
+        self._config = self._config.model_copy(update={"timeout": int(set_timeout)})
+
+    @property
+    def cache(self) -> Optional[PlannerCache]:
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Optional[PlannerCache]) -> None:
+        self._cache = cache
+
+    @property
+    def metrics_callback(self) -> Optional[Callable[[PlannerMetrics], None]]:
+        return self._metrics_callback
+
+    @metrics_callback.setter
+    def metrics_callback(self, metrics_callback: Optional[Callable[[PlannerMetrics], None]]) -> None:
+        self._metrics_callback = metrics_callback
+
+    def report_metrics(self, raw_planner_result: RawPlannerResult) -> None:
+        if self.metrics_callback is not None and raw_planner_result.metrics is not None:
+            self.metrics_callback(raw_planner_result.metrics)
+
+    def cache_settings(self, config: Optional[PlannerConfig] = None) -> Dict[str, Any]:
+        return (config or self.config).model_dump(mode="json")
+
+    def get_cached_result(self, pddl: PDDL, config: Optional[PlannerConfig] = None) -> Optional[RawPlannerResult]:
+        if self.cache is None:
+            return None
+
+        return self.cache.get(self.cache.make_key(pddl, **self.cache_settings(config)))
+
+    def cache_result(
+        self, pddl: PDDL, raw_planner_result: RawPlannerResult, config: Optional[PlannerConfig] = None
+    ) -> None:
+        if self.cache is not None:
+            self.cache.put(self.cache.make_key(pddl, **self.cache_settings(config)), raw_planner_result)
 
     @abstractmethod
     def plan(self, pddl: PDDL, **kwargs: Any) -> PlannerResponse:
         pass
 
+    async def plan_async(self, pddl: PDDL, **kwargs: Any) -> PlannerResponse:
+        """
+        Runs `plan` on the default executor. Cancelling the task does not
+        stop a thread that is already planning, so planners that can stop
+        a search (Kstar, Astar) override this.
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.plan, pddl, **kwargs))
+
+    def iter_plans(self, pddl: PDDL, **kwargs: Any) -> Iterator[Plan]:
+        yield from self.plan(pddl, **kwargs).list_of_plans
+
     @classmethod
     def post_process(cls, planner_response: PlannerResponse, **kwargs: Any) -> PlannerResponse:
         flow_object: Flow = kwargs["flow"]
@@ -64,6 +152,67 @@ class Planner(ABC):
 
 
 class FDDerivedPlanner(ABC):
+    @classmethod
+    def read_planner_result(cls, pddl: PDDL, planner_result: Dict[str, Any]) -> RawPlannerResult:
+        result = RawPlannerResult(pddl=pddl, list_of_plans=planner_result.get("plans", []))
+        result.error_running_planner = False
+        result.is_no_solution = planner_result.get("unsolvable", None)
+        result.is_timeout = planner_result.get("timeout_triggered", None)
+        result.planner_output = planner_result.get("planner_output")
+        result.planner_error = planner_result.get("planner_error")
+        result.metrics = get_planner_metrics(result.planner_output or "", len(result.list_of_plans))
+
+        if result.error_running_planner is False and result.is_no_solution is False and result.is_timeout is not True:
+            result.no_plan_needed = result.best_plan is None or result.best_plan.actions == []
+
+        return result
+
+    def replan(
+        self,
+        pddl: PDDL,
+        previous: Optional[PlannerResponse],
+        config: Optional[PlannerConfig] = None,
+        **kwargs: Any,
+    ) -> PlannerResponse:
+        """
+        Reuse the previous plans if what is left of them still reaches the
+        goal from the new initial state, and only search otherwise. The
+        plans that are kept are not checked for optimality.
+        """
+
+        raw_planner_result = reuse_plans(pddl, previous) if previous is not None else None
+
+        if raw_planner_result is None:
+            planner: Any = self
+            return planner.plan(pddl, config=config, **kwargs)
+
+        return self.plan_from_raw(raw_planner_result, **kwargs)
+
+    def plan_from_raw(self, raw_planner_result: RawPlannerResult, **kwargs: Any) -> PlannerResponse:
+        planner_response = PlannerResponse.initialize_from_raw_plans(raw_planner_result)
+
+        # noinspection PyBroadException
+        try:
+            planner_response.list_of_plans = self.parse(raw_planner_result.list_of_plans, **kwargs)
+
+            if not planner_response.no_plan_needed:
+                planner_response.no_plan_needed = (
+                    planner_response.best_plan is not None and planner_response.best_plan.plan == []
+                )
+
+            planner_response.is_parse_error = (
+                len(planner_response.list_of_plans) == 0 and planner_response.is_no_solution is False
+            )
+
+            planner_response = Planner.post_process(planner_response, **kwargs)
+            return planner_response
+
+        except Exception as error:
+            planner_response.no_plan_needed = None
+            planner_response.is_parse_error = True
+            planner_response.stderr = error
+            return planner_response
+
     @classmethod
     def parse(cls, raw_plans: List[RawPlan], **kwargs: Any) -> List[Plan]:
         list_of_plans = list()
@@ -72,6 +221,9 @@ class FDDerivedPlanner(ABC):
         debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
         transforms: List[Transform] = kwargs.get("transforms", [])
 
+        symbols = SymbolTable()
+        symbols.add_operators(flow_object.flow_definition.operators)
+
         for plan in raw_plans:
             new_plan = Plan(cost=plan.cost, reference=plan.actions)
             actions = plan.actions
@@ -107,6 +259,7 @@ class FDDerivedPlanner(ABC):
                         flow_object=flow_object,
                         transforms=transforms,
                         debug_flag=debug_flag,
+                        symbols=symbols,
                     )
                 else:
                     raise ValueError("Could not parse action name.")
@@ -114,7 +267,7 @@ class FDDerivedPlanner(ABC):
                 if new_action:
                     # TODO: Temporary till state tracking, ISS134
                     if isinstance(new_action, Action):
-                        cache_known_items(new_action, cached_items, **kwargs)
+                        cache_known_items(new_action, cached_items, symbols, **kwargs)
 
                     new_plan.plan.append(new_action)
 
@@ -124,7 +277,12 @@ class FDDerivedPlanner(ABC):
         return list_of_plans
 
 
-def cache_known_items(new_action: Action, cached_items: List[str], **kwargs: Any) -> None:
+def cache_known_items(
+    new_action: Action,
+    cached_items: List[str],
+    symbols: Optional[SymbolTable] = None,
+    **kwargs: Any,
+) -> None:
     flow_object: Flow = kwargs["flow"]
     debug_flag: Optional[DebugFlag] = kwargs.get("debug_flag", None)
 
@@ -144,7 +302,7 @@ def cache_known_items(new_action: Action, cached_items: List[str], **kwargs: Any
         new_inputs = []
         new_parameters = []
 
-        operator_definition = find_operator(new_action.name, flow_object)
+        operator_definition = find_operator(new_action.name, flow_object, symbols)
 
         if operator_definition is None:
             return None
@@ -167,3 +325,65 @@ def cache_known_items(new_action: Action, cached_items: List[str], **kwargs: Any
         if LifeCycleOptions.uncertain_on_use in flow_object.variable_life_cycle:
             for item in new_action.inputs:
                 cached_items = [ci for ci in cached_items if ci != item]
+
+
+def get_valid_suffix(simulator: PlanSimulator, actions: List[str]) -> Optional[RawPlan]:
+    for start in range(len(actions), -1, -1):
+        simulation = simulator.simulate(actions[start:])
+
+        if simulation.reaches_goal:
+            return RawPlan(actions=actions[start:], cost=simulation.cost)
+
+    return None
+
+
+def reuse_plans(pddl: PDDL, previous: PlannerResponse) -> Optional[RawPlannerResult]:
+    # noinspection PyBroadException
+    try:
+        simulator = PlanSimulator(pddl.domain, pddl.problem)
+
+    except Exception:
+        return None
+
+    raw_plans: List[RawPlan] = list()
+
+    for plan in previous.list_of_plans:
+        raw_plan = get_valid_suffix(simulator, plan.reference)
+
+        if raw_plan is not None and all(raw_plan.actions != other.actions for other in raw_plans):
+            raw_plans.append(raw_plan)
+
+    if not raw_plans:
+        return None
+
+    raw_plans.sort(key=lambda raw_plan: raw_plan.cost)
+    raw_planner_result = RawPlannerResult(
+        pddl=pddl,
+        list_of_plans=raw_plans,
+        error_running_planner=False,
+        is_no_solution=False,
+        is_timeout=False,
+    )
+
+    raw_planner_result.no_plan_needed = raw_plans[0].actions == []
+    return raw_planner_result
+
+
+def get_planner_metrics(planner_output: str, num_plans: int) -> PlannerMetrics:
+    values: Dict[str, Any] = {"num_plans": num_plans}
+
+    for name, pattern in METRIC_PATTERNS.items():
+        matches = pattern.findall(planner_output)
+
+        if matches:
+            values[name] = matches[-1]
+
+    peak_memory = [int(match) for match in PEAK_MEMORY_PATTERN.findall(planner_output)]
+    if peak_memory:
+        values["peak_memory"] = max(peak_memory)
+
+    # only the top quality searches have a quality bound to hit
+    if QUALITY_BOUND_PATTERN.search(planner_output):
+        values["is_quality_bound_hit"] = QUALITY_BOUND_HIT_PATTERN.search(planner_output) is not None
+
+    return PlannerMetrics.model_validate(values)
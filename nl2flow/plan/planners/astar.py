@@ -0,0 +1,321 @@
+from nl2flow.plan.schemas import RawPlannerResult, PlannerConfig, PlannerResponse
+from nl2flow.plan.options import (
+    COST_TOLERANCE,
+    MAX_GROUND_ACTIONS,
+    MAX_SEARCH_TIME,
+    SearchOptions,
+)
+from nl2flow.plan.grounding import GroundTask, LandmarkCutHeuristic, ground
+from nl2flow.plan.planner import Planner, FDDerivedPlanner
+from nl2flow.compile.schemas import PDDL
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import asyncio
+import heapq
+import math
+import threading
+import time
+
+Edge = Tuple[int, int, float]
+
+
+def get_path(state: int, parents: Dict[int, Tuple[int, int]]) -> List[int]:
+    path = list()
+
+    while state in parents:
+        state, index = parents[state]
+        path.append(index)
+
+    return path[::-1]
+
+
+def enumerate_paths(
+    init: int,
+    goals: List[int],
+    costs: Dict[int, float],
+    incoming: Dict[int, List[Edge]],
+    num_plans: int,
+    bound: float,
+    is_unordered: bool,
+) -> Iterator[Tuple[List[int], float]]:
+    """
+    Yields paths from the initial state to the goal states, cheapest first,
+    by extending partial paths backwards from the goals. The priority of a
+    partial path is its cost plus the cost of the cheapest way to reach
+    its first state, so a complete path is never popped too early.
+    """
+
+    queue: List[Tuple[float, int, int, Tuple[int, ...], Tuple[int, ...]]] = list()
+    seen: Set[Tuple[int, Tuple[int, ...]]] = set()
+    counter = 0
+
+    for goal in goals:
+        queue.append((costs[goal], counter, goal, (), (goal,)))
+        counter += 1
+
+    heapq.heapify(queue)
+    num_paths = 0
+
+    while queue and num_paths < num_plans:
+        priority, _, state, path, path_states = heapq.heappop(queue)
+
+        if state == init:
+            num_paths += 1
+            yield list(path), priority
+            continue
+
+        for parent, index, action_cost in incoming.get(state, []):
+            if parent in path_states:
+                continue
+
+            new_priority = priority + costs[parent] + action_cost - costs[state]
+            if new_priority > bound + COST_TOLERANCE * max(1.0, bound):
+                continue
+
+            new_path = (index,) + path
+            if is_unordered:
+                key = (parent, tuple(sorted(new_path)))
+
+                if key in seen:
+                    continue
+
+                seen.add(key)
+
+            heapq.heappush(queue, (new_priority, counter, parent, new_path, (parent,) + path_states))
+            counter += 1
+
+
+def search(
+    task: GroundTask,
+    config: PlannerConfig,
+    max_time: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    A* with LM-cut, reopening closed states when a cheaper path to them
+    turns up (greedy best-first for the satisficing mode). For more
+    than one plan, the search goes on until the quality bound and keeps
+    every edge that fits under it, and the plans are read off that graph
+    in order of cost; in the unordered modes, plans that are reorderings
+    of each other are only kept once. Returns None if the search runs
+    longer than `max_time` seconds or the `cancel_event` is set.
+    """
+
+    start_time = time.monotonic()
+    deadline = start_time + config.timeout if config.timeout else math.inf
+    give_up_time = start_time + max_time if max_time is not None else math.inf
+
+    num_plans = 1 if config.is_single_plan else config.num_plans
+    is_unordered = config.search in [SearchOptions.TOPQ_UNORDERED, SearchOptions.OPTIMAL, SearchOptions.SATISFICING]
+    is_greedy = config.search == SearchOptions.SATISFICING
+
+    plans: List[Dict[str, Any]] = list()
+    timeout_triggered = False
+    expanded, generated = 0, 0
+
+    if task.goal is not None:
+        heuristic = LandmarkCutHeuristic(task)
+        initial_value = heuristic(task.init)
+
+        costs: Dict[int, float] = {task.init: 0.0}
+        parents: Dict[int, Tuple[int, int]] = dict()
+        incoming: Dict[int, List[Edge]] = dict()
+        edges: Set[Tuple[int, int]] = set()
+        closed: Set[int] = set()
+        goals: List[int] = list()
+
+        open_list = [] if initial_value == math.inf else [(initial_value, 0.0, task.init)]
+        bound = math.inf
+
+        while open_list:
+            now = time.monotonic()
+
+            if now > give_up_time or (cancel_event is not None and cancel_event.is_set()):
+                return None
+
+            if now > deadline:
+                timeout_triggered = True
+                break
+
+            priority, _, state = heapq.heappop(open_list)
+
+            if state in closed:
+                continue
+
+            if not is_greedy and priority > bound + COST_TOLERANCE * max(1.0, bound):
+                break
+
+            closed.add(state)
+            cost = costs[state]
+
+            if task.goal.holds(state):
+                if state not in goals:
+                    goals.append(state)
+
+                if num_plans == 1:
+                    break
+
+                bound = min(bound, cost * config.quality_bound)
+                continue
+
+            expanded += 1
+
+            for index, action in enumerate(task.actions):
+                if not action.precondition.holds(state):
+                    continue
+
+                successor = action.apply(state)
+                successor_cost = cost + action.cost
+
+                if successor == state:
+                    continue
+
+                value = heuristic(successor)
+                if value == math.inf or successor_cost + value > bound + COST_TOLERANCE * max(1.0, bound):
+                    continue
+
+                generated += 1
+
+                # a reopened state is expanded again, but each edge goes into the graph once
+                if num_plans > 1 and (state, index) not in edges:
+                    edges.add((state, index))
+                    incoming.setdefault(successor, list()).append((state, index, action.cost))
+
+                if successor_cost < costs.get(successor, math.inf):
+                    # LM-cut is not consistent, so a closed state can turn up again on a cheaper path
+                    if successor in closed:
+                        if is_greedy:
+                            continue
+
+                        closed.remove(successor)
+
+                    costs[successor] = successor_cost
+                    parents[successor] = (state, index)
+                    heapq.heappush(
+                        open_list,
+                        (value, successor_cost, successor) if is_greedy else (successor_cost + value, value, successor),
+                    )
+
+        if num_plans == 1:
+            paths: Iterable[Tuple[List[int], float]] = [(get_path(goal, parents), costs[goal]) for goal in goals]
+        else:
+            paths = enumerate_paths(task.init, goals, costs, incoming, num_plans, bound, is_unordered)
+
+        for path, cost in paths:
+            plans.append({"actions": [task.actions[index].name for index in path], "cost": cost})
+
+    planner_output = "\n".join(
+        [
+            f"Expanded {expanded} state(s).",
+            f"Generated {generated} state(s).",
+            f"Found plans: {len(plans)}",
+            f"Search time: {time.monotonic() - start_time}s",
+        ]
+    )
+
+    return {
+        "planner_output": planner_output,
+        "planner_error": "",
+        "timeout_triggered": timeout_triggered,
+        "plans": plans,
+        "unsolvable": len(plans) == 0 and not timeout_triggered,
+    }
+
+
+class Astar(Planner, FDDerivedPlanner):
+    """
+    In-process planner for small flows: grounds the compiled PDDL and
+    searches it in Python, which saves starting the Kstar process. With a
+    `fallback` planner, tasks with more than `max_actions` ground actions,
+    or whose search runs longer than `max_time` seconds, are handed to the
+    fallback.
+    """
+
+    def __init__(
+        self,
+        fallback: Optional[Planner] = None,
+        max_actions: int = MAX_GROUND_ACTIONS,
+        max_time: float = MAX_SEARCH_TIME,
+    ) -> None:
+        super().__init__()
+        self.fallback = fallback
+        self.max_actions = max_actions
+        self.max_time = max_time
+
+    def cache_settings(self, config: Optional[PlannerConfig] = None) -> Dict[str, Any]:
+        return {**super().cache_settings(config), "planner": type(self).__name__}
+
+    def raw_plan(
+        self,
+        pddl: PDDL,
+        config: Optional[PlannerConfig] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Optional[RawPlannerResult]:
+        config = config or self.config
+        raw_planner_result = self.get_cached_result(pddl, config)
+
+        if raw_planner_result is None:
+            raw_planner_result = self.run_planner(pddl, config, cancel_event)
+
+            if raw_planner_result is not None:
+                self.cache_result(pddl, raw_planner_result, config)
+                self.report_metrics(raw_planner_result)
+
+        return raw_planner_result
+
+    def run_planner(
+        self, pddl: PDDL, config: PlannerConfig, cancel_event: Optional[threading.Event] = None
+    ) -> Optional[RawPlannerResult]:
+        has_fallback = self.fallback is not None
+
+        # noinspection PyBroadException
+        try:
+            task = ground(pddl.domain, pddl.problem, self.max_actions if has_fallback else None)
+            planner_result = None
+
+            if task is not None:
+                planner_result = search(task, config, self.max_time if has_fallback else None, cancel_event)
+
+            if cancel_event is not None and cancel_event.is_set():
+                return RawPlannerResult(pddl=pddl, error_running_planner=True, stderr="Planner job cancelled.")
+
+            return None if planner_result is None else self.read_planner_result(pddl, planner_result)
+
+        except Exception as error:
+            if has_fallback:
+                return None
+
+            return RawPlannerResult(
+                pddl=pddl,
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=error,
+            )
+
+    def plan(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        raw_planner_result = self.raw_plan(pddl, config)
+
+        if raw_planner_result is None:
+            assert self.fallback is not None, "Only a planner with a fallback gives up on a task."
+            return self.fallback.plan(pddl, config=config or self.config, **kwargs)
+
+        return self.plan_from_raw(raw_planner_result, **kwargs)
+
+    async def plan_async(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        # the search runs on a thread, which cannot be interrupted, so it polls the event instead
+        cancel_event = threading.Event()
+        loop = asyncio.get_running_loop()
+
+        try:
+            raw_planner_result = await loop.run_in_executor(None, partial(self.raw_plan, pddl, config, cancel_event))
+
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+        if raw_planner_result is None:
+            assert self.fallback is not None, "Only a planner with a fallback gives up on a task."
+            return await self.fallback.plan_async(pddl, config=config or self.config, **kwargs)
+
+        return self.plan_from_raw(raw_planner_result, **kwargs)
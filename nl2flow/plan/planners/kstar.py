@@ -1,56 +1,302 @@
-from nl2flow.plan.schemas import RawPlannerResult, PlannerResponse
-from nl2flow.plan.options import QUALITY_BOUND, NUM_PLANS
+from nl2flow.plan.schemas import RawPlannerResult, RawPlan, PlannerConfig, PlannerResponse, ClassicalPlan
+from nl2flow.plan.options import (
+    OPTIMAL_HEURISTIC,
+    SATISFICING_HEURISTIC,
+    PLAN_POLL_INTERVAL,
+    PLAN_FILE_NAME,
+    EXTRA_GOAL_OPERATOR,
+    PlannerIOOptions,
+    SearchOptions,
+)
 from nl2flow.compile.schemas import PDDL
-from typing import Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 from kstar_planner import planners
+from kstar_planner.driver import returncodes
 
-from nl2flow.utility.file_utility import open_atomic
+from nl2flow.utility.file_utility import open_atomic, memfd_file, ram_directory, supports_memfd
 from nl2flow.plan.planner import Planner, FDDerivedPlanner
 
+from contextlib import contextmanager
+
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
 import tempfile
+import time
+import weakref
+
+
+def get_planner_args(domain_file: Path, problem_file: Path, config: PlannerConfig) -> List[str]:
+    is_unordered = config.search == SearchOptions.TOPQ_UNORDERED
+    max_time = f", max_time={config.timeout}" if config.timeout else ""
+
+    if config.heuristic is not None:
+        heuristic = config.heuristic
+    elif config.search == SearchOptions.SATISFICING:
+        heuristic = SATISFICING_HEURISTIC
+    else:
+        heuristic = OPTIMAL_HEURISTIC
+
+    # noinspection PyProtectedMember
+    planner_args = planners._overall_time_limit_args(config.timeout) + [
+        str(domain_file.absolute()),
+        str(problem_file.absolute()),
+    ]
+
+    # the single plan searches write their plan to found_plans/sas_plan in the working directory
+    if config.search == SearchOptions.OPTIMAL:
+        return planner_args + ["--search", f"astar({heuristic}{max_time})"]
+
+    if config.search == SearchOptions.SATISFICING:
+        return planner_args + ["--search", f"lazy_greedy([{heuristic}], preferred=[{heuristic}]{max_time})"]
+
+    if config.search == SearchOptions.TOPK:
+        stopping = f"k={config.num_plans}, q={config.quality_bound}"
+    else:
+        stopping = f"q={config.quality_bound}, k={config.num_plans}"
+
+    search = (
+        f"kstar({heuristic}, {stopping}{max_time}, find_unordered_plans={str(is_unordered).lower()}, "
+        "dump_plan_files=false, json_file_to_dump=PLANS_JSON_NAME, symmetries=sym"
+    )
+
+    if is_unordered:
+        search += (
+            ", pruning=limited_pruning(pruning=atom_centric_stubborn_sets("
+            "use_sibling_shortcut=true, atom_selection_strategy=quick_skip))"
+        )
+
+    return planner_args + [
+        "--symmetries",
+        "sym=structural_symmetries(time_bound=0,search_symmetries=oss,stabilize_initial_state=false,"
+        "keep_operator_symmetries=true)",
+        "--search",
+        f"{search})",
+    ]
+
+
+def collect_planner_result(
+    planner_output: str,
+    planner_error: str,
+    return_code: Optional[int],
+    plans_file: Path,
+    plan_file: Optional[Path] = None,
+) -> Dict[str, Any]:
+    # noinspection PyProtectedMember
+    timeout_triggered = return_code in planners._TIMEOUT_EXIT_CODES or "search::time limit" in planner_output
+    plans = []
+
+    if plans_file.is_file() and plans_file.stat().st_size > 0:
+        plans = json.loads(plans_file.read_text(encoding="UTF-8"))["plans"]
+
+    elif plan_file is not None:
+        raw_plan = read_plan_file(plan_file)
+        plans = [] if raw_plan is None else [raw_plan.model_dump()]
+
+    return {
+        "planner_output": planner_output,
+        "planner_error": planner_error,
+        "timeout_triggered": timeout_triggered,
+        "plans": plans,
+        "unsolvable": len(plans) == 0 and not timeout_triggered and len(planner_error) == 0,
+    }
+
+
+def read_plan_file(plan_file: Path) -> Optional[RawPlan]:
+    if not plan_file.is_file():
+        return None
+
+    lines = plan_file.read_text().splitlines()
+
+    # the plan file is complete once the planner has written the cost line
+    if not lines or not lines[-1].startswith("; cost ="):
+        return None
+
+    # plain searches also write out the operator that the search adds for the goal
+    actions = [line.strip()[1:-1] for line in lines[:-1] if line.startswith("(")]
+
+    return RawPlan(
+        actions=[action for action in actions if action != EXTRA_GOAL_OPERATOR],
+        cost=float(lines[-1].split("=")[1].split()[0]),
+    )
+
+
+def is_planner_error(return_code: Optional[int]) -> bool:
+    # flows that need no plan make this build exit with SEARCH_UNSUPPORTED, which is not an error here
+    if return_code is None or return_code == returncodes.SEARCH_UNSUPPORTED:
+        return False
+
+    return return_code < 0 or bool(returncodes.is_unrecoverable(return_code))
+
+
+def kill_process_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def run_planner_in(scratch_dir: str, planner_args: List[str]) -> Dict[str, Any]:
+    plans_file = Path(scratch_dir) / "plans.json"
+    plan_file = Path(scratch_dir) / "found_plans" / PLAN_FILE_NAME
+
+    for stale_file in [plans_file, plan_file]:
+        stale_file.unlink(missing_ok=True)
+
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-B",
+            "-m",
+            "kstar_planner.driver.main",
+            *planners.default_build_args,
+            *[arg.replace("PLANS_JSON_NAME", str(plans_file)) for arg in planner_args],
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=scratch_dir,
+    )
+
+    return collect_planner_result(
+        process.stdout.decode(), process.stderr.decode(), process.returncode, plans_file, plan_file
+    )
 
 
 class Kstar(Planner, FDDerivedPlanner):
-    def __call_to_planner(self, pddl: PDDL) -> RawPlannerResult:
-        with tempfile.NamedTemporaryFile() as domain_temp, tempfile.NamedTemporaryFile() as problem_temp:
-            domain_file = Path(tempfile.gettempdir()) / domain_temp.name
-            problem_file = Path(tempfile.gettempdir()) / problem_temp.name
-
-            with open_atomic(domain_file, "w") as domain_handle:
-                domain_handle.write(pddl.domain)
-
-            with open_atomic(problem_file, "w") as problem_handle:
-                problem_handle.write(pddl.problem)
-
-            planner_result = planners.plan_unordered_topq(
-                domain_file=domain_file,
-                problem_file=problem_file,
-                timeout=self.timeout,
-                quality_bound=QUALITY_BOUND,
-                number_of_plans_bound=NUM_PLANS,
+    def __init__(self, io_mode: PlannerIOOptions = PlannerIOOptions.FILE) -> None:
+        super().__init__()
+        self.io_mode = io_mode
+        self._scratch_dir: Optional[str] = None
+
+    @property
+    def scratch_root(self) -> Optional[str]:
+        return ram_directory() if self.io_mode != PlannerIOOptions.FILE else None
+
+    @property
+    def scratch_dir(self) -> Optional[str]:
+        if self._scratch_dir is None and self.scratch_root is not None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="nl2flow-planner-", dir=self.scratch_root)
+            weakref.finalize(self, shutil.rmtree, self._scratch_dir, True)
+
+        return self._scratch_dir
+
+    @contextmanager
+    def pddl_files(self, pddl: PDDL) -> Iterator[Tuple[Path, Path]]:
+        if self.io_mode == PlannerIOOptions.MEMFD and supports_memfd():
+            with memfd_file("domain.pddl", pddl.domain) as domain_file:
+                with memfd_file("problem.pddl", pddl.problem) as problem_file:
+                    yield Path(domain_file), Path(problem_file)
+
+        elif self.io_mode == PlannerIOOptions.RAM and self.scratch_dir is not None:
+            pddl_files: List[Path] = list()
+
+            try:
+                for name, content in [("domain", pddl.domain), ("problem", pddl.problem)]:
+                    file_handle, file_name = tempfile.mkstemp(prefix=f"{name}-", suffix=".pddl", dir=self.scratch_dir)
+                    pddl_files.append(Path(file_name))
+
+                    with os.fdopen(file_handle, "w") as pddl_handle:
+                        pddl_handle.write(content)
+
+                yield pddl_files[0], pddl_files[1]
+
+            finally:
+                for pddl_file in pddl_files:
+                    pddl_file.unlink(missing_ok=True)
+
+        else:
+            with tempfile.NamedTemporaryFile() as domain_temp, tempfile.NamedTemporaryFile() as problem_temp:
+                domain_file = Path(tempfile.gettempdir()) / domain_temp.name
+                problem_file = Path(tempfile.gettempdir()) / problem_temp.name
+
+                with open_atomic(domain_file, "w") as domain_handle:
+                    domain_handle.write(pddl.domain)
+
+                with open_atomic(problem_file, "w") as problem_handle:
+                    problem_handle.write(pddl.problem)
+
+                yield domain_file, problem_file
+
+    def __call_to_planner(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
+        with tempfile.TemporaryDirectory(dir=self.scratch_root) as scratch_dir, self.pddl_files(pddl) as pddl_files:
+            domain_file, problem_file = pddl_files
+            planner_result = run_planner_in(scratch_dir, get_planner_args(domain_file, problem_file, config))
+
+            return self.read_planner_result(pddl, planner_result)
+
+    async def __call_to_planner_async(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
+        with tempfile.TemporaryDirectory(dir=self.scratch_root) as scratch_dir, self.pddl_files(pddl) as pddl_files:
+            domain_file, problem_file = pddl_files
+            plans_file = Path(scratch_dir) / "plans.json"
+
+            planner_args = [
+                arg.replace("PLANS_JSON_NAME", str(plans_file))
+                for arg in get_planner_args(domain_file, problem_file, config)
+            ]
+
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-B",
+                "-m",
+                "kstar_planner.driver.main",
+                *planners.default_build_args,
+                *planner_args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=scratch_dir,
+                start_new_session=True,
+            )
+
+            try:
+                stdout, stderr = await process.communicate()
+
+            except asyncio.CancelledError:
+                kill_process_group(process.pid)
+                await process.wait()
+                raise
+
+            planner_result = collect_planner_result(
+                stdout.decode(),
+                stderr.decode(),
+                process.returncode,
+                plans_file,
+                Path(scratch_dir) / "found_plans" / PLAN_FILE_NAME,
             )
 
-            result = RawPlannerResult(pddl=pddl, list_of_plans=planner_result.get("plans", []))
-            result.error_running_planner = False
-            result.is_no_solution = planner_result.get("unsolvable", None)
-            result.is_timeout = planner_result.get("timeout_triggered", None)
-            result.planner_output = planner_result.get("planner_output")
-            result.planner_error = planner_result.get("planner_error")
+            return self.read_planner_result(pddl, planner_result)
+
+    def raw_plan(self, pddl: PDDL, config: Optional[PlannerConfig] = None) -> RawPlannerResult:
+        config = config or self.config
+        raw_planner_result = self.get_cached_result(pddl, config)
+
+        if raw_planner_result is None:
+            raw_planner_result = self.run_planner(pddl, config)
+            self.cache_result(pddl, raw_planner_result, config)
+            self.report_metrics(raw_planner_result)
+
+        return raw_planner_result
+
+    async def raw_plan_async(self, pddl: PDDL, config: Optional[PlannerConfig] = None) -> RawPlannerResult:
+        config = config or self.config
+        raw_planner_result = self.get_cached_result(pddl, config)
 
-            if (
-                result.error_running_planner is False
-                and result.is_no_solution is False
-                and result.is_timeout is not True
-            ):
-                result.no_plan_needed = result.best_plan is None or result.best_plan.actions == []
+        if raw_planner_result is None:
+            raw_planner_result = await self.run_planner_async(pddl, config)
+            self.cache_result(pddl, raw_planner_result, config)
+            self.report_metrics(raw_planner_result)
 
-            return result
+        return raw_planner_result
 
-    def raw_plan(self, pddl: PDDL) -> RawPlannerResult:
+    def run_planner(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
         # noinspection PyBroadException
         try:
-            raw_planner_result = self.__call_to_planner(pddl)
+            raw_planner_result = self.__call_to_planner(pddl, config)
             return raw_planner_result
 
         except TimeoutError as error:
@@ -66,28 +312,118 @@ class Kstar(Planner, FDDerivedPlanner):
                 stderr=error,
             )
 
-    def plan(self, pddl: PDDL, **kwargs: Any) -> PlannerResponse:
-        raw_planner_result = self.raw_plan(pddl)
-        planner_response = PlannerResponse.initialize_from_raw_plans(raw_planner_result)
-
+    async def run_planner_async(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
         # noinspection PyBroadException
         try:
-            planner_response.list_of_plans = self.parse(raw_planner_result.list_of_plans, **kwargs)
+            raw_planner_result = await self.__call_to_planner_async(pddl, config)
+            return raw_planner_result
 
-            if not planner_response.no_plan_needed:
-                planner_response.no_plan_needed = (
-                    planner_response.best_plan is not None and planner_response.best_plan.plan == []
+        except TimeoutError as error:
+            return RawPlannerResult(
+                is_timeout=True,
+                stderr=error,
+            )
+
+        except Exception as error:
+            return RawPlannerResult(
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=error,
+            )
+
+    def plan(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        raw_planner_result = self.raw_plan(pddl, config)
+        return self.plan_from_raw(raw_planner_result, **kwargs)
+
+    async def plan_async(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        raw_planner_result = await self.raw_plan_async(pddl, config)
+        return self.plan_from_raw(raw_planner_result, **kwargs)
+
+    def iter_plans(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> Iterator[ClassicalPlan]:
+        for raw_plan in self.iter_raw_plans(pddl, config):
+            planner_response = PlannerResponse(list_of_plans=self.parse([raw_plan], **kwargs))
+            yield from self.post_process(planner_response, **kwargs).list_of_plans
+
+    def iter_raw_plans(self, pddl: PDDL, config: Optional[PlannerConfig] = None) -> Iterator[RawPlan]:
+        config = config or self.config
+        cached_result = self.get_cached_result(pddl, config)
+
+        if cached_result is not None:
+            yield from cached_result.list_of_plans
+            return
+
+        with tempfile.TemporaryDirectory(dir=self.scratch_root) as scratch_dir, self.pddl_files(pddl) as pddl_files:
+            domain_file, problem_file = pddl_files
+            plans_dir = Path(scratch_dir) / "found_plans"
+            plans_file = Path(scratch_dir) / "plans.json"
+            output_file = Path(scratch_dir) / "planner_output.txt"
+            error_file = Path(scratch_dir) / "planner_error.txt"
+
+            planner_args = [
+                arg.replace("PLANS_JSON_NAME", str(plans_file)).replace("dump_plan_files=false", "dump_plan_files=true")
+                for arg in get_planner_args(domain_file, problem_file, config)
+            ]
+
+            with open(output_file, "wb") as output_handle, open(error_file, "wb") as error_handle:
+                process = subprocess.Popen(
+                    [
+                        sys.executable,
+                        "-B",
+                        "-m",
+                        "kstar_planner.driver.main",
+                        *planners.default_build_args,
+                        *planner_args,
+                    ],
+                    stdout=output_handle,
+                    stderr=error_handle,
+                    cwd=scratch_dir,
+                    start_new_session=True,
                 )
 
-            planner_response.is_parse_error = (
-                len(planner_response.list_of_plans) == 0 and planner_response.is_no_solution is False
+            if config.is_single_plan:
+                plan_files: Iterator[Path] = iter([plans_dir / PLAN_FILE_NAME])
+            else:
+                plan_files = (plans_dir / f"{PLAN_FILE_NAME}.{index}" for index in itertools.count(1))
+
+            try:
+                plan_file = next(plan_files, None)
+
+                while True:
+                    is_finished = process.poll() is not None
+                    raw_plan = None if plan_file is None else read_plan_file(plan_file)
+
+                    while raw_plan is not None:
+                        yield raw_plan
+
+                        plan_file = next(plan_files, None)
+                        raw_plan = None if plan_file is None else read_plan_file(plan_file)
+
+                    if is_finished:
+                        break
+
+                    time.sleep(PLAN_POLL_INTERVAL)
+
+            finally:
+                if process.poll() is None:
+                    kill_process_group(process.pid)
+
+                process.wait()
+
+            planner_result = collect_planner_result(
+                output_file.read_text(errors="replace"),
+                error_file.read_text(errors="replace"),
+                process.returncode,
+                plans_file,
+                plans_dir / PLAN_FILE_NAME,
             )
 
-            planner_response = self.post_process(planner_response, **kwargs)
-            return planner_response
+            raw_planner_result = self.read_planner_result(pddl, planner_result)
+            raw_planner_result.error_running_planner = is_planner_error(process.returncode)
+            self.cache_result(pddl, raw_planner_result, config)
+            self.report_metrics(raw_planner_result)
 
-        except Exception as error:
-            planner_response.no_plan_needed = None
-            planner_response.is_parse_error = True
-            planner_response.stderr = error
-            return planner_response
+            if raw_planner_result.error_running_planner:
+                raise RuntimeError(f"Planner exited with code {process.returncode}: {raw_planner_result.planner_error}")
+
+            if raw_planner_result.is_timeout:
+                raise TimeoutError(f"Planner timed out after {config.timeout}s.")
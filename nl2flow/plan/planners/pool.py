@@ -0,0 +1,362 @@
+from nl2flow.plan.schemas import RawPlannerResult, PlannerConfig
+from nl2flow.plan.options import (
+    POOL_SIZE,
+    MAX_JOBS_PER_WORKER,
+    JOB_TIMEOUT_GRACE,
+    CANCEL_POLL_INTERVAL,
+    PLAN_FILE_NAME,
+    PlannerIOOptions,
+)
+from nl2flow.plan.planners.kstar import (
+    Kstar,
+    collect_planner_result,
+    get_planner_args,
+    kill_process_group,
+    run_planner_in,
+)
+from nl2flow.compile.schemas import PDDL
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+from kstar_planner import planners
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+
+def run_forked_planner(planner_args: List[str], scratch_dir: str) -> Dict[str, Any]:
+    from kstar_planner.driver import main as driver
+
+    result_file = os.path.join(scratch_dir, "plans.json")
+    output_file = os.path.join(scratch_dir, "planner_output.txt")
+    error_file = os.path.join(scratch_dir, "planner_error.txt")
+    plan_file = os.path.join(scratch_dir, "found_plans", PLAN_FILE_NAME)
+
+    for stale_file in [result_file, plan_file]:
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+
+    args = [arg.replace("PLANS_JSON_NAME", result_file) for arg in planner_args]
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+
+        # noinspection PyBroadException
+        try:
+            os.chdir(scratch_dir)
+
+            with open(output_file, "wb") as output_handle, open(error_file, "wb") as error_handle:
+                os.dup2(output_handle.fileno(), sys.stdout.fileno())
+                os.dup2(error_handle.fileno(), sys.stderr.fileno())
+
+            sys.argv = ["kstar_planner.driver.main"] + planners.default_build_args + args
+            driver.main()
+            exit_code = 0
+
+        except SystemExit as error:
+            exit_code = error.code if isinstance(error.code, int) else int(error.code is not None)
+
+        except BaseException:
+            traceback.print_exc()
+
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    _, status = os.waitpid(pid, 0)
+
+    return collect_planner_result(
+        Path(output_file).read_text(errors="replace"),
+        Path(error_file).read_text(errors="replace"),
+        os.waitstatus_to_exitcode(status),
+        Path(result_file),
+        Path(plan_file),
+    )
+
+
+def serve(connection: Connection, scratch_root: Optional[str] = None) -> None:
+    os.setsid()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    scratch_dir = tempfile.mkdtemp(prefix="nl2flow-planner-", dir=scratch_root)
+
+    if hasattr(os, "fork"):
+        setattr(planners, "run_planner", lambda planner_args: run_forked_planner(planner_args, scratch_dir))
+    else:
+        setattr(planners, "run_planner", lambda planner_args: run_planner_in(scratch_dir, planner_args))
+
+    try:
+        while True:
+            job = connection.recv()
+
+            if job is None:
+                break
+
+            domain, problem, config = job
+
+            # noinspection PyBroadException
+            try:
+                domain_file = Path(scratch_dir) / "domain.pddl"
+                problem_file = Path(scratch_dir) / "problem.pddl"
+
+                domain_file.write_text(domain)
+                problem_file.write_text(problem)
+
+                planner_result = planners.run_planner(get_planner_args(domain_file, problem_file, config))
+
+                connection.send(planner_result)
+
+            except Exception:
+                connection.send({"error": traceback.format_exc()})
+
+    except (EOFError, KeyboardInterrupt):
+        pass
+
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+class PlannerWorker:
+    def __init__(self, context: Any, scratch_root: Optional[str] = None) -> None:
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=serve, args=(worker_connection, scratch_root), daemon=True)
+        self.process.start()
+        self.jobs_done = 0
+
+        worker_connection.close()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return bool(self.process.is_alive())
+
+    def run(
+        self, pddl: PDDL, config: PlannerConfig, job_timeout: float, cancel_event: Optional[threading.Event] = None
+    ) -> RawPlannerResult:
+        if cancel_event is not None and cancel_event.is_set():
+            return RawPlannerResult(pddl=pddl, error_running_planner=True, stderr="Planner job cancelled.")
+
+        self.jobs_done += 1
+
+        try:
+            self.connection.send((pddl.domain, pddl.problem, config))
+
+            if not self.wait(job_timeout, cancel_event):
+                self.kill()
+
+                if cancel_event is not None and cancel_event.is_set():
+                    return RawPlannerResult(pddl=pddl, error_running_planner=True, stderr="Planner job cancelled.")
+
+                return RawPlannerResult(pddl=pddl, is_timeout=True, stderr=f"Planner job exceeded {job_timeout}s.")
+
+            planner_result: Dict[str, Any] = self.connection.recv()
+
+        except (EOFError, OSError) as error:
+            self.kill()
+            return RawPlannerResult(
+                pddl=pddl,
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=f"Planner worker {self.pid} crashed: {error!r}",
+            )
+
+        if "error" in planner_result:
+            return RawPlannerResult(
+                pddl=pddl,
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=planner_result["error"],
+            )
+
+        return Kstar.read_planner_result(pddl, planner_result)
+
+    def wait(self, job_timeout: float, cancel_event: Optional[threading.Event] = None) -> bool:
+        if cancel_event is None:
+            return bool(self.connection.poll(job_timeout))
+
+        deadline = time.monotonic() + job_timeout
+
+        while not cancel_event.is_set():
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return False
+
+            if self.connection.poll(min(remaining, CANCEL_POLL_INTERVAL)):
+                return True
+
+        return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # noinspection PyBroadException
+        try:
+            self.connection.send(None)
+        except Exception:
+            pass
+
+        self.process.join(timeout)
+
+        if self.process.is_alive():
+            self.kill()
+
+        self.connection.close()
+
+    def kill(self) -> None:
+        if self.process.pid is not None and self.process.is_alive():
+            kill_process_group(self.process.pid)
+            self.process.kill()
+
+        self.process.join()
+
+
+class PlannerPool(Kstar):
+    """
+    Kstar planner that dispatches jobs to a pool of long-lived worker processes
+    instead of starting the planner driver from scratch for every call. Each
+    worker runs the driver in a fork of itself, inside its own scratch
+    directory. A job that outlives its timeout takes the worker (and the
+    planner processes under it) down with it, a worker that crashes is
+    replaced, and every worker is recycled after a fixed number of jobs.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = POOL_SIZE,
+        max_jobs_per_worker: int = MAX_JOBS_PER_WORKER,
+        job_timeout: Optional[float] = None,
+        io_mode: PlannerIOOptions = PlannerIOOptions.FILE,
+    ) -> None:
+        super().__init__(io_mode)
+
+        self.num_workers = num_workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._workers: List[PlannerWorker] = list()
+        self._idle: queue.Queue[PlannerWorker] = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "PlannerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+
+    @property
+    def pids(self) -> List[Optional[int]]:
+        return [worker.pid for worker in self._workers]
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="planner-pool")
+
+            for _ in range(self.num_workers):
+                worker = PlannerWorker(self._context, self.scratch_root)
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                return
+
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+            for worker in self._workers:
+                worker.stop()
+
+            self._workers = list()
+            self._idle = queue.Queue()
+
+    def submit(
+        self,
+        pddl: PDDL,
+        cancel_event: Optional[threading.Event] = None,
+        config: Optional[PlannerConfig] = None,
+    ) -> "Future[RawPlannerResult]":
+        self.start()
+
+        assert self._executor is not None, "Planner pool is not running."
+        return self._executor.submit(self.run_job, pddl, cancel_event, config or self.config)
+
+    def run_job(
+        self,
+        pddl: PDDL,
+        cancel_event: Optional[threading.Event] = None,
+        config: Optional[PlannerConfig] = None,
+    ) -> RawPlannerResult:
+        config = config or self.config
+        job_timeout = self.job_timeout if self.job_timeout is not None else config.timeout + JOB_TIMEOUT_GRACE
+        worker = self._idle.get()
+
+        try:
+            return worker.run(pddl, config, job_timeout, cancel_event)
+
+        finally:
+            if not worker.is_alive() or worker.jobs_done >= self.max_jobs_per_worker:
+                worker = self.replace_worker(worker)
+
+            self._idle.put(worker)
+
+    def replace_worker(self, worker: PlannerWorker) -> PlannerWorker:
+        worker.stop()
+        new_worker = PlannerWorker(self._context, self.scratch_root)
+
+        with self._lock:
+            self._workers = [new_worker if w is worker else w for w in self._workers]
+
+        return new_worker
+
+    def run_planner(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
+        # noinspection PyBroadException
+        try:
+            return self.submit(pddl, config=config).result()
+
+        except Exception as error:
+            return RawPlannerResult(
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=error,
+            )
+
+    async def run_planner_async(self, pddl: PDDL, config: PlannerConfig) -> RawPlannerResult:
+        cancel_event = threading.Event()
+        future = self.submit(pddl, cancel_event, config)
+
+        try:
+            return await asyncio.wrap_future(future)
+
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+        except Exception as error:
+            return RawPlannerResult(
+                error_running_planner=True,
+                is_timeout=False,
+                stderr=error,
+            )
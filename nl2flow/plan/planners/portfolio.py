@@ -0,0 +1,130 @@
+from nl2flow.plan.schemas import RawPlannerResult, PlannerConfig, PlannerMetrics, PlannerResponse
+from nl2flow.plan.options import PortfolioPolicy, SearchOptions
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.planner import Planner
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.compile.schemas import PDDL
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import asyncio
+
+
+class PortfolioPlanner(Planner):
+    """
+    Races several search configurations of a Kstar backend on the same
+    PDDL and returns the first result the policy accepts, killing the
+    planners that are still running. By default the portfolio runs the
+    planner config alongside its single optimal and satisficing variants.
+    If no result is accepted, the best of the finished ones is returned.
+    """
+
+    def __init__(
+        self,
+        configs: Optional[List[PlannerConfig]] = None,
+        backend: Optional[Kstar] = None,
+        policy: PortfolioPolicy = PortfolioPolicy.FIRST_SOLVED,
+    ) -> None:
+        super().__init__()
+        self.configs = configs
+        self.backend = backend or Kstar()
+        self.policy = policy
+
+    @property
+    def cache(self) -> Optional[PlannerCache]:
+        return self.backend.cache
+
+    @cache.setter
+    def cache(self, cache: Optional[PlannerCache]) -> None:
+        self.backend.cache = cache
+
+    @property
+    def metrics_callback(self) -> Optional[Callable[[PlannerMetrics], None]]:
+        return self.backend.metrics_callback
+
+    @metrics_callback.setter
+    def metrics_callback(self, metrics_callback: Optional[Callable[[PlannerMetrics], None]]) -> None:
+        self.backend.metrics_callback = metrics_callback
+
+    def get_configs(self) -> List[PlannerConfig]:
+        if self.configs:
+            return list(self.configs)
+
+        return [self.config] + [
+            self.config.model_copy(update={"search": search})
+            for search in [SearchOptions.OPTIMAL, SearchOptions.SATISFICING]
+            if search != self.config.search
+        ]
+
+    def is_acceptable(self, config: PlannerConfig, raw_planner_result: RawPlannerResult) -> bool:
+        if raw_planner_result.error_running_planner or raw_planner_result.is_timeout:
+            return False
+
+        is_solved = bool(
+            raw_planner_result.list_of_plans or raw_planner_result.no_plan_needed or raw_planner_result.is_no_solution
+        )
+
+        if self.policy == PortfolioPolicy.PREFER_OPTIMAL:
+            return is_solved and config.is_optimal
+
+        return is_solved
+
+    @staticmethod
+    def pick_fallback(finished: List[Tuple[PlannerConfig, RawPlannerResult]]) -> RawPlannerResult:
+        with_plans = [item for item in finished if item[1].list_of_plans]
+        with_plans.sort(key=lambda item: not item[0].is_optimal)
+
+        return (with_plans or finished)[0][1]
+
+    async def race(self, pddl: PDDL, configs: List[PlannerConfig]) -> RawPlannerResult:
+        tasks: Dict["asyncio.Future[RawPlannerResult]", int] = {
+            asyncio.ensure_future(self.backend.raw_plan_async(pddl, config)): index
+            for index, config in enumerate(configs)
+        }
+
+        pending = set(tasks.keys())
+        finished: List[Tuple[int, RawPlannerResult]] = list()
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in sorted(done, key=lambda t: tasks[t]):
+                    index = tasks[task]
+
+                    try:
+                        raw_planner_result = task.result()
+
+                    except Exception as error:
+                        raw_planner_result = RawPlannerResult(pddl=pddl, error_running_planner=True, stderr=error)
+
+                    if self.is_acceptable(configs[index], raw_planner_result):
+                        return raw_planner_result
+
+                    finished.append((index, raw_planner_result))
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        finished.sort(key=lambda item: item[0])
+        return self.pick_fallback([(configs[index], result) for index, result in finished])
+
+    def plan(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        try:
+            asyncio.get_running_loop()
+
+        except RuntimeError:
+            return asyncio.run(self.plan_async(pddl, config, **kwargs))
+
+        # asyncio.run cannot nest in a running loop, so the race gets a loop of its own on a worker thread
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="portfolio") as executor:
+            return executor.submit(asyncio.run, self.plan_async(pddl, config, **kwargs)).result()
+
+    async def plan_async(self, pddl: PDDL, config: Optional[PlannerConfig] = None, **kwargs: Any) -> PlannerResponse:
+        configs = [config] if config is not None else self.get_configs()
+        raw_planner_result = await self.race(pddl, configs)
+
+        return self.backend.plan_from_raw(raw_planner_result, **kwargs)
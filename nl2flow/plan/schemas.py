@@ -2,6 +2,7 @@ from __future__ import annotations
 from pydantic import BaseModel
 from typing import List, Any, Optional, Union
 from nl2flow.compile.schemas import Constraint, ClassicalPlanReference, Step, Parameter, PDDL
+from nl2flow.plan.options import TIMEOUT, NUM_PLANS, QUALITY_BOUND, OPTIMAL_HEURISTIC, SearchOptions
 
 
 class Action(BaseModel):
@@ -41,6 +42,36 @@ class ClassicalPlan(BaseModel):
         )
 
 
+class PlannerConfig(BaseModel):
+    num_plans: int = NUM_PLANS
+    quality_bound: float = QUALITY_BOUND
+    timeout: int = TIMEOUT
+    search: SearchOptions = SearchOptions.TOPQ_UNORDERED
+    heuristic: Optional[str] = None
+
+    @property
+    def is_single_plan(self) -> bool:
+        return self.search in [SearchOptions.OPTIMAL, SearchOptions.SATISFICING]
+
+    @property
+    def is_optimal(self) -> bool:
+        return self.search != SearchOptions.SATISFICING and self.heuristic in [None, OPTIMAL_HEURISTIC]
+
+
+class PlannerMetrics(BaseModel):
+    translator_time: Optional[float] = None
+    translator_variables: Optional[int] = None
+    translator_operators: Optional[int] = None
+    translator_task_size: Optional[int] = None
+    search_time: Optional[float] = None
+    expansions: Optional[int] = None
+    evaluations: Optional[int] = None
+    generated: Optional[int] = None
+    peak_memory: Optional[int] = None
+    num_plans: int = 0
+    is_quality_bound_hit: Optional[bool] = None
+
+
 class RawPlannerResult(BaseModel):
     pddl: Optional[PDDL] = None
     list_of_plans: List[RawPlan] = []
@@ -51,6 +82,7 @@ class RawPlannerResult(BaseModel):
     stderr: Optional[Any] = None
     planner_output: Optional[str] = None
     planner_error: Optional[str] = None
+    metrics: Optional[PlannerMetrics] = None
 
     @property
     def best_plan(self) -> Optional[RawPlan]:
@@ -80,6 +112,7 @@ class PlannerResponse(RawPlannerResult):
             no_plan_needed=raw_planner_result.no_plan_needed,
             is_timeout=raw_planner_result.is_timeout,
             stderr=raw_planner_result.stderr,
+            metrics=raw_planner_result.metrics,
         )
 
 
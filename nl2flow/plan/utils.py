@@ -1,5 +1,6 @@
 from typing import List, Optional, Union
 from nl2flow.compile.flow import Flow
+from nl2flow.compile.symbols import SymbolTable
 from nl2flow.compile.utils import Transform, revert_string_transform, string_transform
 from nl2flow.compile.basic_compilations.utils import unpack_list_of_signature_items
 from nl2flow.plan.schemas import ClassicalPlan, Action
@@ -87,7 +88,10 @@ def find_goal(name: str, flow_object: Flow) -> Optional[GoalItem]:
     return next(filter(lambda goal_item: getattr(goal_item, "goal_name") == name, all_goals), None)
 
 
-def find_operator(name: str, flow_object: Flow) -> Optional[OperatorDefinition]:
+def find_operator(name: str, flow_object: Flow, symbols: Optional[SymbolTable] = None) -> Optional[OperatorDefinition]:
+    if symbols is not None:
+        return symbols.get_operator(name)
+
     filter_for_operators = filter(lambda x: x.name == name, flow_object.flow_definition.operators)
     operator: Optional[OperatorDefinition] = next(filter_for_operators, None)
 
@@ -100,6 +104,7 @@ def parse_action(
     flow_object: Flow,
     transforms: List[Transform],
     debug_flag: DebugFlag,
+    symbols: Optional[SymbolTable] = None,
 ) -> Optional[Union[Action, Constraint]]:
     if RestrictedOperations.is_restricted(action_name):
         return None
@@ -129,7 +134,7 @@ def parse_action(
             return new_action
 
     else:
-        operator = find_operator(action_name, flow_object)
+        operator = find_operator(action_name, flow_object, symbols)
 
         if operator is None:
             if debug_flag:
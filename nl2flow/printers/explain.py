@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Any, Union, List, Set
+from typing import Any, Union, List, Optional, Set
 from pydantic import BaseModel
 from nl2flow.compile.flow import Flow
+from nl2flow.compile.graph import DependencyGraph
 from nl2flow.printers.driver import Printer
 from nl2flow.printers.verbalize import comma_separate, who_need_it
 from nl2flow.plan.schemas import Action, ClassicalPlan as Plan
@@ -113,13 +114,14 @@ class ExplainPrint(Printer):
         index: int,
         plan: List[Union[ActionExplanation, ConstraintExplanation]],
         explained_known: Set[str],
+        graph: Optional[DependencyGraph] = None,
     ) -> List[str]:
         constraint_strings = [f"{action.constraint} is required to be {action.truth_value}."]
 
         postfix = plan[:index]
         postfix.reverse()
 
-        who_need_it_string = comma_separate(who_need_it(action.constraint, flow_object, postfix))
+        who_need_it_string = comma_separate(who_need_it(action.constraint, flow_object, postfix, graph))
 
         if who_need_it_string:
             constraint_strings.append(f"This is required by {who_need_it_string}.")
@@ -201,6 +203,9 @@ class ExplainPrint(Printer):
     def pretty_print_plan(cls, plan: Plan, **kwargs: Any) -> str:
         flow_object: Flow = kwargs["flow_object"]
         bulleted: bool = kwargs.get("bulleted", True)
+        graph: DependencyGraph = kwargs.get("graph", None) or DependencyGraph.from_flow_definition(
+            flow_object.flow_definition
+        )
 
         all_goals = get_all_goals(flow_object)
         goal_strings = []
@@ -237,7 +242,7 @@ class ExplainPrint(Printer):
 
             else:
                 constraint_strings = cls.explain_constraint(
-                    action, flow_object, step, plan_explanation_object.plan, explained_known
+                    action, flow_object, step, plan_explanation_object.plan, explained_known, graph
                 )
                 explanations.extend(constraint_strings)
 
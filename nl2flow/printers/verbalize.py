@@ -1,26 +1,29 @@
 from nl2flow.compile.flow import Flow
+from nl2flow.compile.graph import DependencyGraph
 from nl2flow.printers.driver import Printer
 from nl2flow.plan.schemas import Action, ClassicalPlan as Plan
 from nl2flow.plan.utils import find_goal, get_all_goals
 from nl2flow.compile.schemas import Step, Constraint
 from nl2flow.compile.options import GoalType
 from nl2flow.compile.options import BasicOperations
-from typing import Any, Union, List, Set, Dict
+from typing import Any, Union, List, Set, Dict, Optional
 
 
-def who_need_it(constraint_string: str, flow_object: Flow, postfix: List[Union[Action, Constraint]]) -> List[str]:
-    item_map = set()
+def who_need_it(
+    constraint_string: str,
+    flow_object: Flow,
+    postfix: List[Union[Action, Constraint]],
+    graph: Optional[DependencyGraph] = None,
+) -> List[str]:
+    if graph is None:
+        graph = DependencyGraph.from_flow_definition(flow_object.flow_definition)
 
-    for step in postfix:
-        if isinstance(step, Action) and not BasicOperations.is_basic(step.name):
-            action_definition = next(filter(lambda x: x.name == step.name, flow_object.flow_definition.operators))
-            constraints = []
-
-            for signature_item in action_definition.inputs:
-                constraints.extend(signature_item.constraints)
-
-            if constraint_string in [item.constraint for item in constraints]:
-                item_map.add(step.name)
+    consumers = set(graph.get_constraint_consumers(constraint_string))
+    item_map = {
+        step.name
+        for step in postfix
+        if isinstance(step, Action) and not BasicOperations.is_basic(step.name) and step.name in consumers
+    }
 
     return sorted(list(item_map))
 
@@ -103,13 +106,17 @@ class VerbalizePrint(Printer):
 
     @staticmethod
     def verbalize_constraint(
-        constraint: Constraint, flow_object: Flow, lookahead: bool, postfix: List[Union[Action, Constraint]]
+        constraint: Constraint,
+        flow_object: Flow,
+        lookahead: bool,
+        postfix: List[Union[Action, Constraint]],
+        graph: Optional[DependencyGraph] = None,
     ) -> str:
         constraint_string = f"Check that {constraint.constraint} is {constraint.truth_value}."
         all_goals = get_all_goals(flow_object=flow_object)
 
         if lookahead:
-            who_need_it_string = comma_separate(who_need_it(constraint.constraint, flow_object, postfix))
+            who_need_it_string = comma_separate(who_need_it(constraint.constraint, flow_object, postfix, graph))
             constraint_string += f" This is needed to execute {who_need_it_string}." if who_need_it_string else ""
 
         if find_goal(constraint.constraint, flow_object) is not None:
@@ -181,6 +188,9 @@ class VerbalizePrint(Printer):
         flow_object: Flow = kwargs["flow_object"]
         bulleted: bool = kwargs.get("bulleted", True)
         lookahead: bool = kwargs.get("lookahead", False)
+        graph: DependencyGraph = kwargs.get("graph", None) or DependencyGraph.from_flow_definition(
+            flow_object.flow_definition
+        )
 
         verbose_strings = list()
         mapped_items = dict()
@@ -204,7 +214,7 @@ class VerbalizePrint(Printer):
                     new_string += cls.verbalize_action(action, flow_object, mapped_items, lookahead, postfix)
 
             elif isinstance(action, Constraint):
-                new_string += cls.verbalize_constraint(action, flow_object, lookahead, postfix)
+                new_string += cls.verbalize_constraint(action, flow_object, lookahead, postfix, graph)
 
             verbose_strings.append(new_string)
 
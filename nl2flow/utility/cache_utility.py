@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Generic, TypeVar
+from collections import OrderedDict
+from enum import Enum
+from pathlib import Path
+from threading import RLock
+from pydantic import BaseModel
+from nl2flow.utility.file_utility import open_atomic
+
+import hashlib
+import json
+import time
+
+V = TypeVar("V")
+
+
+def canonicalize(item: Any) -> Any:
+    if isinstance(item, BaseModel):
+        return canonicalize(item.model_dump(mode="python"))
+
+    elif isinstance(item, Enum):
+        return canonicalize(item.value)
+
+    elif isinstance(item, Dict):
+        return {str(key): canonicalize(value) for key, value in item.items()}
+
+    elif isinstance(item, (set, frozenset)):
+        return sorted([canonicalize(value) for value in item], key=lambda x: json.dumps(x, sort_keys=True))
+
+    elif isinstance(item, (list, tuple)):
+        return [canonicalize(value) for value in item]
+
+    elif item is None or isinstance(item, (str, int, float, bool)):
+        return item
+
+    else:
+        return repr(item)
+
+
+def digest(*items: Any) -> str:
+    serialized = json.dumps([canonicalize(item) for item in items], sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class TieredCache(Generic[V]):
+    def __init__(
+        self,
+        max_size: int = 128,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        max_disk_size: Optional[int] = None,
+    ) -> None:
+        self._max_size = max_size
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._ttl = ttl
+        self._max_disk_size = max_disk_size
+        self._memory: OrderedDict[str, V] = OrderedDict()
+        self._expiry: Dict[str, float] = dict()
+        self._lock = RLock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        if self._cache_dir is not None:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        return self._cache_dir
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self._ttl
+
+    @property
+    def max_disk_size(self) -> Optional[int]:
+        return self._max_disk_size
+
+    @property
+    def lock(self) -> RLock:
+        return self._lock
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> TieredCache[V]:
+        return self
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def __contains__(self, key: str) -> bool:
+        disk_path = self._disk_path(key)
+
+        with self._lock:
+            if key in self._memory and not self._is_expired_in_memory(key):
+                return True
+
+            return disk_path is not None and disk_path.is_file() and not self._is_expired_on_disk(disk_path)
+
+    def serialize(self, value: V) -> str:
+        raise NotImplementedError(f"{type(self).__name__} does not support an on-disk tier.")
+
+    def deserialize(self, serialized: str) -> V:
+        raise NotImplementedError(f"{type(self).__name__} does not support an on-disk tier.")
+
+    def get(self, key: str) -> Optional[V]:
+        with self._lock:
+            if key in self._memory and self._is_expired_in_memory(key):
+                self._remove(key)
+
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            value = self._read_from_disk(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            disk_path = self._disk_path(key)
+            expiry = disk_path.stat().st_mtime + self._ttl if disk_path is not None and self._ttl is not None else None
+
+            self.hits += 1
+            self._put_in_memory(key, value, expiry)
+            return value
+
+    def put(self, key: str, value: V) -> None:
+        with self._lock:
+            self._put_in_memory(key, value)
+            self._write_to_disk(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._expiry.clear()
+            self.hits = 0
+            self.misses = 0
+
+            if self._cache_dir is not None:
+                for cached_file in self._cache_dir.glob("*.json"):
+                    cached_file.unlink(missing_ok=True)
+
+    def _put_in_memory(self, key: str, value: V, expiry: Optional[float] = None) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+
+        if self._ttl is not None:
+            self._expiry[key] = expiry if expiry is not None else time.time() + self._ttl
+
+        while len(self._memory) > self._max_size:
+            evicted_key, _ = self._memory.popitem(last=False)
+            self._expiry.pop(evicted_key, None)
+
+    def _remove(self, key: str) -> None:
+        self._memory.pop(key, None)
+        self._expiry.pop(key, None)
+
+        disk_path = self._disk_path(key)
+        if disk_path is not None:
+            disk_path.unlink(missing_ok=True)
+
+    def _is_expired_in_memory(self, key: str) -> bool:
+        return key in self._expiry and self._expiry[key] <= time.time()
+
+    def _is_expired_on_disk(self, disk_path: Path) -> bool:
+        return self._ttl is not None and disk_path.stat().st_mtime + self._ttl <= time.time()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self._cache_dir / f"{key}.json" if self._cache_dir is not None else None
+
+    def _read_from_disk(self, key: str) -> Optional[V]:
+        disk_path = self._disk_path(key)
+
+        if disk_path is None or not disk_path.is_file():
+            return None
+
+        # noinspection PyBroadException
+        try:
+            if self._is_expired_on_disk(disk_path):
+                disk_path.unlink(missing_ok=True)
+                return None
+
+            return self.deserialize(disk_path.read_text(encoding="utf-8"))
+        except Exception:
+            disk_path.unlink(missing_ok=True)
+            return None
+
+    def _write_to_disk(self, key: str, value: V) -> None:
+        disk_path = self._disk_path(key)
+
+        if disk_path is not None:
+            with open_atomic(disk_path, "w", encoding="utf-8") as disk_handle:
+                disk_handle.write(self.serialize(value))
+
+            if self._max_disk_size is not None and self._cache_dir is not None:
+                cached_files = sorted(self._cache_dir.glob("*.json"), key=lambda f: f.stat().st_mtime)
+
+                for cached_file in cached_files[: max(0, len(cached_files) - self._max_disk_size)]:
+                    cached_file.unlink(missing_ok=True)
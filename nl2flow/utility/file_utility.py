@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Iterator, Optional
 import os
 import tempfile as tmp
 from contextlib import contextmanager
@@ -33,3 +33,27 @@ def open_atomic(filepath: Any, *args: Any, **kwargs: Any) -> Any:
                     file.flush()
                     os.fsync(file.fileno())
         os.rename(temp_path, filepath)
+
+
+RAM_DIRECTORY = "/dev/shm"
+
+
+def ram_directory() -> Optional[str]:
+    return RAM_DIRECTORY if os.path.isdir(RAM_DIRECTORY) and os.access(RAM_DIRECTORY, os.W_OK) else None
+
+
+def supports_memfd() -> bool:
+    return hasattr(os, "memfd_create") and os.path.isdir(f"/proc/{os.getpid()}/fd")
+
+
+@contextmanager
+def memfd_file(name: str, content: str) -> Iterator[str]:
+    fd = os.memfd_create(name)  # type: ignore
+
+    try:
+        with os.fdopen(os.dup(fd), "w") as file:
+            file.write(content)
+
+        yield f"/proc/{os.getpid()}/fd/{fd}"
+    finally:
+        os.close(fd)
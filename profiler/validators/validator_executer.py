@@ -1,5 +1,8 @@
 import subprocess
-from typing import List, Tuple
+from typing import Iterable, List, Tuple, Union
+from nl2flow.compile.compilations import ClassicPDDL
+from nl2flow.compile.schemas import PDDL
+from nl2flow.plan.grounding import Domain, PlanSimulator, Simulation
 from profiler.data_types.agent_info_data_types import Plan
 from profiler.data_types.validator_data_types import PddlPlanValidatorOutput
 import re
@@ -46,9 +49,78 @@ def execute_Val(pddl_domain: str, pddl_problem: str, pddl_plan: str) -> Tuple[in
     return result.returncode, result.stderr, result.stdout
 
 
+def read_pddl_plan(pddl_plan: str) -> List[str]:
+    """
+    returns the actions of a plan in the VAL format, one "(action arguments)" per line
+    """
+    actions: List[str] = list()
+    for line in pddl_plan.splitlines():
+        line = line.split(";", 1)[0]
+        if "(" in line and ")" in line:
+            actions.append(line[line.index("(") + 1 : line.rindex(")")].strip())
+
+    return actions
+
+
+def get_validator_output(simulation: Simulation) -> PddlPlanValidatorOutput:
+    return PddlPlanValidatorOutput(
+        is_executable_plan=simulation.is_executable,
+        is_valid_plan=simulation.reaches_goal,
+        total_cost=round(simulation.cost) if simulation.reaches_goal else -1,
+    )
+
+
+def validate_plans(
+    pddl_domain: Union[str, Domain], pddl_problem: str, pddl_plans: Iterable[str]
+) -> List[PddlPlanValidatorOutput]:
+    """
+    returns if each plan is executable and valid for a PDDL domain and problem
+    the domain and problem are parsed once for all the plans
+    """
+    try:
+        simulator = PlanSimulator(pddl_domain, pddl_problem)
+    except (ValueError, IndexError):
+        return [PddlPlanValidatorOutput() for _ in pddl_plans]
+
+    return [get_validator_output(simulator.simulate(read_pddl_plan(pddl_plan))) for pddl_plan in pddl_plans]
+
+
+def validate_samples(pddl_domain: str, samples: Iterable[Tuple[str, str]]) -> List[PddlPlanValidatorOutput]:
+    """
+    returns if each plan is executable and valid for its problem, given (problem, plan) pairs on the same domain
+    """
+    try:
+        domain = Domain(pddl_domain)
+    except (ValueError, IndexError):
+        return [PddlPlanValidatorOutput() for _ in samples]
+
+    return [validate_plans(domain, pddl_problem, [pddl_plan])[0] for pddl_problem, pddl_plan in samples]
+
+
+def validate_compiled_plans(
+    compilation: Union[PDDL, ClassicPDDL], pddl_plans: Iterable[str]
+) -> List[PddlPlanValidatorOutput]:
+    """
+    returns if each plan is executable and valid for a compiled flow
+    """
+    if isinstance(compilation, ClassicPDDL):
+        compilation = PDDL(domain=compilation.print_domain(), problem=compilation.print_problem())
+
+    return validate_plans(compilation.domain, compilation.problem, pddl_plans)
+
+
 def validate_pddl(pddl_domain: str, pddl_problem: str, pddl_plan: str) -> PddlPlanValidatorOutput:
     """
     returns if PDDL domain, problem, and plans are executable and valid
+    the plan is simulated in process, so VAL is not needed
+    """
+    return validate_plans(pddl_domain, pddl_problem, [pddl_plan])[0]
+
+
+def validate_pddl_with_val(pddl_domain: str, pddl_problem: str, pddl_plan: str) -> PddlPlanValidatorOutput:
+    """
+    returns if PDDL domain, problem, and plans are executable and valid
+    VAL is used for the validation
     """
     return_code, err, out = execute_Val(pddl_domain, pddl_problem, pddl_plan)
     is_executable = False
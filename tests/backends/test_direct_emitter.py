@@ -0,0 +1,202 @@
+from typing import Any, List, Optional, Union
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.options import (
+    CompileOptions,
+    GoalOptions,
+    GoalType,
+    LifeCycleOptions,
+    MappingOptions,
+    MemoryState,
+    NL2FlowOptions,
+    SlotOptions,
+)
+from nl2flow.compile.schemas import (
+    ClassicalPlanReference,
+    Constraint,
+    GoalItem,
+    GoalItems,
+    MemoryItem,
+    PDDL,
+    Step,
+)
+from nl2flow.debug.schemas import DebugFlag, SolutionQuality
+from nl2flow.services.sketch import BasicSketchCompilation
+from tests.sketch.test_basic import load_assets
+from tests.testing import BaseTestAgents
+
+import pytest
+
+SExpression = Union[str, List[Any]]
+UNORDERED = {"and", "or", ":init", ":requirements"}
+
+
+def parse(text: str) -> SExpression:
+    tokens = (
+        " ".join(line for line in text.splitlines() if not line.strip().startswith(";"))
+        .replace("(", " ( ")
+        .replace(")", " ) ")
+        .split()
+    )
+
+    stack: List[List[Any]] = [[]]
+    for token in tokens:
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            item = stack.pop()
+            stack[-1].append(item)
+        else:
+            stack[-1].append(token)
+
+    assert len(stack) == 1
+    return stack[0]
+
+
+def canonicalize(expression: SExpression) -> SExpression:
+    if isinstance(expression, str):
+        return expression
+
+    children = [canonicalize(child) for child in expression]
+
+    if children and isinstance(children[0], str) and children[0] in UNORDERED:
+        rest = [child for child in children[1:] if child != ":numeric-fluents"]
+        return [children[0]] + sorted(rest, key=str)
+
+    return children
+
+
+def check_equivalence(
+    flow: Flow, debug_flag: Optional[DebugFlag] = None, report_type: Optional[SolutionQuality] = None
+) -> PDDL:
+    reference, reference_transforms = flow.compile_to_pddl(debug_flag, report_type)
+    pddl, transforms = flow.compile_to_pddl(debug_flag, report_type, compilation_type=CompileOptions.DIRECT)
+
+    assert canonicalize(parse(pddl.domain)) == canonicalize(parse(reference.domain))
+    assert canonicalize(parse(pddl.problem)) == canonicalize(parse(reference.problem))
+    assert transforms == reference_transforms
+
+    return pddl
+
+
+class TestDirectEmitter(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(
+            [
+                GoalItems(goals=GoalItem(goal_name="Fix Errors")),
+                MemoryItem(item_id="database link", item_state=MemoryState.UNKNOWN),
+            ]
+        )
+
+    def test_basic(self) -> None:
+        check_equivalence(self.flow)
+
+    @pytest.mark.parametrize(
+        "slot_options",
+        [
+            {SlotOptions.higher_cost, SlotOptions.relaxed},
+            {SlotOptions.last_resort, SlotOptions.relaxed},
+            {SlotOptions.higher_cost, SlotOptions.last_resort, SlotOptions.relaxed},
+            {SlotOptions.higher_cost, SlotOptions.immediate},
+            {SlotOptions.higher_cost, SlotOptions.eventual},
+            {SlotOptions.higher_cost, SlotOptions.ordered, SlotOptions.relaxed},
+            {SlotOptions.higher_cost, SlotOptions.all_together, SlotOptions.relaxed},
+            {SlotOptions.higher_cost, SlotOptions.group_slots, SlotOptions.relaxed},
+        ],
+    )
+    def test_slot_options(self, slot_options: Any) -> None:
+        self.flow.slot_options = slot_options
+        check_equivalence(self.flow)
+
+    @pytest.mark.parametrize(
+        "mapping_options",
+        [
+            {MappingOptions.relaxed},
+            {MappingOptions.immediate},
+            {MappingOptions.eventual},
+            {MappingOptions.relaxed, MappingOptions.transitive},
+            {MappingOptions.relaxed, MappingOptions.prohibit_direct},
+            {MappingOptions.relaxed, MappingOptions.group_maps},
+        ],
+    )
+    def test_mapping_options(self, mapping_options: Any) -> None:
+        self.flow.mapping_options = mapping_options
+        check_equivalence(self.flow)
+
+    @pytest.mark.parametrize(
+        "optimization_options",
+        [set(), {NL2FlowOptions.multi_instance}, {NL2FlowOptions.allow_retries}],
+    )
+    def test_optimization_options(self, optimization_options: Any) -> None:
+        self.flow.optimization_options = optimization_options
+        check_equivalence(self.flow)
+
+    @pytest.mark.parametrize("goal_type", [GoalOptions.AND_AND, GoalOptions.AND_OR, GoalOptions.OR_AND])
+    def test_goal_types(self, goal_type: GoalOptions) -> None:
+        self.flow.goal_type = goal_type
+        self.flow.add(
+            GoalItems(
+                goals=[
+                    GoalItem(goal_name="Credit Score", goal_type=GoalType.OBJECT_KNOWN),
+                    GoalItem(goal_name="Find Errors", goal_type=GoalType.OPERATOR),
+                ]
+            )
+        )
+        check_equivalence(self.flow)
+
+    def test_life_cycle(self) -> None:
+        self.flow.variable_life_cycle = {LifeCycleOptions.confirm_on_determination, LifeCycleOptions.uncertain_on_use}
+        check_equivalence(self.flow)
+
+    def test_history_and_constraints(self) -> None:
+        self.flow.add(
+            [
+                MemoryItem(item_id="database link", item_state=MemoryState.KNOWN),
+                Step(name="Find Errors", parameters=["database link"]),
+                Constraint(constraint="len($list_of_errors) > 0", truth_value=True),
+            ]
+        )
+        check_equivalence(self.flow)
+
+    @pytest.mark.parametrize("debug_flag", [DebugFlag.DIRECT, DebugFlag.TOKENIZE])
+    @pytest.mark.parametrize("report_type", [SolutionQuality.SOUND, SolutionQuality.VALID, SolutionQuality.OPTIMAL])
+    def test_debug_references(self, debug_flag: DebugFlag, report_type: SolutionQuality) -> None:
+        self.flow.optimization_options = set()
+        self.flow.add(
+            ClassicalPlanReference(
+                plan=[
+                    Step(name="Find Errors", parameters=["database link"]),
+                    Step(name="Fix Errors", parameters=["list of errors"]),
+                ]
+            )
+        )
+        check_equivalence(self.flow, debug_flag, report_type)
+
+    def test_plan(self) -> None:
+        reference = self.flow.plan_it(self.planner)
+        plans = self.flow.plan_it(self.planner, compilation_type=CompileOptions.DIRECT)
+
+        assert plans.list_of_plans, "There should be plans."
+        assert [[step.name for step in plan.plan] for plan in plans.list_of_plans] == [
+            [step.name for step in plan.plan] for plan in reference.list_of_plans
+        ]
+
+
+class TestDirectEmitterSketches:
+    @pytest.mark.parametrize(
+        "sketch_name",
+        [
+            "01-simple_sketch",
+            "02-simple_sketch_in_order",
+            "03-sketch_with_objects",
+            "04-sketch_with_slots",
+            "05-sketch_with_objects_and_mapping",
+            "06-sketch_with_instantiated_goals",
+            "07-sketch_with_constraints",
+            "08-sketch_with_complex_goals",
+        ],
+    )
+    def test_sketch(self, sketch_name: str) -> None:
+        catalog, sketch = load_assets(catalog_name="catalog", sketch_name=sketch_name)
+        flow = BasicSketchCompilation(name=sketch.sketch_name).compile_to_flow(sketch, catalog)
+        check_equivalence(flow)
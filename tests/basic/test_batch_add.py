@@ -0,0 +1,101 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.options import MemoryState
+from nl2flow.compile.schemas import (
+    ClassicalPlanReference,
+    FlowDefinition,
+    GoalItem,
+    GoalItems,
+    MappingItem,
+    MemoryItem,
+    SignatureItem,
+    Step,
+    TypeItem,
+)
+from tests.testing import BaseTestAgents
+from typing import Any, List
+
+import pytest
+
+
+def get_catalog(num_operators: int) -> List[Any]:
+    catalog: List[Any] = list()
+
+    for index in range(num_operators):
+        operator = Operator(f"Agent {index}")
+        operator.add_input(SignatureItem(parameters=[f"Item {index}"]))
+        operator.add_output(SignatureItem(parameters=[f"Item {index + 1}"]))
+        catalog.append(operator)
+
+    return catalog
+
+
+class TestBatchAdd(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+
+    def test_same_as_add(self) -> None:
+        catalog = get_catalog(10) + [TypeItem(name="Thing", children={"Small Thing"})]
+
+        reference = Flow(name=self.flow.flow_definition.name)
+        for item in catalog:
+            reference.add(item)
+
+        new_flow = Flow(name=self.flow.flow_definition.name)
+        new_flow.add_many(catalog)
+
+        assert new_flow.flow_definition == reference.flow_definition
+        assert new_flow.compile_to_pddl()[0] == reference.compile_to_pddl()[0]
+
+    def test_validates_once(self, mocker: MockerFixture) -> None:
+        spy = mocker.spy(FlowDefinition, "get_object_map")
+
+        self.flow.add_many(get_catalog(20))
+        calls_for_batch = spy.call_count
+
+        for item in get_catalog(20):
+            item.definition.name = f"Other {item.definition.name}"
+            self.flow.add(item)
+
+        assert calls_for_batch < spy.call_count - calls_for_batch
+        assert len(self.flow.flow_definition.operators) == 44
+
+    def test_order_within_batch(self) -> None:
+        with pytest.raises(Exception):
+            Flow(name="Unknown Items").add(MappingItem(source_name="Item 0", target_name="Item 5"))
+
+        with self.flow.batch():
+            self.flow.add(MappingItem(source_name="Item 0", target_name="Item 5"))
+            self.flow.add(get_catalog(5))
+
+        assert len(self.flow.flow_definition.list_of_mappings) == 1
+
+    def test_rollback(self) -> None:
+        num_operators = len(self.flow.flow_definition.operators)
+        reference = self.flow.flow_definition.reference
+
+        with pytest.raises(Exception):
+            with self.flow.batch():
+                self.flow.add(get_catalog(5))
+                self.flow.add(ClassicalPlanReference(plan=[Step(name="Agent 0")]))
+                self.flow.add(Operator("Agent 1"))
+
+        assert len(self.flow.flow_definition.operators) == num_operators
+        assert self.flow.flow_definition.reference == reference
+
+        self.flow.add_many(get_catalog(5))
+        assert len(self.flow.flow_definition.operators) == num_operators + 5
+
+    def test_nested_batch(self) -> None:
+        with self.flow.batch():
+            self.flow.add_many(get_catalog(3))
+
+            with self.flow.batch():
+                self.flow.add(MemoryItem(item_id="Item 0", item_state=MemoryState.KNOWN))
+
+            self.flow.add(GoalItems(goals=GoalItem(goal_name="Agent 2")))
+
+        planner_response = self.get_plan()
+        assert planner_response.best_plan is not None
+        assert [step.name for step in planner_response.best_plan.plan] == ["Agent 0", "Agent 1", "Agent 2"]
@@ -0,0 +1,96 @@
+from pathlib import Path
+from pytest_mock import MockerFixture
+from nl2flow.compile.cache import CompilationCache
+from nl2flow.compile.compilations import ClassicPDDL
+from nl2flow.compile.options import SlotOptions, MemoryState
+from nl2flow.compile.schemas import GoalItems, GoalItem, MemoryItem
+from tests.testing import BaseTestAgents
+
+
+class TestCompileCache(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+        self.flow.cache = CompilationCache()
+
+    def test_unchanged_flow_is_compiled_once(self, mocker: MockerFixture) -> None:
+        compile_spy = mocker.spy(ClassicPDDL, "compile")
+
+        pddl, transforms = self.flow.compile_to_pddl()
+        cached_pddl, cached_transforms = self.flow.compile_to_pddl()
+
+        assert compile_spy.call_count == 1
+        assert pddl == cached_pddl
+        assert transforms == cached_transforms
+        assert self.flow.cache is not None and self.flow.cache.hits == 1
+
+    def test_changes_invalidate_cache(self, mocker: MockerFixture) -> None:
+        compile_spy = mocker.spy(ClassicPDDL, "compile")
+        self.flow.compile_to_pddl()
+
+        self.flow.slot_options.add(SlotOptions.last_resort)
+        self.flow.compile_to_pddl()
+        assert compile_spy.call_count == 2
+
+        self.flow.add(MemoryItem(item_id="list of errors", item_state=MemoryState.KNOWN))
+        self.flow.compile_to_pddl()
+        assert compile_spy.call_count == 3
+
+    def test_cache_shared_across_flows(self, mocker: MockerFixture) -> None:
+        compile_spy = mocker.spy(ClassicPDDL, "compile")
+        pddl, _ = self.flow.compile_to_pddl()
+
+        cache = self.flow.cache
+        self.setup_method()
+        self.flow.cache = cache
+
+        cached_pddl, _ = self.flow.compile_to_pddl()
+
+        assert compile_spy.call_count == 1
+        assert pddl == cached_pddl
+
+    def test_compilation_after_hit(self, mocker: MockerFixture) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+
+        cache = self.flow.cache
+        self.setup_method()
+        self.flow.cache = cache
+
+        compile_spy = mocker.spy(ClassicPDDL, "compile")
+        self.flow.compile_to_pddl()
+        assert compile_spy.call_count == 0
+
+        compilation = self.flow.compilation
+        assert compile_spy.call_count == 1
+        assert compilation.print_domain() == pddl.domain
+        assert self.flow.compilation is compilation
+
+    def test_lru_eviction(self) -> None:
+        cache = CompilationCache(max_size=1)
+        self.flow.cache = cache
+
+        self.flow.compile_to_pddl()
+        self.flow.lookahead = 2
+        self.flow.compile_to_pddl()
+
+        assert len(cache) == 1
+
+        self.flow.lookahead = 1
+        self.flow.compile_to_pddl()
+
+        assert cache.hits == 0
+        assert cache.misses == 3
+
+    def test_disk_tier(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        self.flow.cache = CompilationCache(cache_dir=tmp_path)
+        pddl, transforms = self.flow.compile_to_pddl()
+
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+        compile_spy = mocker.spy(ClassicPDDL, "compile")
+        self.flow.cache = CompilationCache(cache_dir=tmp_path)
+        cached_pddl, cached_transforms = self.flow.compile_to_pddl()
+
+        assert compile_spy.call_count == 0
+        assert pddl == cached_pddl
+        assert transforms == cached_transforms
@@ -0,0 +1,137 @@
+from typing import List
+from nl2flow.compile.cache import CompilationCache
+from nl2flow.compile.compilations import ClassicPDDL
+from nl2flow.compile.options import GoalType, MemoryState
+from nl2flow.compile.schemas import GoalItems, GoalItem, MemoryItem, Step, PDDL
+from tests.testing import BaseTestAgents
+
+import copy
+
+
+def normalize(text: str) -> List[str]:
+    return sorted(line.strip() for line in text.splitlines() if line.strip())
+
+
+class TestIncrementalCompile(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(
+            [
+                GoalItems(goals=GoalItem(goal_name="Fix Errors")),
+                MemoryItem(item_id="database link", item_state=MemoryState.UNKNOWN),
+            ]
+        )
+
+    def check_against_full_compile(self, pddl: PDDL) -> None:
+        reference, _ = ClassicPDDL(self.flow.flow_definition).compile(
+            slot_options=self.flow.slot_options,
+            mapping_options=self.flow.mapping_options,
+            confirm_options=self.flow.confirm_options,
+            variable_life_cycle=self.flow.variable_life_cycle,
+            optimization_options=self.flow.optimization_options,
+            goal_type=self.flow.goal_type,
+            lookahead=self.flow.lookahead,
+            debug_flag=None,
+            report_type=None,
+        )
+
+        assert normalize(pddl.domain) == normalize(reference.domain)
+        assert normalize(pddl.problem) == normalize(reference.problem)
+
+    def test_state_change_rebuilds_problem_only(self) -> None:
+        cache = CompilationCache()
+        self.flow.cache = cache
+
+        pddl, _ = self.flow.compile_to_pddl()
+        self.check_against_full_compile(pddl)
+
+        self.flow.flow_definition.memory_items = [MemoryItem(item_id="database link", item_state=MemoryState.KNOWN)]
+        pddl, _ = self.flow.compile_to_pddl()
+        self.check_against_full_compile(pddl)
+
+        self.flow.add(Step(name="Find Errors", parameters=["database link"]))
+        pddl, _ = self.flow.compile_to_pddl()
+        self.check_against_full_compile(pddl)
+
+        assert cache.domains.misses == 1
+        assert cache.domains.hits == 2
+
+    def test_incremental_plan(self) -> None:
+        self.flow.cache = CompilationCache()
+        self.get_plan()
+
+        self.flow.flow_definition.memory_items = [MemoryItem(item_id="database link", item_state=MemoryState.KNOWN)]
+        self.flow.add(Step(name="Find Errors", parameters=["database link"]))
+
+        plans = self.get_plan()
+        assert plans.list_of_plans, "There should be plans."
+
+        self.flow.cache = None
+        reference_plans = self.get_plan()
+
+        assert [[step.name for step in plan.plan] for plan in plans.list_of_plans] == [
+            [step.name for step in plan.plan] for plan in reference_plans.list_of_plans
+        ]
+
+    def test_new_memory_item_rebuilds_domain(self) -> None:
+        cache = CompilationCache()
+        self.flow.cache = cache
+
+        self.flow.compile_to_pddl()
+        self.flow.add(MemoryItem(item_id="new item", item_state=MemoryState.KNOWN))
+
+        pddl, _ = self.flow.compile_to_pddl()
+        self.check_against_full_compile(pddl)
+
+        assert cache.domains.misses == 2
+        assert cache.domains.hits == 0
+
+    def test_flows_do_not_share_problem_state(self) -> None:
+        cache = CompilationCache()
+        self.flow.cache = cache
+
+        other_flow = copy.deepcopy(self.flow)
+        other_flow.cache = cache
+        other_flow.flow_definition.memory_items = [MemoryItem(item_id="database link", item_state=MemoryState.KNOWN)]
+
+        self.flow.compile_to_pddl()
+        memory_items = list(self.flow.compilation.flow_definition.memory_items)
+        problem = self.flow.compilation.print_problem()
+
+        other_pddl, _ = other_flow.compile_to_pddl()
+
+        assert cache.domains.hits == 1
+        assert other_flow.compilation is not self.flow.compilation
+        assert self.flow.compilation.flow_definition.memory_items == memory_items
+        assert self.flow.compilation.print_problem() == problem != other_pddl.problem
+
+    def test_goal_object_not_in_catalog(self) -> None:
+        cache = CompilationCache()
+        self.flow.cache = cache
+
+        for goal_name in ["new object", "another new object"]:
+            self.flow.flow_definition.goal_items = [
+                GoalItems(goals=GoalItem(goal_name=goal_name, goal_type=GoalType.OBJECT_KNOWN))
+            ]
+            self.flow.flow_definition.memory_items = [
+                MemoryItem(item_id="database link", item_state=MemoryState.UNKNOWN)
+            ]
+
+            pddl, _ = self.flow.compile_to_pddl()
+            self.check_against_full_compile(pddl)
+
+            cached_domain = self.flow.compilation
+            constant_map = dict(cached_domain.constant_map)
+            domain_size = cached_domain.get_domain_size()
+
+            self.flow.flow_definition.memory_items = [MemoryItem(item_id="database link", item_state=MemoryState.KNOWN)]
+
+            pddl, _ = self.flow.compile_to_pddl()
+            self.check_against_full_compile(pddl)
+
+            assert self.flow.compilation.constant_map is not cached_domain.constant_map
+            assert cached_domain.constant_map == constant_map
+            assert cached_domain.get_domain_size() == domain_size
+
+        assert cache.domains.misses == 2
+        assert cache.domains.hits == 2
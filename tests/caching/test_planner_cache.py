@@ -0,0 +1,105 @@
+from pathlib import Path
+from pytest_mock import MockerFixture
+from nl2flow.compile.schemas import GoalItems, GoalItem
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.plan.schemas import RawPlannerResult
+from tests.testing import BaseTestAgents
+
+import os
+import subprocess
+import sys
+import time
+
+KEY_SCRIPT = """
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.planners.kstar import Kstar
+from tests.planner.test_async import get_slow_flow
+
+pddl, _ = get_slow_flow().compile_to_pddl()
+print(PlannerCache.make_key(pddl, **Kstar().cache_settings()))
+"""
+
+
+def get_key_in_subprocess(hash_seed: int) -> str:
+    root = str(Path(__file__).parents[2])
+    environment = {**os.environ, "PYTHONHASHSEED": str(hash_seed), "PYTHONPATH": root}
+    output = subprocess.run(
+        [sys.executable, "-c", KEY_SCRIPT], cwd=root, env=environment, capture_output=True, text=True, check=True
+    )
+    return output.stdout.strip().splitlines()[-1]
+
+
+class TestPlannerCache(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+        self.planner = Kstar()
+        self.planner.cache = PlannerCache()
+
+    def test_hit_skips_planner(self, mocker: MockerFixture) -> None:
+        planner_spy = mocker.spy(Kstar, "run_planner")
+
+        planner_response = self.get_plan()
+        cached_planner_response = self.get_plan()
+
+        assert planner_spy.call_count == 1
+        assert planner_response.list_of_plans, "There should be plans."
+        assert cached_planner_response == planner_response
+        assert self.planner.cache is not None
+        assert self.planner.cache.hits == 1 and self.planner.cache.misses == 1
+
+    def test_settings_in_key(self, mocker: MockerFixture) -> None:
+        planner_spy = mocker.spy(Kstar, "run_planner")
+        self.get_plan()
+
+        self.planner.timeout = 10
+        self.get_plan()
+
+        assert planner_spy.call_count == 2
+
+    def test_failures_are_not_cached(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(Kstar, "run_planner", return_value=RawPlannerResult(is_timeout=True))
+        pddl, _ = self.flow.compile_to_pddl()
+
+        self.planner.raw_plan(pddl)
+        assert self.planner.cache is not None and len(self.planner.cache) == 0
+
+    def test_disk_tier(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        self.planner.cache = PlannerCache(cache_dir=tmp_path)
+        planner_response = self.get_plan()
+
+        planner_spy = mocker.spy(Kstar, "run_planner")
+        self.planner.cache = PlannerCache(cache_dir=tmp_path)
+
+        assert self.get_plan() == planner_response
+        assert planner_spy.call_count == 0
+
+    def test_ttl(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        self.planner.cache = PlannerCache(cache_dir=tmp_path, ttl=0.5)
+        pddl, _ = self.flow.compile_to_pddl()
+        self.planner.raw_plan(pddl)
+
+        key = self.planner.cache.make_key(pddl, **self.planner.cache_settings())
+        assert key in self.planner.cache
+
+        time.sleep(0.6)
+        assert key not in self.planner.cache
+
+        planner_spy = mocker.spy(Kstar, "run_planner")
+        self.planner.raw_plan(pddl)
+        assert planner_spy.call_count == 1
+
+    def test_disk_size_limit(self, tmp_path: Path) -> None:
+        self.planner.cache = PlannerCache(max_size=1, cache_dir=tmp_path, max_disk_size=2)
+
+        for goal in ["Fix Errors", "Find Errors", "Credit Score API"]:
+            self.flow.flow_definition.goal_items = [GoalItems(goals=GoalItem(goal_name=goal))]
+            self.get_plan()
+
+        assert len(self.planner.cache) == 1
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+    def test_key_across_processes(self) -> None:
+        assert get_key_in_subprocess(1) == get_key_in_subprocess(2)
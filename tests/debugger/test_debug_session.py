@@ -0,0 +1,110 @@
+import pytest
+from nl2flow.debug.debug import BasicDebugger, DebugSession
+from nl2flow.debug.schemas import DebugFlag, SolutionQuality
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import SignatureItem, Parameter, GoalItems, GoalItem
+from nl2flow.compile.options import LifeCycleOptions
+from nl2flow.printers.codelike import CodeLikePrint
+from copy import deepcopy
+from typing import Iterator, List
+
+TOKENS = [
+    "a_1 = agent_a()",
+    "map(a_1, a)",
+    "confirm(a)",
+    "y = agent_b(a)",
+    "agent_d(y)",
+]
+
+CANDIDATES = [
+    TOKENS,
+    TOKENS[:1] + TOKENS[2:],
+    ["o1, o2, y = agent_e(i1, i2)", "agent_d(y)"],
+]
+
+
+def get_flow() -> Flow:
+    flow = Flow("Debug Session Test")
+    flow.variable_life_cycle.add(LifeCycleOptions.confirm_on_mapping)
+
+    agent_a = Operator(name="agent_a")
+    agent_a.add_output(SignatureItem(parameters=Parameter(item_id="a_1", item_type="type_a")))
+
+    agent_b = Operator(name="agent_b")
+    agent_b.add_input(SignatureItem(parameters=Parameter(item_id="a", item_type="type_a")))
+    agent_b.add_output(SignatureItem(parameters="y"))
+
+    agent_d = Operator(name="agent_d")
+    agent_d.add_input(SignatureItem(parameters="y"))
+
+    agent_e = Operator(name="agent_e")
+    agent_e.add_input(SignatureItem(parameters=["i1", "i2"]))
+    agent_e.add_output(SignatureItem(parameters=["o1", "o2", "y"]))
+
+    flow.add([agent_a, agent_b, agent_d, agent_e, GoalItems(goals=GoalItem(goal_name="agent_d"))])
+    return flow
+
+
+class TestDebugSession:
+    def setup_method(self) -> None:
+        self.flow = get_flow()
+        self.session = DebugSession(self.flow, SolutionQuality.VALID)
+
+    def test_same_compilation(self) -> None:
+        for list_of_tokens in CANDIDATES:
+            reference_plan = CodeLikePrint.parse_tokens(list_of_tokens)
+            pddl, _ = self.session.compile(reference_plan)
+
+            flow = get_flow()
+            flow.add(reference_plan)
+            reference_pddl, _ = flow.compile_to_pddl(DebugFlag.TOKENIZE, SolutionQuality.VALID)
+
+            assert pddl.problem == reference_pddl.problem
+            assert sorted(pddl.domain.split()) == sorted(reference_pddl.domain.split())
+
+    def test_same_reports(self) -> None:
+        reports = self.session.debug_all(CANDIDATES)
+        assert len(reports) == len(CANDIDATES)
+
+        for list_of_tokens, report in zip(CANDIDATES, reports):
+            reference_report = BasicDebugger(get_flow()).debug(list_of_tokens, report_type=SolutionQuality.VALID)
+
+            assert report.determination == reference_report.determination
+            assert report.plan_diff_str == reference_report.plan_diff_str
+
+    def test_stream(self) -> None:
+        def stream() -> Iterator[List[str]]:
+            for list_of_tokens in CANDIDATES[:2]:
+                yield list_of_tokens
+
+        reports = list(self.session.iter_debug(stream()))
+
+        assert [report.reference for report in reports] == [
+            CodeLikePrint.parse_tokens(list_of_tokens) for list_of_tokens in CANDIDATES[:2]
+        ]
+        assert reports[0].determination is True
+
+    def test_flow_not_modified(self) -> None:
+        flow_definition = deepcopy(self.flow.flow_definition)
+        self.session.debug(TOKENS)
+
+        assert self.flow.flow_definition == flow_definition
+        assert self.flow.flow_definition.reference is None
+
+    def test_base_compilation_not_modified(self) -> None:
+        session = DebugSession(self.flow, SolutionQuality.VALID, max_workers=2)
+        compilation = session.compilation
+
+        domain, problem = compilation.print_domain(), compilation.print_problem()
+        session.debug_all(CANDIDATES * 2)
+
+        assert compilation.print_domain() == domain
+        assert compilation.print_problem() == problem
+        assert compilation.get_domain_size() == compilation.domain_size
+
+    def test_reference_outside_keep_language(self) -> None:
+        compilation = self.session.compilation.copy_for_reference()
+
+        with pytest.raises(ValueError):
+            compilation.update_reference(CodeLikePrint.parse_tokens(TOKENS), **self.session.compile_options)
@@ -0,0 +1,103 @@
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.options import LifeCycleOptions, MemoryState, RestrictedOperations
+from nl2flow.compile.schemas import (
+    ClassicalPlanReference,
+    GoalItem,
+    GoalItems,
+    MemoryItem,
+    SignatureItem,
+    SlotProperty,
+    Step,
+)
+from nl2flow.compile.basic_compilations.compile_history import get_indices_of_interest
+from nl2flow.debug.schemas import DebugFlag, SolutionQuality
+from nl2flow.plan.planners.kstar import Kstar
+from tarski.syntax import CompoundFormula
+from typing import Any, List
+
+NUM_STEPS = 50
+
+
+def get_preconditions(flow: Flow, index: int) -> List[Any]:
+    action = flow.compilation.problem.get_action(f"{RestrictedOperations.TOKENIZE.value}_{index}")
+    precondition = action.precondition
+    return list(precondition.subformulas) if isinstance(precondition, CompoundFormula) else [precondition]
+
+
+class TestTokenizeEncoding:
+    def setup_method(self) -> None:
+        self.flow = Flow("Tokenize Encoding Test")
+
+        for index in range(NUM_STEPS):
+            operator = Operator(f"agent_{index}")
+            operator.add_input(SignatureItem(parameters=[f"item_{index}"]))
+            operator.add_output(SignatureItem(parameters=[f"item_{index + 1}"]))
+            self.flow.add(operator)
+
+        self.flow.add(GoalItems(goals=GoalItem(goal_name=f"agent_{NUM_STEPS - 1}")))
+        self.flow.add(
+            ClassicalPlanReference(
+                plan=[Step(name=f"agent_{index}", parameters=[f"item_{index}"]) for index in range(NUM_STEPS)]
+            )
+        )
+
+    def test_repeat_index_table(self) -> None:
+        self.flow.flow_definition.history = [Step(name="agent_1"), Step(name="agent_0")]
+        self.flow.flow_definition.reference = ClassicalPlanReference(
+            plan=[Step(name=f"agent_{index % 3}") for index in range(10)]
+        )
+        self.flow.compile_to_pddl(DebugFlag.TOKENIZE, SolutionQuality.VALID)
+
+        indices_of_interest = get_indices_of_interest(self.flow.compilation, self.flow.flow_definition)
+        assert indices_of_interest == [1, 1, 0, 2, 2, 1, 3, 3, 2, 4]
+
+    def test_linear_encoding(self) -> None:
+        self.flow.compile_to_pddl(DebugFlag.TOKENIZE, SolutionQuality.OPTIMAL)
+
+        assert all(len(get_preconditions(self.flow, index)) == 2 for index in range(1, NUM_STEPS + 1))
+
+    def test_deleted_predicates_carried_forward(self) -> None:
+        self.flow.variable_life_cycle.add(LifeCycleOptions.uncertain_on_use)
+        self.flow.flow_definition.reference = ClassicalPlanReference(
+            plan=[Step(name="confirm", parameters=["item_0"]), Step(name="agent_0", parameters=["item_0"])]
+        )
+        self.flow.compile_to_pddl(DebugFlag.TOKENIZE, SolutionQuality.VALID)
+
+        confirm_predicate = get_preconditions(self.flow, 1)[0]
+        assert confirm_predicate.symbol.name == "known"
+        assert any(p.is_syntactically_equal(confirm_predicate) for p in get_preconditions(self.flow, 2))
+
+    def test_wrong_step_in_the_middle(self) -> None:
+        flow = Flow("Wrong Step Test")
+
+        for index in range(3):
+            operator = Operator(f"agent_{index}")
+            operator.add_input(SignatureItem(parameters=[f"item_{index}"]))
+            operator.add_output(SignatureItem(parameters=[f"item_{index + 1}"]))
+            flow.add(operator)
+
+        agent_never = Operator("agent_never")
+        agent_never.add_input(SignatureItem(parameters=["item_never"]))
+
+        flow.add(
+            [
+                agent_never,
+                SlotProperty(slot_name="item_never", slot_desirability=0.0),
+                MemoryItem(item_id="item_0", item_state=MemoryState.KNOWN),
+                GoalItems(goals=GoalItem(goal_name="agent_2")),
+            ]
+        )
+
+        reference = [Step(name=f"agent_{index}", parameters=[f"item_{index}"]) for index in range(3)]
+        reference.insert(1, Step(name="agent_never", parameters=["item_never"]))
+        flow.add(ClassicalPlanReference(plan=reference))
+
+        pddl, _ = flow.compile_to_pddl(DebugFlag.TOKENIZE, SolutionQuality.OPTIMAL)
+        raw_planner_result = Kstar().raw_plan(pddl)
+        actions = [action.strip() for action in raw_planner_result.list_of_plans[0].actions]
+
+        # agent_never can never run, so only its token is untokenized and the steps after it still match
+        assert f"{RestrictedOperations.UNTOKENIZE.value}_2" in actions
+        assert f"{RestrictedOperations.UNTOKENIZE.value}_3" not in actions
+        assert f"{RestrictedOperations.TOKENIZE.value}_3" in actions
@@ -25,7 +25,16 @@ class TestDuplicates(BaseTestAgents):
         with pytest.raises(Exception):
             self.flow.add([agent_1, agent_2])
 
-    @pytest.mark.skip(reason="Regression with pydantic update")
+    def test_relaxed_assignment_is_per_flow(self) -> None:
+        relaxed_flow = Flow(name="Test Relaxed Assignment", validate=False)
+        relaxed_flow.add([Operator("Agent"), Operator("Agent")])
+
+        with pytest.raises(Exception):
+            self.flow.add([Operator("Agent"), Operator("Agent")])
+
+        with pytest.raises(Exception):
+            Flow(name="Test Validated Assignment").add([Operator("Agent"), Operator("Agent")])
+
     def test_relaxed_assignment(self) -> None:
         agent_1 = Operator("Agent")
         agent_2 = Operator("Agent")
@@ -0,0 +1,74 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.options import TRUSTED_CONTEXT
+from nl2flow.compile.schemas import FlowDefinition, MappingItem, MemoryItem, SlotProperty
+from tests.testing import BaseTestAgents
+
+import pytest
+
+
+class TestValidation(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+
+    def test_object_map_built_once(self, mocker: MockerFixture) -> None:
+        spy = mocker.spy(FlowDefinition, "get_object_map")
+        FlowDefinition.model_validate(dict(self.flow.flow_definition))
+
+        assert spy.call_count == 1
+
+    def test_hash_conflicts(self) -> None:
+        self.flow.add(MemoryItem(item_id="user name"))
+
+        with pytest.raises(Exception, match="Conflicting names for user_name"):
+            self.flow.add(MemoryItem(item_id="User name"))
+
+    def test_object_type_conflict(self) -> None:
+        with pytest.raises(Exception, match="more than one type"):
+            self.flow.add(
+                [
+                    MemoryItem(item_id="Contact", item_type="Person"),
+                    MemoryItem(item_id="Contact", item_type="Organization"),
+                ]
+            )
+
+    def test_unknown_items(self) -> None:
+        with pytest.raises(Exception, match="Mapping request with Unknown Item unknown"):
+            self.flow.add(MappingItem(source_name="Unknown Item", target_name="list of errors"))
+
+        with pytest.raises(Exception, match="Slot request with Unknown Item unknown"):
+            Flow(name="Unknown Slots").add(SlotProperty(slot_name="Unknown Item"))
+
+    def test_unknown_operator(self) -> None:
+        self.flow.flow_definition.starts_with = "Find Errors"
+
+        with pytest.raises(Exception, match="Operator name not found"):
+            self.flow.flow_definition.ends_with = "Unknown Agent"
+
+    def test_trusted(self, mocker: MockerFixture) -> None:
+        definition = dict(self.flow.flow_definition)
+        definition["operators"] = definition["operators"] + [Operator("Find Errors").definition]
+
+        with pytest.raises(Exception, match="Duplicate names"):
+            FlowDefinition.model_validate(definition)
+
+        spy = mocker.spy(FlowDefinition, "get_object_map")
+        flow_definition = FlowDefinition.model_validate(definition, context={TRUSTED_CONTEXT: True})
+
+        assert spy.call_count == 0
+        assert len(flow_definition.operators) == len(self.flow.flow_definition.operators) + 1
+
+    def test_load_trusted_flow(self, mocker: MockerFixture) -> None:
+        new_flow = Flow(name="Trusted Flow")
+        spy = mocker.spy(FlowDefinition, "get_object_map")
+
+        new_flow.load_flow_definition(self.flow.flow_definition.model_dump(), trusted=True)
+
+        assert spy.call_count == 0
+        assert new_flow.flow_definition == self.flow.flow_definition
+        assert new_flow.compile_to_pddl()[0] == self.flow.compile_to_pddl()[0]
+
+        spy.reset_mock()
+        new_flow.flow_definition = self.flow.flow_definition.model_dump()
+        assert spy.call_count == 1
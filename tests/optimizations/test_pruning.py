@@ -0,0 +1,154 @@
+from typing import Set, Tuple
+from nl2flow.compile.cache import CompilationCache
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.options import NL2FlowOptions, GoalType, MemoryState
+from nl2flow.compile.schemas import (
+    Constraint,
+    GoalItem,
+    GoalItems,
+    MappingItem,
+    MemoryItem,
+    Parameter,
+    SignatureItem,
+)
+from nl2flow.plan.schemas import PlannerResponse
+from nl2flow.services.sketch import BasicSketchCompilation
+from tests.caching.test_incremental_compile import normalize
+from tests.sketch.test_basic import load_assets
+from tests.testing import BaseTestAgents
+
+import pytest
+
+
+def get_plans(planner_response: PlannerResponse) -> Set[Tuple[str, ...]]:
+    return {tuple(str(step) for step in plan.plan) for plan in planner_response.list_of_plans}
+
+
+class TestGoalRelevancePruning(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    def get_pruned_domain(self) -> str:
+        self.flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+        pddl, _ = self.flow.compile_to_pddl()
+        return pddl.domain
+
+    def check_same_plans(self) -> None:
+        reference = self.get_plan()
+
+        self.flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+        planner_response = self.get_plan()
+
+        assert planner_response.list_of_plans, "There should be plans."
+        assert get_plans(planner_response) == get_plans(reference)
+
+    def test_irrelevant_operators_are_pruned(self) -> None:
+        domain = self.get_pruned_domain()
+
+        assert "find_errors" in domain
+        assert "fix_errors" in domain
+        assert "credit_score_api" not in domain
+        assert "user_info" not in domain
+        assert "accountid" not in domain
+
+    def test_same_plans(self) -> None:
+        self.flow.add(MemoryItem(item_id="database link", item_state=MemoryState.KNOWN))
+        self.check_same_plans()
+
+    def test_declared_mappings(self) -> None:
+        link_finder = Operator("Link Finder")
+        link_finder.add_output(SignatureItem(parameters=["url"]))
+
+        self.flow.add([link_finder, MappingItem(source_name="url", target_name="database link")])
+        assert "link_finder" in self.get_pruned_domain()
+
+    def test_typed_mappings(self) -> None:
+        link_finder = Operator("Link Finder")
+        link_finder.add_output(SignatureItem(parameters=[Parameter(item_id="url", item_type="link")]))
+
+        link_checker = Operator("Link Checker")
+        link_checker.add_input(SignatureItem(parameters=[Parameter(item_id="checked url", item_type="link")]))
+
+        unrelated_finder = Operator("Unrelated Finder")
+        unrelated_finder.add_output(SignatureItem(parameters=[Parameter(item_id="phone", item_type="number")]))
+
+        self.flow.add([link_finder, link_checker, unrelated_finder])
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Link Checker")))
+
+        domain = self.get_pruned_domain()
+        assert "link_finder" in domain
+        assert "unrelated_finder" not in domain
+
+    def test_object_goals(self) -> None:
+        self.flow.flow_definition.goal_items = [
+            GoalItems(goals=GoalItem(goal_name="Credit Score", goal_type=GoalType.OBJECT_KNOWN)),
+            GoalItems(goals=GoalItem(goal_name="database link", goal_type=GoalType.OBJECT_USED)),
+        ]
+
+        domain = self.get_pruned_domain()
+        assert "credit_score_api" in domain
+        assert "find_errors" in domain
+        assert "fix_errors" not in domain
+
+        self.flow.optimization_options.remove(NL2FlowOptions.prune_irrelevant)
+        self.check_same_plans()
+
+    def test_incremental_compile(self) -> None:
+        self.flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+        self.flow.add(MemoryItem(item_id="AccountID", item_state=MemoryState.UNKNOWN))
+
+        cache = CompilationCache()
+        self.flow.cache = cache
+        self.flow.compile_to_pddl()
+
+        self.flow.flow_definition.memory_items = [MemoryItem(item_id="AccountID", item_state=MemoryState.KNOWN)]
+        pddl, _ = self.flow.compile_to_pddl()
+        assert cache.domains.hits == 1
+
+        self.flow.cache = None
+        reference, _ = self.flow.compile_to_pddl()
+
+        assert self.flow.compilation.relevant_items is not None
+        assert "accountid" not in self.flow.compilation.relevant_items
+        assert normalize(pddl.problem) == normalize(reference.problem)
+
+    def test_state_constraints_do_not_change_the_domain(self) -> None:
+        self.flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+
+        cache = CompilationCache()
+        self.flow.cache = cache
+        self.flow.compile_to_pddl()
+
+        self.flow.add(Constraint(constraint="$credit_score > 600", truth_value=True))
+        pddl, _ = self.flow.compile_to_pddl()
+        assert cache.domains.hits == 1
+
+        self.flow.cache = None
+        reference, _ = self.flow.compile_to_pddl()
+
+        assert "credit_score_api" not in reference.domain
+        assert normalize(pddl.domain) == normalize(reference.domain)
+        assert normalize(pddl.problem) == normalize(reference.problem)
+
+
+class TestGoalRelevancePruningSketches:
+    @pytest.mark.parametrize(
+        "sketch_name",
+        [
+            "03-sketch_with_objects",
+            "04-sketch_with_slots",
+            "05-sketch_with_objects_and_mapping",
+            "07-sketch_with_constraints",
+        ],
+    )
+    def test_sketch(self, sketch_name: str) -> None:
+        catalog, sketch = load_assets(catalog_name="catalog", sketch_name=sketch_name)
+        flow = BasicSketchCompilation(name=sketch.sketch_name).compile_to_flow(sketch, catalog)
+        reference = flow.plan_it(BaseTestAgents.planner)
+
+        flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+        planner_response = flow.plan_it(BaseTestAgents.planner)
+
+        assert planner_response.list_of_plans, "There should be plans."
+        assert planner_response.best_plan.cost == reference.best_plan.cost
@@ -0,0 +1,132 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import PDDL, GoalItem, GoalItems, SignatureItem, SlotProperty
+from nl2flow.plan.options import SearchOptions
+from nl2flow.plan.planners.astar import Astar
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.plan.schemas import PlannerConfig, PlannerResponse
+from tests.testing import BaseTestAgents
+from typing import Set, Tuple
+
+import pytest
+
+# LM-cut is not consistent on this task, and A* first closes the state with only (d) true after
+# begin_with_d (cost 22), before finding it again after begin and make_d (cost 21)
+INCONSISTENT_DOMAIN = """
+(define (domain inconsistent)
+    (:requirements :strips :negative-preconditions :action-costs)
+    (:predicates (start) (a) (b) (c) (d))
+    (:functions (total-cost) - number)
+    (:action begin :parameters () :precondition (start) :effect (and (not (start)) (increase (total-cost) 1)))
+    (:action begin_with_d :parameters () :precondition (start)
+        :effect (and (not (start)) (d) (increase (total-cost) 22)))
+    (:action make_a :parameters () :precondition (not (start)) :effect (and (a) (increase (total-cost) 50)))
+    (:action make_b :parameters () :precondition (and (not (start)) (d) (not (a)))
+        :effect (and (b) (increase (total-cost) 50)))
+    (:action make_c :parameters () :precondition (and (not (start)) (a)) :effect (and (c) (increase (total-cost) 10)))
+    (:action make_c_with_b :parameters () :precondition (and (not (start)) (a) (b))
+        :effect (and (a) (c) (increase (total-cost) 10)))
+    (:action make_d :parameters () :precondition (not (start)) :effect (and (d) (increase (total-cost) 20)))
+)
+"""
+
+INCONSISTENT_PROBLEM = """
+(define (problem inconsistent)
+    (:domain inconsistent)
+    (:init (start) (= (total-cost) 0))
+    (:goal (and (a) (b) (c)))
+    (:metric minimize (total-cost))
+)
+"""
+
+
+def get_plans(planner_response: PlannerResponse) -> Set[Tuple[str, ...]]:
+    return {tuple(sorted(str(step) for step in plan.plan)) for plan in planner_response.list_of_plans}
+
+
+class TestAstar(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+        self.astar = Astar()
+
+    def test_same_raw_plans(self) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+
+        reference = self.planner.raw_plan(pddl)
+        raw_planner_result = self.astar.raw_plan(pddl)
+
+        assert raw_planner_result is not None
+        assert raw_planner_result.list_of_plans == reference.list_of_plans
+
+    def test_top_plans(self) -> None:
+        for index in range(4):
+            error_finder = Operator(f"Error Finder {index}")
+            error_finder.add_output(SignatureItem(parameters=["list of errors"]))
+            self.flow.add(error_finder)
+
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(self.astar)
+
+        assert len(planner_response.list_of_plans) == len(reference.list_of_plans) == 4
+        assert get_plans(planner_response) == get_plans(reference)
+        assert planner_response.best_plan is not None and reference.best_plan is not None
+        assert planner_response.best_plan.cost == reference.best_plan.cost
+
+    @pytest.mark.parametrize("search", [SearchOptions.OPTIMAL, SearchOptions.SATISFICING, SearchOptions.TOPK])
+    def test_search_options(self, search: SearchOptions) -> None:
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(self.astar, planner_config=PlannerConfig(search=search))
+
+        assert planner_response.best_plan is not None and reference.best_plan is not None
+        assert planner_response.best_plan.cost >= reference.best_plan.cost
+
+        if search != SearchOptions.SATISFICING:
+            assert planner_response.best_plan.cost == reference.best_plan.cost
+
+    def test_no_solution(self) -> None:
+        self.flow.flow_definition.operators = [
+            o for o in self.flow.flow_definition.operators if o.name != "Find Errors"
+        ]
+        self.flow.add(SlotProperty(slot_name="list of errors", slot_desirability=0.0))
+
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(self.astar)
+
+        assert reference.is_no_solution
+        assert planner_response.is_no_solution
+        assert not planner_response.list_of_plans
+
+    def test_no_plan_needed(self) -> None:
+        self.flow.flow_definition.goal_items = list()
+
+        planner_response = self.flow.plan_it(self.astar)
+        assert planner_response.no_plan_needed
+
+    def test_fallback(self, mocker: MockerFixture) -> None:
+        reference = self.get_plan()
+        fallback_spy = mocker.spy(Kstar, "plan")
+
+        self.flow.plan_it(Astar(fallback=Kstar()))
+        assert fallback_spy.call_count == 0
+
+        planner_response = self.flow.plan_it(Astar(fallback=Kstar(), max_actions=1))
+        assert fallback_spy.call_count == 1
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+    @pytest.mark.parametrize("search", [SearchOptions.OPTIMAL, SearchOptions.TOPK])
+    def test_reopen_closed_states(self, search: SearchOptions) -> None:
+        pddl = PDDL(domain=INCONSISTENT_DOMAIN, problem=INCONSISTENT_PROBLEM)
+        config = PlannerConfig(search=search)
+
+        reference = self.planner.raw_plan(pddl, config)
+        raw_planner_result = self.astar.raw_plan(pddl, config)
+
+        assert raw_planner_result is not None
+        assert raw_planner_result.best_plan is not None and reference.best_plan is not None
+        assert raw_planner_result.best_plan.cost == reference.best_plan.cost == 131
+
+        if search == SearchOptions.TOPK:
+            assert sorted(plan.actions for plan in raw_planner_result.list_of_plans) == sorted(
+                plan.actions for plan in reference.list_of_plans
+            )
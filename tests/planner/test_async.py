@@ -0,0 +1,160 @@
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.options import NL2FlowOptions
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from nl2flow.plan.options import QUALITY_BOUND, NUM_PLANS
+from nl2flow.plan.planners import astar
+from nl2flow.plan.planners.astar import Astar
+from nl2flow.plan.planners.kstar import Kstar, get_planner_args
+from nl2flow.plan.planners.pool import PlannerPool
+from nl2flow.services.sketch import BasicSketchCompilation
+from tests.sketch.test_basic import load_assets
+from tests.testing import BaseTestAgents
+from kstar_planner import planners
+from pathlib import Path
+from typing import Any, List
+
+import asyncio
+import os
+import pytest
+import time
+
+
+def get_slow_flow() -> Flow:
+    catalog, sketch = load_assets(catalog_name="catalog", sketch_name="01-simple_sketch")
+    flow = BasicSketchCompilation(name=sketch.sketch_name).compile_to_flow(sketch, catalog)
+    flow.optimization_options.add(NL2FlowOptions.prune_irrelevant)
+    return flow
+
+
+def get_live_processes(process_group: int) -> List[int]:
+    live_processes = list()
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        try:
+            stat = Path(f"/proc/{entry}/stat").read_text()
+        except OSError:
+            continue
+
+        fields = stat[stat.rindex(")") + 2 :].split()
+        if fields[0] != "Z" and int(fields[2]) == process_group:
+            live_processes.append(int(entry))
+
+    return live_processes
+
+
+class TestAsyncPlanning(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    def test_same_plans(self) -> None:
+        reference = self.flow.plan_it(self.planner)
+        planner_response = asyncio.run(self.flow.plan_it_async(self.planner))
+
+        assert planner_response.list_of_plans, "There should be plans."
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+    def test_concurrent_plans(self) -> None:
+        pddl, transforms = self.flow.compile_to_pddl()
+
+        async def plan_all() -> List[Any]:
+            return list(
+                await asyncio.gather(
+                    *[self.planner.plan_async(pddl, flow=self.flow, transforms=transforms) for _ in range(3)]
+                )
+            )
+
+        results = asyncio.run(plan_all())
+        assert len({str(result.list_of_plans) for result in results}) == 1
+
+    def test_planner_args(self, mocker: Any) -> None:
+        run_planner = mocker.patch.object(planners, "run_planner", return_value=dict())
+        domain_file, problem_file = Path("domain.pddl"), Path("problem.pddl")
+
+        planners.plan_unordered_topq(
+            domain_file=domain_file,
+            problem_file=problem_file,
+            timeout=self.planner.timeout,
+            quality_bound=QUALITY_BOUND,
+            number_of_plans_bound=NUM_PLANS,
+        )
+
+        run_planner.assert_called_once_with(get_planner_args(domain_file, problem_file, self.planner.config))
+
+    @pytest.mark.skipif(not os.path.isdir("/proc"), reason="Needs procfs to inspect planner processes.")
+    def test_cancel_kills_planner(self, mocker: Any) -> None:
+        flow = get_slow_flow()
+        create_subprocess_exec = mocker.spy(asyncio, "create_subprocess_exec")
+
+        async def plan_and_cancel() -> int:
+            task = asyncio.create_task(flow.plan_it_async(Kstar()))
+            await asyncio.sleep(2)
+
+            assert not task.done(), "The planner should still be running."
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            process = create_subprocess_exec.spy_return
+            return int(process.pid)
+
+        process_group = asyncio.run(plan_and_cancel())
+
+        # killed processes outside the planner's direct child may take a moment to exit
+        for _ in range(50):
+            if not get_live_processes(process_group):
+                break
+
+            time.sleep(0.1)
+
+        assert get_live_processes(process_group) == []
+
+    def test_cancel_stops_astar(self, mocker: Any) -> None:
+        flow = get_slow_flow()
+        search = mocker.spy(astar, "search")
+
+        async def plan_and_cancel() -> None:
+            task = asyncio.create_task(flow.plan_it_async(Astar()))
+            await asyncio.sleep(2)
+
+            assert not task.done(), "The search should still be running."
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(plan_and_cancel())
+
+        # the search stops at its next expansion, on the executor thread
+        for _ in range(50):
+            if search.spy_return_list:
+                break
+
+            time.sleep(0.1)
+
+        assert search.spy_return_list == [None]
+
+    def test_cancel_pool_job(self) -> None:
+        flow = get_slow_flow()
+
+        with PlannerPool(num_workers=1) as pool:
+            pids = pool.pids
+
+            async def plan_and_cancel() -> None:
+                task = asyncio.create_task(flow.plan_it_async(pool))
+                await asyncio.sleep(2)
+
+                assert not task.done(), "The planner should still be running."
+                task.cancel()
+
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+            asyncio.run(plan_and_cancel())
+
+            assert pool.raw_plan(self.flow.compile_to_pddl()[0]).list_of_plans
+            assert pool.pids != pids
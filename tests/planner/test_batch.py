@@ -0,0 +1,76 @@
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from nl2flow.plan.batch import plan_many
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.plan.schemas import PlannerConfig
+from tests.planner.test_async import get_slow_flow
+from tests.testing import BaseTestAgents
+
+import multiprocessing
+import pickle
+import time
+
+
+class TestPlanMany(BaseTestAgents):
+    def get_flows(self) -> list[Flow]:
+        flows = list()
+
+        for goal in ["Fix Errors", "Find Errors", "Credit Score API"]:
+            BaseTestAgents.setup_method(self)
+            self.flow.add(GoalItems(goals=GoalItem(goal_name=goal)))
+            flows.append(self.flow)
+
+        return flows
+
+    def test_same_plans(self) -> None:
+        flows = self.get_flows()
+        results = dict(plan_many(flows, workers=2))
+
+        assert sorted(results.keys()) == list(range(len(flows)))
+
+        for index, flow in enumerate(flows):
+            assert results[index].list_of_plans, "There should be plans."
+            assert results[index].list_of_plans == flow.plan_it(self.planner).list_of_plans
+
+    def test_pickle_flow(self) -> None:
+        flow = self.get_flows()[0]
+        new_flow = pickle.loads(pickle.dumps(flow))
+
+        assert new_flow.flow_definition == flow.flow_definition
+        assert new_flow.compile_to_pddl()[0] == flow.compile_to_pddl()[0]
+
+    def test_item_timeout(self) -> None:
+        flows = [get_slow_flow()] + self.get_flows()
+        results = dict(plan_many(flows, workers=2, timeout=3))
+
+        assert sorted(results.keys()) == list(range(len(flows)))
+        assert results[0].is_timeout
+        assert all(results[index].list_of_plans for index in range(1, len(flows)))
+
+    def test_deadline(self) -> None:
+        flows = [get_slow_flow(), get_slow_flow()] + self.get_flows()
+
+        start_time = time.monotonic()
+        results = list(plan_many(flows, workers=1, deadline=2))
+
+        assert time.monotonic() - start_time < 10
+        assert sorted(index for index, _ in results) == list(range(len(flows)))
+        assert all(planner_response.is_timeout for _, planner_response in results)
+
+    def test_bounded_workers(self) -> None:
+        flows = self.get_flows() * 2
+        num_workers = list()
+
+        for _, planner_response in plan_many(flows, workers=2):
+            assert planner_response.list_of_plans, "There should be plans."
+            num_workers.append(len(multiprocessing.active_children()))
+
+        assert len(num_workers) == len(flows)
+        assert max(num_workers) <= 2
+
+    def test_planner_config(self) -> None:
+        flows = self.get_flows()[:1]
+        planner_config = PlannerConfig(num_plans=1)
+
+        results = dict(plan_many(flows, Kstar, planner_config))
+        assert len(results[0].list_of_plans) == 1
@@ -0,0 +1,79 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import GoalItem, GoalItems, SignatureItem, PDDL
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.planners.kstar import Kstar
+from tests.testing import BaseTestAgents
+
+import pytest
+import subprocess
+
+
+class TestIterPlans(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+
+        for index in range(4):
+            error_finder = Operator(f"Error Finder {index}")
+            error_finder.add_output(SignatureItem(parameters=["list of errors"]))
+            self.flow.add(error_finder)
+
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    def test_same_plans(self) -> None:
+        reference = self.flow.plan_it(self.planner)
+        plans = list(self.flow.iter_plans(self.planner))
+
+        assert len(plans) == len(reference.list_of_plans) > 1
+        assert plans[0].cost == reference.list_of_plans[0].cost
+        assert sorted(str(plan) for plan in plans) == sorted(str(plan) for plan in reference.list_of_plans)
+
+    def test_stop_early(self, mocker: MockerFixture) -> None:
+        popen_spy = mocker.spy(subprocess, "Popen")
+        plans = self.flow.iter_plans(self.planner)
+
+        best_plan = next(plans)
+        plans.close()
+
+        assert best_plan.cost == self.flow.plan_it(self.planner).list_of_plans[0].cost
+        assert popen_spy.spy_return.returncode is not None
+
+    def test_cached_plans(self, mocker: MockerFixture) -> None:
+        planner = Kstar()
+        planner.cache = PlannerCache()
+
+        reference = self.flow.plan_it(planner)
+        popen_spy = mocker.spy(subprocess, "Popen")
+
+        assert list(self.flow.iter_plans(planner)) == reference.list_of_plans
+        assert popen_spy.call_count == 0
+
+    def test_full_run_is_cached(self, mocker: MockerFixture) -> None:
+        planner = Kstar()
+        planner.cache = PlannerCache()
+
+        plans = list(self.flow.iter_plans(planner))
+        planner_spy = mocker.spy(Kstar, "run_planner")
+
+        assert self.flow.plan_it(planner).list_of_plans == plans
+        assert planner_spy.call_count == 0
+
+    def test_stopped_run_is_not_cached(self) -> None:
+        planner = Kstar()
+        planner.cache = PlannerCache()
+
+        plans = self.flow.iter_plans(planner)
+        next(plans)
+        plans.close()
+
+        assert len(planner.cache) == 0
+
+    def test_planner_error(self) -> None:
+        planner = Kstar()
+        planner.cache = PlannerCache()
+        pddl = PDDL(domain="(define (domain broken", problem="(define (problem broken) (:domain broken))")
+
+        with pytest.raises(RuntimeError, match="Planner exited with code"):
+            list(planner.iter_raw_plans(pddl))
+
+        assert len(planner.cache) == 0
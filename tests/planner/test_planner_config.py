@@ -0,0 +1,97 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import GoalItem, GoalItems, SignatureItem
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.options import SearchOptions, TIMEOUT
+from nl2flow.plan.planners.kstar import Kstar, get_planner_args
+from nl2flow.plan.planners.pool import PlannerPool
+from nl2flow.plan.schemas import PlannerConfig
+from tests.testing import BaseTestAgents
+from pathlib import Path
+
+import asyncio
+import pytest
+
+
+class TestPlannerConfig(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+
+        for index in range(4):
+            error_finder = Operator(f"Error Finder {index}")
+            error_finder.add_output(SignatureItem(parameters=["list of errors"]))
+            self.flow.add(error_finder)
+
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+        self.planner = Kstar()
+
+    def test_timeout_in_config(self) -> None:
+        assert self.planner.config.timeout == TIMEOUT
+
+        self.planner.timeout = 10
+        assert self.planner.config.timeout == 10
+
+    def test_per_call_config(self) -> None:
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(self.planner, planner_config=PlannerConfig(num_plans=2))
+
+        assert len(reference.list_of_plans) == 4
+        assert len(planner_response.list_of_plans) == 2
+        assert self.planner.config == PlannerConfig()
+
+    @pytest.mark.parametrize("search", [SearchOptions.OPTIMAL, SearchOptions.SATISFICING])
+    def test_single_plan(self, search: SearchOptions) -> None:
+        reference = self.get_plan()
+        self.planner.config = PlannerConfig(search=search)
+
+        planner_response = self.get_plan()
+        assert len(planner_response.list_of_plans) == 1
+        assert planner_response.list_of_plans[0].cost >= reference.list_of_plans[0].cost
+
+        if search == SearchOptions.OPTIMAL:
+            assert planner_response.list_of_plans[0].cost == reference.list_of_plans[0].cost
+
+    @pytest.mark.parametrize(
+        "search, expected_search", [(SearchOptions.OPTIMAL, "astar("), (SearchOptions.SATISFICING, "lazy_greedy(")]
+    )
+    def test_single_plan_search(self, search: SearchOptions, expected_search: str) -> None:
+        planner_args = get_planner_args(Path("domain.pddl"), Path("problem.pddl"), PlannerConfig(search=search))
+
+        assert planner_args[planner_args.index("--search") + 1].startswith(expected_search)
+        assert "--symmetries" not in planner_args
+
+    @pytest.mark.parametrize("search", [SearchOptions.OPTIMAL, SearchOptions.SATISFICING])
+    def test_single_plan_everywhere(self, search: SearchOptions) -> None:
+        planner_config = PlannerConfig(search=search)
+        reference = self.flow.plan_it(self.planner, planner_config=planner_config)
+
+        assert len(reference.list_of_plans) == 1
+        assert all(str(step) != "__extra_goal_operator" for step in reference.list_of_plans[0].plan)
+
+        planner_response = asyncio.run(self.flow.plan_it_async(self.planner, planner_config=planner_config))
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+        list_of_plans = list(self.flow.iter_plans(self.planner, planner_config=planner_config))
+        assert list_of_plans == reference.list_of_plans
+
+        with PlannerPool(num_workers=1) as pool:
+            planner_response = self.flow.plan_it(pool, planner_config=planner_config)
+            assert planner_response.list_of_plans == reference.list_of_plans
+
+    @pytest.mark.parametrize("search", [SearchOptions.TOPQ, SearchOptions.TOPK])
+    def test_ordered_search(self, search: SearchOptions) -> None:
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(self.planner, planner_config=PlannerConfig(search=search))
+
+        assert len(planner_response.list_of_plans) >= len(reference.list_of_plans)
+        assert planner_response.list_of_plans[0].cost == reference.list_of_plans[0].cost
+
+    def test_config_in_cache_key(self, mocker: MockerFixture) -> None:
+        self.planner.cache = PlannerCache()
+        planner_spy = mocker.spy(Kstar, "run_planner")
+
+        self.get_plan()
+        self.flow.plan_it(self.planner, planner_config=PlannerConfig(search=SearchOptions.OPTIMAL))
+        self.get_plan()
+
+        assert planner_spy.call_count == 2
@@ -0,0 +1,83 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import GoalItem, GoalItems, SignatureItem
+from nl2flow.plan.options import PlannerIOOptions
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.plan.schemas import PlannerResponse
+from nl2flow.utility.file_utility import ram_directory, supports_memfd
+from tests.testing import BaseTestAgents
+from typing import List
+
+import asyncio
+import pytest
+import tempfile
+
+
+class TestPlannerIO(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    @pytest.mark.parametrize("io_mode", list(PlannerIOOptions))
+    def test_same_plans(self, io_mode: PlannerIOOptions) -> None:
+        reference = self.flow.plan_it(self.planner)
+        planner = Kstar(io_mode=io_mode)
+
+        planner_response = self.flow.plan_it(planner)
+        assert planner_response.list_of_plans, "There should be plans."
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+        planner_response = asyncio.run(self.flow.plan_it_async(planner))
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+    @pytest.mark.parametrize("io_mode", list(PlannerIOOptions))
+    def test_concurrent_async_plans(self, io_mode: PlannerIOOptions) -> None:
+        flows = [self.flow]
+
+        for index in range(2):
+            flow = Flow(name=f"Agent {index}")
+            agent = Operator(f"agent{index}")
+            agent.add_input(SignatureItem(parameters=[f"item{index}"]))
+
+            flow.add([agent, GoalItems(goals=GoalItem(goal_name=f"agent{index}"))])
+            flows.append(flow)
+
+        references = [flow.plan_it(self.planner) for flow in flows]
+        planner = Kstar(io_mode=io_mode)
+
+        async def plan_all() -> List[PlannerResponse]:
+            return list(await asyncio.gather(*[flow.plan_it_async(planner) for flow in flows]))
+
+        for planner_response, reference in zip(asyncio.run(plan_all()), references):
+            assert planner_response.list_of_plans, "There should be plans."
+            assert planner_response.list_of_plans == reference.list_of_plans
+
+    @pytest.mark.skipif(not supports_memfd(), reason="Needs memfd_create and procfs.")
+    def test_memfd(self, mocker: MockerFixture) -> None:
+        temp_file_spy = mocker.spy(tempfile, "NamedTemporaryFile")
+        planner_response = self.flow.plan_it(Kstar(io_mode=PlannerIOOptions.MEMFD))
+
+        assert planner_response.list_of_plans, "There should be plans."
+        assert all(call.kwargs.get("suffix") == ".json" for call in temp_file_spy.call_args_list)
+
+    @pytest.mark.skipif(ram_directory() is None, reason="Needs a RAM-backed directory.")
+    def test_ram_directory_is_reused(self) -> None:
+        planner = Kstar(io_mode=PlannerIOOptions.RAM)
+
+        self.flow.plan_it(planner)
+        scratch_dir = planner.scratch_dir
+        self.flow.plan_it(planner)
+
+        assert scratch_dir is not None and scratch_dir.startswith(str(ram_directory()))
+        assert planner.scratch_dir == scratch_dir
+
+    def test_fallback(self, mocker: MockerFixture) -> None:
+        mocker.patch("nl2flow.plan.planners.kstar.ram_directory", return_value=None)
+        mocker.patch("nl2flow.plan.planners.kstar.supports_memfd", return_value=False)
+
+        for io_mode in [PlannerIOOptions.MEMFD, PlannerIOOptions.RAM]:
+            planner = Kstar(io_mode=io_mode)
+
+            assert self.flow.plan_it(planner).list_of_plans, "There should be plans."
+            assert planner.scratch_dir is None
@@ -0,0 +1,82 @@
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from nl2flow.plan.cache import PlannerCache
+from nl2flow.plan.options import SearchOptions
+from nl2flow.plan.planner import get_planner_metrics
+from nl2flow.plan.planners.astar import Astar
+from nl2flow.plan.planners.kstar import Kstar
+from nl2flow.plan.planners.portfolio import PortfolioPlanner
+from nl2flow.plan.schemas import PlannerConfig, PlannerMetrics
+from tests.testing import BaseTestAgents
+from typing import List
+
+
+class TestPlannerMetrics(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+        self.planner = Kstar()
+        self.reported: List[PlannerMetrics] = list()
+
+    def test_metrics_in_response(self) -> None:
+        planner_response = self.get_plan()
+        metrics = planner_response.metrics
+
+        assert metrics is not None
+        assert metrics.num_plans == len(planner_response.list_of_plans) > 0
+        assert metrics.translator_time is not None and metrics.search_time is not None
+        assert metrics.translator_operators is not None and metrics.translator_operators > 0
+        assert metrics.translator_task_size is not None and metrics.translator_task_size > 0
+        assert metrics.expansions is not None and metrics.expansions > 0
+        assert metrics.evaluations is not None and metrics.evaluations > 0
+        assert metrics.generated is not None and metrics.generated > 0
+        assert metrics.peak_memory is not None and metrics.peak_memory > 0
+        assert metrics.is_quality_bound_hit is True
+
+    def test_metrics_of_single_plan_search(self) -> None:
+        planner_response = self.flow.plan_it(self.planner, planner_config=PlannerConfig(search=SearchOptions.OPTIMAL))
+        metrics = planner_response.metrics
+
+        assert metrics is not None
+        assert metrics.num_plans == 1
+        assert metrics.expansions is not None
+        assert metrics.is_quality_bound_hit is None
+
+    def test_metrics_callback(self) -> None:
+        self.planner.cache = PlannerCache()
+        self.planner.metrics_callback = self.reported.append
+
+        planner_response = self.get_plan()
+        assert self.reported == [planner_response.metrics]
+
+        self.get_plan()
+        assert len(self.reported) == 1, "Cached results are not reported again."
+
+    def test_metrics_callback_on_iter_plans(self) -> None:
+        self.planner.metrics_callback = self.reported.append
+
+        list_of_plans = list(self.flow.iter_plans(self.planner))
+
+        assert len(self.reported) == 1
+        assert self.reported[0].num_plans == len(list_of_plans)
+
+    def test_metrics_callback_on_portfolio(self) -> None:
+        portfolio = PortfolioPlanner(configs=[PlannerConfig()], backend=self.planner)
+        portfolio.metrics_callback = self.reported.append
+
+        self.flow.plan_it(portfolio)
+
+        assert self.planner.metrics_callback == portfolio.metrics_callback
+        assert len(self.reported) == 1
+
+    def test_astar_metrics(self) -> None:
+        astar = Astar()
+        astar.metrics_callback = self.reported.append
+
+        planner_response = self.flow.plan_it(astar)
+
+        assert self.reported == [planner_response.metrics]
+        assert self.reported[0].expansions is not None and self.reported[0].expansions > 0
+        assert self.reported[0].num_plans == len(planner_response.list_of_plans)
+
+    def test_no_output(self) -> None:
+        assert get_planner_metrics("", 0) == PlannerMetrics()
@@ -0,0 +1,70 @@
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from nl2flow.plan.planners.pool import PlannerPool
+from tests.testing import BaseTestAgents
+
+import os
+import signal
+
+
+class TestPlannerPool(BaseTestAgents):
+    pool = PlannerPool(num_workers=2, max_jobs_per_worker=3)
+
+    @classmethod
+    def setup_class(cls) -> None:
+        cls.pool.start()
+
+    @classmethod
+    def teardown_class(cls) -> None:
+        cls.pool.shutdown()
+
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    def test_same_plans(self) -> None:
+        reference = self.flow.plan_it(self.planner)
+        planner_response = self.flow.plan_it(self.pool)
+
+        assert planner_response.list_of_plans, "There should be plans."
+        assert planner_response.list_of_plans == reference.list_of_plans
+
+    def test_concurrent_jobs(self) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+        results = [future.result() for future in [self.pool.submit(pddl) for _ in range(4)]]
+
+        assert all(result.list_of_plans for result in results)
+        assert len({str(result.list_of_plans) for result in results}) == 1
+
+    def test_recycle_workers(self) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+        pids = set(self.pool.pids)
+
+        for _ in range(2 * self.pool.max_jobs_per_worker):
+            assert self.pool.raw_plan(pddl).list_of_plans
+
+        assert pids.isdisjoint(self.pool.pids)
+
+    def test_recover_from_crash(self) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+
+        for pid in self.pool.pids:
+            assert pid is not None
+            os.kill(pid, signal.SIGKILL)
+
+        results = [self.pool.raw_plan(pddl) for _ in range(2 * self.pool.num_workers)]
+
+        assert any(result.error_running_planner for result in results)
+        assert results[-1].list_of_plans, "There should be plans once workers are replaced."
+
+    def test_job_timeout(self) -> None:
+        pddl, _ = self.flow.compile_to_pddl()
+
+        with PlannerPool(num_workers=1, job_timeout=0.01) as pool:
+            result = pool.raw_plan(pddl)
+            assert result.is_timeout
+
+            pids = pool.pids
+            pool.job_timeout = None
+
+            assert pool.raw_plan(pddl).list_of_plans
+            assert pool.pids == pids
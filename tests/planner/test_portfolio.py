@@ -0,0 +1,103 @@
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from nl2flow.plan.options import PortfolioPolicy, SearchOptions
+from nl2flow.plan.planners.portfolio import PortfolioPlanner
+from nl2flow.plan.schemas import PlannerConfig, PlannerResponse
+from tests.planner.test_async import get_slow_flow
+from tests.testing import BaseTestAgents
+from pathlib import Path
+from typing import List
+
+import asyncio
+import os
+import time
+
+
+def get_planner_processes() -> List[int]:
+    planner_processes = list()
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        try:
+            cmdline = Path(f"/proc/{entry}/cmdline").read_bytes()
+            stat = Path(f"/proc/{entry}/stat").read_text()
+        except OSError:
+            continue
+
+        if b"kstar_planner" in cmdline and stat[stat.rindex(")") + 2] != "Z":
+            planner_processes.append(int(entry))
+
+    return planner_processes
+
+
+class TestPortfolioPlanner(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    def test_default_configs(self) -> None:
+        portfolio = PortfolioPlanner()
+        searches = [config.search for config in portfolio.get_configs()]
+
+        assert searches == [SearchOptions.TOPQ_UNORDERED, SearchOptions.OPTIMAL, SearchOptions.SATISFICING]
+
+    def test_same_best_cost(self) -> None:
+        reference = self.get_plan()
+        planner_response = self.flow.plan_it(PortfolioPlanner())
+
+        assert planner_response.best_plan is not None
+        assert reference.best_plan is not None
+        assert planner_response.best_plan.cost >= reference.best_plan.cost
+
+    def test_prefer_optimal(self) -> None:
+        reference = self.get_plan()
+        portfolio = PortfolioPlanner(
+            configs=[PlannerConfig(search=SearchOptions.SATISFICING), PlannerConfig(search=SearchOptions.OPTIMAL)],
+            policy=PortfolioPolicy.PREFER_OPTIMAL,
+        )
+
+        planner_response = self.flow.plan_it(portfolio)
+        assert planner_response.best_plan is not None
+        assert reference.best_plan is not None
+        assert planner_response.best_plan.cost == reference.best_plan.cost
+
+    def test_fallback(self) -> None:
+        portfolio = PortfolioPlanner(
+            configs=[PlannerConfig(search=SearchOptions.SATISFICING)],
+            policy=PortfolioPolicy.PREFER_OPTIMAL,
+        )
+
+        planner_response = self.flow.plan_it(portfolio)
+        assert len(planner_response.list_of_plans) == 1
+
+    def test_inside_event_loop(self) -> None:
+        reference = self.get_plan()
+
+        async def plan_in_loop() -> PlannerResponse:
+            return self.flow.plan_it(PortfolioPlanner())
+
+        planner_response = asyncio.run(plan_in_loop())
+        assert planner_response.best_plan is not None
+        assert reference.best_plan is not None
+        assert planner_response.best_plan.cost >= reference.best_plan.cost
+
+    def test_losers_are_killed(self) -> None:
+        flow = get_slow_flow()
+        portfolio = PortfolioPlanner()
+        portfolio.timeout = 60
+
+        existing_processes = set(get_planner_processes())
+        start_time = time.monotonic()
+        planner_response = flow.plan_it(portfolio)
+
+        assert time.monotonic() - start_time < 30
+        assert len(planner_response.list_of_plans) == 1
+
+        for _ in range(50):
+            if not set(get_planner_processes()) - existing_processes:
+                break
+
+            time.sleep(0.1)
+
+        assert not set(get_planner_processes()) - existing_processes
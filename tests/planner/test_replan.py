@@ -0,0 +1,78 @@
+from pytest_mock import MockerFixture
+from nl2flow.compile.options import MemoryState
+from nl2flow.compile.schemas import GoalItem, GoalItems, MemoryItem, Step
+from nl2flow.plan.grounding import PlanSimulator
+from nl2flow.plan.planners.kstar import Kstar
+from tests.testing import BaseTestAgents
+
+
+class TestReplan(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(
+            [
+                GoalItems(goals=GoalItem(goal_name="Fix Errors")),
+                MemoryItem(item_id="database link", item_state=MemoryState.KNOWN),
+            ]
+        )
+
+    def execute_first_step(self) -> None:
+        self.flow.add(
+            [
+                MemoryItem(item_id="list of errors", item_state=MemoryState.KNOWN),
+                Step(name="Find Errors", parameters=["database link"]),
+            ]
+        )
+
+    def test_simulate_plan(self) -> None:
+        planner_response = self.get_plan()
+        assert planner_response.best_plan is not None
+
+        simulator = PlanSimulator(planner_response.pddl.domain, planner_response.pddl.problem)
+        simulation = simulator.simulate(planner_response.best_plan.reference)
+
+        assert simulation.reaches_goal
+        assert simulation.cost == planner_response.best_plan.cost
+
+        simulation = simulator.simulate(planner_response.best_plan.reference[1:])
+        assert not simulation.is_executable
+        assert simulation.error is not None and simulation.error.startswith("Step 1")
+
+    def test_reuse_suffix(self, mocker: MockerFixture) -> None:
+        previous = self.get_plan()
+        self.execute_first_step()
+
+        spy = mocker.spy(Kstar, "run_planner")
+        planner_response = self.flow.replan_it(self.planner, previous)
+
+        assert spy.call_count == 0
+        assert planner_response.best_plan is not None
+        assert previous.best_plan is not None
+
+        reference = self.get_plan()
+        assert reference.best_plan is not None
+
+        assert planner_response.best_plan.reference == previous.best_plan.reference[2:]
+        assert planner_response.best_plan.reference == reference.best_plan.reference
+        assert planner_response.best_plan.plan == reference.best_plan.plan
+        assert planner_response.best_plan.cost == reference.best_plan.cost
+
+    def test_broken_suffix(self, mocker: MockerFixture) -> None:
+        previous = self.get_plan()
+        assert previous.best_plan is not None
+
+        self.flow.flow_definition.memory_items = []
+
+        spy = mocker.spy(Kstar, "run_planner")
+        planner_response = self.flow.replan_it(self.planner, previous)
+
+        assert spy.call_count == 1
+        assert planner_response.best_plan is not None
+        assert planner_response.best_plan.cost > previous.best_plan.cost
+
+    def test_no_previous_plan(self, mocker: MockerFixture) -> None:
+        spy = mocker.spy(Kstar, "run_planner")
+        planner_response = self.flow.replan_it(self.planner, previous=None)
+
+        assert spy.call_count == 1
+        assert planner_response.list_of_plans
@@ -1,7 +1,15 @@
 import pytest
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import GoalItem, GoalItems, SignatureItem
+from nl2flow.plan.planners.kstar import Kstar
 from profiler.validators.validator_executer import (
     execute_Val,
+    read_pddl_plan,
+    validate_compiled_plans,
     validate_pddl,
+    validate_plans,
+    validate_samples,
     domain_file_name,
     problem_file_name,
     plan_file_name,
@@ -9,6 +17,14 @@ from profiler.validators.validator_executer import (
 
 
 class TestValidatorExecutor:
+    def setup_method(self) -> None:
+        with open(f"./tests/profiler/data/pddl/{domain_file_name}", "r") as f:
+            self.pddl_domain = f.read()
+        with open(f"./tests/profiler/data/pddl/{problem_file_name}", "r") as f:
+            self.pddl_problem = f.read()
+        with open(f"./tests/profiler/data/pddl/{plan_file_name}", "r") as f:
+            self.pddl_plan = f.read()
+
     @pytest.mark.skip("file not found")
     def test_execute_Val(self) -> None:
         pddl_domain = ""
@@ -26,7 +42,6 @@ class TestValidatorExecutor:
         assert len(err) == 0
         assert return_code is not None
 
-    @pytest.mark.skip("file not found")
     def test_validate_pddl(self) -> None:
         pddl_domain = ""
         pddl_problem = ""
@@ -42,3 +57,58 @@ class TestValidatorExecutor:
         assert validator_output.is_executable_plan
         assert validator_output.is_valid_plan
         assert validator_output.total_cost == 7
+
+    def test_read_pddl_plan(self) -> None:
+        assert read_pddl_plan(self.pddl_plan) == ["a", "data-mapper job_id occupation_id", "b"]
+        assert read_pddl_plan("; comment\n0.000: (a job_id) [1]\n; cost = 1 (unit cost)") == ["a job_id"]
+
+    def test_validate_plans(self) -> None:
+        validator_outputs = validate_plans(
+            self.pddl_domain,
+            self.pddl_problem,
+            [self.pddl_plan, "(a )\n(b )", "(a )", "(c )"],
+        )
+
+        assert [
+            (output.is_executable_plan, output.is_valid_plan, output.total_cost) for output in validator_outputs
+        ] == [
+            (True, True, 7),
+            (False, False, -1),
+            (True, False, -1),
+            (False, False, -1),
+        ]
+
+    def test_validate_samples(self) -> None:
+        other_problem = self.pddl_problem.replace("(has_done b)", "(has_done a)")
+        validator_outputs = validate_samples(
+            self.pddl_domain,
+            [(self.pddl_problem, self.pddl_plan), (other_problem, "(a )"), ("(define", "(a )")],
+        )
+
+        assert [output.total_cost for output in validator_outputs] == [7, 1, -1]
+        assert not validator_outputs[2].is_executable_plan
+
+    def test_validate_compiled_plans(self) -> None:
+        flow = Flow(name="Validator Test")
+
+        find_errors_api = Operator("Find Errors")
+        find_errors_api.add_input(SignatureItem(parameters=["database link"]))
+        find_errors_api.add_output(SignatureItem(parameters=["list of errors"]))
+
+        fix_errors_api = Operator("Fix Errors")
+        fix_errors_api.add_input(SignatureItem(parameters=["list of errors"]))
+
+        flow.add([find_errors_api, fix_errors_api, GoalItems(goals=GoalItem(goal_name="Fix Errors"))])
+
+        pddl, _ = flow.compile_to_pddl()
+        planner_response = flow.plan_it(Kstar())
+        pddl_plans = ["\n".join(f"({action})" for action in plan.reference) for plan in planner_response.list_of_plans]
+
+        assert pddl_plans
+        for compilation in [pddl, flow.compilation]:
+            validator_outputs = validate_compiled_plans(compilation, pddl_plans)
+
+            assert all(output.is_valid_plan for output in validator_outputs)
+            assert [output.total_cost for output in validator_outputs] == [
+                plan.cost for plan in planner_response.list_of_plans
+            ]
@@ -0,0 +1,72 @@
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import SignatureItem, Parameter, MappingItem
+from nl2flow.compile.options import TypeOptions
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.ir import FlowIR
+
+import pytest
+
+
+class TestCompileIR:
+    def setup_method(self) -> None:
+        operator_a = Operator("A")
+
+        operator_a.add_input(SignatureItem(parameters="a1"))
+        operator_a.add_input(SignatureItem(parameters=["a2", Parameter(item_id="a3", required=False)]))
+        operator_a.add_output(SignatureItem(parameters=[Parameter(item_id="ao1"), "ao2"]))
+
+        operator_b = Operator("B")
+
+        operator_b.add_input(SignatureItem(parameters=[Parameter(item_id="b1", item_type="type_B"), "a1"]))
+        operator_b.add_output(SignatureItem(parameters="ao2"))
+
+        self.flow = Flow(name="IR Test")
+        self.flow.add([operator_a, operator_b, MappingItem(source_name="ao1", target_name="b1")])
+        self.flow.compile_to_pddl()
+
+        self.ir: FlowIR = self.flow.compilation.ir
+
+    def test_interned_operators(self) -> None:
+        assert [self.ir.name(operator.name) for operator in self.ir.operators] == ["a", "b"]
+
+        operator_a = self.ir.get_operator("a")
+        assert operator_a is not None and operator_a.index == 0
+        assert self.ir.get_slots(operator_a) == ["a1", "a2", "a3"]
+        assert [self.ir.name(item) for item in operator_a.produces] == ["ao1", "ao2"]
+        assert self.ir.get_operator("c") is None
+
+    def test_parameters(self) -> None:
+        operator_b = self.ir.get_operator("b")
+        assert operator_b is not None
+
+        typed, untyped = operator_b.inputs[0].parameters
+        assert typed.item_type is not None and self.ir.name(typed.item_type) == "type_b"
+        assert untyped.item_type is None and untyped.required
+
+        operator_a = self.ir.get_operator("a")
+        assert operator_a is not None
+
+        optional = operator_a.inputs[1].parameters[1]
+        assert optional.item_type is not None and self.ir.name(optional.item_type) == TypeOptions.ROOT.value
+        assert not optional.required
+
+    def test_adjacency(self) -> None:
+        assert self.ir.get_consumers("a1") == ["a", "b"]
+        assert self.ir.get_consumers("b1") == ["b"]
+        assert self.ir.get_producers("ao2") == ["a", "b"]
+        assert self.ir.get_producers("a1") == []
+        assert self.ir.get_producers("unknown") == []
+
+        mapping = self.ir.mappings[0]
+        assert (self.ir.name(mapping.source), self.ir.name(mapping.target)) == ("ao1", "b1")
+        assert self.ir.get_items() == ["a1", "a2", "a3", "ao1", "ao2", "b1"]
+
+    def test_frozen(self) -> None:
+        operator_a = self.ir.get_operator("a")
+        assert operator_a is not None
+
+        with pytest.raises(AttributeError):
+            operator_a.cost = 10  # type: ignore
+
+        with pytest.raises(AttributeError):
+            self.ir.extra = None  # type: ignore
@@ -0,0 +1,76 @@
+from nl2flow.compile.cache import CompilationCache
+from nl2flow.compile.options import CompileOptions, SlotOptions
+from nl2flow.compile.schemas import GoalItem, GoalItems
+from tests.testing import BaseTestAgents
+
+import json
+import pytest
+
+
+class TestCompileReport(BaseTestAgents):
+    def setup_method(self) -> None:
+        BaseTestAgents.setup_method(self)
+        self.flow.add(GoalItems(goals=GoalItem(goal_name="Fix Errors")))
+
+    @pytest.mark.parametrize("compilation_type", [CompileOptions.CLASSICAL, CompileOptions.DIRECT])
+    def test_same_pddl(self, compilation_type: CompileOptions) -> None:
+        reference, _ = self.flow.compile_to_pddl(compilation_type=compilation_type)
+        pddl, _, report = self.flow.compile_with_report(compilation_type=compilation_type)
+
+        assert pddl == reference
+        assert report.phases[0].name == "compile"
+        assert self.flow.compilation.profiler is not None
+
+    def test_phases(self) -> None:
+        pddl, _, report = self.flow.compile_with_report()
+        top_phase = report.phases[0]
+
+        assert [phase.path for phase in report.phases if len(phase.path) == 2] == [
+            ["compile", "compile_domain"],
+            ["compile", "compile_problem"],
+        ]
+
+        compile_operators = report.get_phase("compile_operators")
+        assert compile_operators is not None
+        assert compile_operators.path == ["compile", "compile_domain", "compile_operators"]
+        assert compile_operators.num_actions == len(self.flow.flow_definition.operators) * 2
+
+        print_domain = report.get_phase("print_domain")
+        print_problem = report.get_phase("print_problem")
+        assert print_domain is not None and print_domain.output_size == len(pddl.domain)
+        assert print_problem is not None and print_problem.output_size == len(pddl.problem)
+
+        _, _, _, num_actions = self.flow.compilation.get_domain_size()
+        assert top_phase.num_actions == num_actions
+        assert top_phase.num_init_facts == self.flow.compilation.count_init_facts()
+
+        assert report.total_time == top_phase.duration
+        assert sum(phase.self_duration for phase in report.phases) == pytest.approx(top_phase.duration)
+
+    def test_optional_passes(self) -> None:
+        self.flow.slot_options.add(SlotOptions.last_resort)
+        _, _, report = self.flow.compile_with_report()
+
+        last_resort = report.get_phase("compile_last_resort_slots")
+        assert last_resort is not None and last_resort.num_actions > 0
+        assert report.get_phase("compile_all_together") is None
+
+    def test_bypasses_cache(self) -> None:
+        self.flow.cache = CompilationCache()
+        self.flow.compile_to_pddl()
+
+        _, _, report = self.flow.compile_with_report()
+        assert report.get_phase("compile_domain") is not None
+
+    def test_exports(self) -> None:
+        _, _, report = self.flow.compile_with_report()
+
+        trace = json.loads(json.dumps(report.to_trace_events()))
+        assert len(trace["traceEvents"]) == len(report.phases)
+        assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"])
+        assert trace["traceEvents"][0]["args"]["num_actions"] == report.phases[0].num_actions
+
+        folded_stacks = report.to_folded_stacks().splitlines()
+        assert len(folded_stacks) == len(report.phases)
+        assert "compile;compile_domain;compile_operators" in [line.rsplit(" ", 1)[0] for line in folded_stacks]
+        assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in folded_stacks)
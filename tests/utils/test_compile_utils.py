@@ -5,9 +5,7 @@ from nl2flow.compile.flow import Flow
 
 from nl2flow.compile.basic_compilations.utils import (
     unpack_list_of_signature_items,
-    get_item_source_map,
     get_agent_to_slot_map,
-    get_item_requirement_map,
     get_type_of_constant,
     is_this_a_datum_type,
     is_this_a_datum,
@@ -55,21 +53,21 @@ class TestCompileUtils:
         outputs_b = operator_b.outputs if isinstance(operator_b.outputs, Outcome) else operator_b.outputs[0]
         assert unpack_list_of_signature_items(outputs_b.outcomes) == ["ao2"]
 
-    def test_get_item_source_map(self) -> None:
-        item_source_map = get_item_source_map(self.flow.compilation)
-        assert item_source_map["ao1"] == {"a"}
-        assert item_source_map["ao2"] == {"a", "b"}
+    def test_get_item_sources(self) -> None:
+        graph = self.flow.compilation.graph
+        assert set(graph.get_sources("ao1")) == {"a"}
+        assert set(graph.get_sources("ao2")) == {"a", "b"}
 
     def test_get_agent_to_slot_map(self) -> None:
         agent_to_slot_map = get_agent_to_slot_map(self.flow.compilation)
         assert agent_to_slot_map["a"] == ["a1", "a2", "a3", "a4", "a5", "a6"]
         assert agent_to_slot_map["b"] == ["b1", "a1", "b2"]
 
-    def test_get_item_requirement_map(self) -> None:
-        item_requirement_map = get_item_requirement_map(self.flow.compilation)
-        assert item_requirement_map["a1"] == {"a", "b"}
-        assert item_requirement_map["a2"] == {"a"}
-        assert item_requirement_map["b1"] == {"b"}
+    def test_get_item_consumers(self) -> None:
+        graph = self.flow.compilation.graph
+        assert set(graph.get_consumers("a1")) == {"a", "b"}
+        assert set(graph.get_consumers("a2")) == {"a"}
+        assert set(graph.get_consumers("b1")) == {"b"}
 
     def test_get_type_of_constant(self) -> None:
         assert get_type_of_constant(self.flow.compilation, constant="a1") == TypeOptions.ROOT.value
@@ -91,3 +89,14 @@ class TestCompileUtils:
             "new_object_type_b_0",
             "new_object_type_b_1",
         ]
+
+    def test_symbol_table(self) -> None:
+        symbols = self.flow.compilation.symbols
+
+        assert symbols.get_constants_of_type("type_b") == ["b1", "new_object_type_b_0"]
+        assert "type_b" in symbols.get_children_of_type(TypeOptions.ROOT.value)
+        assert symbols.get_operator("a") is not None
+        assert symbols.get_operator("c") is None
+
+        with pytest.raises(ValueError):
+            symbols.get_type_of_constant("c")
@@ -0,0 +1,57 @@
+from nl2flow.compile.operators import ClassicalOperator as Operator
+from nl2flow.compile.schemas import Constraint, SignatureItem, MappingItem
+from nl2flow.compile.flow import Flow
+from nl2flow.compile.graph import DependencyGraph
+from nl2flow.compile.basic_compilations.compile_goals import get_orphaned_items
+from nl2flow.compile.options import BasicOperations, SlotOptions, PARAMETER_DELIMITER
+
+
+class TestDependencyGraph:
+    def setup_method(self) -> None:
+        operator_a = Operator("A")
+        operator_a.add_input(SignatureItem(parameters=["x"]))
+        operator_a.add_output(SignatureItem(parameters=["y"]))
+
+        operator_b = Operator("B")
+        operator_b.add_input(SignatureItem(parameters=["z"], constraints=[Constraint(constraint="$z > 0")]))
+        operator_b.add_output(SignatureItem(parameters=["w"]))
+
+        operator_c = Operator("C")
+        operator_c.add_input(SignatureItem(parameters=["w", "x"]))
+        operator_c.add_output(SignatureItem(parameters=["y"]))
+
+        self.flow = Flow(name="Graph Test")
+        self.flow.add([operator_a, operator_b, operator_c, MappingItem(source_name="y", target_name="z")])
+        self.graph = DependencyGraph.from_flow_definition(self.flow.flow_definition)
+
+    def test_sources(self) -> None:
+        assert self.graph.get_producers("y") == ["A", "C"]
+        assert self.graph.get_producers("z") == []
+        assert self.graph.get_sources("z") == ["A", "C"]
+        assert self.graph.get_sources("x") == []
+        assert self.graph.get_sources("unknown") == []
+
+    def test_consumers(self) -> None:
+        assert self.graph.get_consumers("x") == ["A", "C"]
+        assert self.graph.get_consumers("y") == []
+        assert self.graph.get_constraint_consumers("$z > 0") == ["B"]
+        assert self.graph.get_constraint_consumers("$x > 0") == []
+
+    def test_transitive_producers(self) -> None:
+        assert self.graph.get_transitive_producers("y") == ["A", "C", "B"]
+        assert self.graph.get_transitive_producers("w") == ["B", "A", "C"]
+        assert self.graph.get_transitive_producers("x") == []
+
+    def test_orphaned_items(self) -> None:
+        self.flow.compile_to_pddl()
+        assert get_orphaned_items(self.flow.compilation, ["x", "w", "v"]) == ["v"]
+
+    def test_last_resort_slots(self) -> None:
+        self.flow.slot_options = {SlotOptions.last_resort, SlotOptions.ordered, SlotOptions.relaxed}
+        pddl, _ = self.flow.compile_to_pddl()
+
+        slot_filler = f"{BasicOperations.SLOT_FILLER.value}--last-resort--for-b{PARAMETER_DELIMITER}z"
+        action = pddl.domain.split(f"(:action {slot_filler}")[1].split("(:action")[0]
+
+        assert "(has_done a past)" in action
+        assert "(has_done c past)" in action
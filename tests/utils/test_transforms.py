@@ -0,0 +1,61 @@
+from nl2flow.compile.utils import (
+    Transform,
+    TransformRegistry,
+    string_transform,
+    revert_string_transform,
+    revert_string_transforms,
+)
+
+import copy
+import json
+import pickle
+
+
+class TestTransformRegistry:
+    def setup_method(self) -> None:
+        self.registry = TransformRegistry()
+
+        for item in ["Credit Score API", 'list "of", errors', "already_clean", "Credit Score API"]:
+            string_transform(item, self.registry)
+
+    def test_same_transforms_as_list(self) -> None:
+        reference = list()
+
+        for item in ["Credit Score API", 'list "of", errors', "already_clean", "Credit Score API"]:
+            string_transform(item, reference)
+
+        assert self.registry == reference
+        assert self.registry == [
+            Transform(source="Credit Score API", target="credit_score_api"),
+            Transform(source='list "of", errors', target="list__of___errors"),
+        ]
+
+    def test_revert(self) -> None:
+        assert revert_string_transform("credit_score_api", self.registry) == "Credit Score API"
+        assert revert_string_transform("already_clean", self.registry) == "already_clean"
+        assert revert_string_transforms(["list__of___errors"], self.registry) == ['list "of", errors']
+
+    def test_collisions_are_not_registered(self) -> None:
+        assert string_transform("credit score API", self.registry) == "credit_score_api"
+        assert len(self.registry.get_sources("credit_score_api")) == 1
+        assert revert_string_transform("credit_score_api", self.registry) == "Credit Score API"
+
+    def test_indexes_follow_list_operations(self) -> None:
+        self.registry.pop(0)
+        assert revert_string_transform("credit_score_api", self.registry) == "credit_score_api"
+        assert self.registry.get_targets("Credit Score API") == []
+
+        self.registry += [Transform(source="A B", target="a_b")]
+        assert revert_string_transform("a_b", self.registry) == "A B"
+
+    def test_serialization(self) -> None:
+        serialized = json.dumps([transform.model_dump() for transform in self.registry])
+        assert json.loads(serialized) == [
+            {"source": "Credit Score API", "target": "credit_score_api"},
+            {"source": 'list "of", errors', "target": "list__of___errors"},
+        ]
+
+        for new_registry in [copy.deepcopy(self.registry), pickle.loads(pickle.dumps(self.registry))]:
+            assert isinstance(new_registry, TransformRegistry)
+            assert new_registry == self.registry
+            assert revert_string_transform("credit_score_api", new_registry) == "Credit Score API"